@@ -0,0 +1,311 @@
+"""End-to-end and per-stage latency benchmark for the transcription pipeline
+
+Runs reference clips through the same stages the bot uses (download,
+decode, VAD, inference, formatting) at a configurable concurrency and
+writes p50/p95/p99 latency, real-time factor and throughput as JSON.
+
+    python benchmarks/benchmark.py --concurrency 4 --repeat 5
+    python benchmarks/benchmark.py --skip-inference        # no model needed
+    python benchmarks/benchmark.py --baseline results/old.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARK_DIR, "..", "src"))
+
+from audio import SAMPLE_RATE, AudioDecoder  # noqa: E402
+from clips import DEFAULT_DURATIONS, DEFAULT_FORMATS, generate_clips  # noqa: E402
+from config import Config  # noqa: E402
+from utils import downloaded_audio, format_transcription  # noqa: E402
+from vad import trim_silence  # noqa: E402
+
+STAGES = ("download", "decode", "vad", "inference", "format")
+
+
+class StubFile:
+    """Stands in for telegram.File, serving a local clip instead of the Bot API"""
+
+    def __init__(self, path: str):
+        self.file_path = path
+        self.file_size = os.path.getsize(path)
+
+    async def download_as_bytearray(self) -> bytearray:
+        with open(self.file_path, "rb") as f:
+            return bytearray(f.read())
+
+    async def download_to_drive(self, custom_path: str):
+        with open(self.file_path, "rb") as source, open(custom_path, "wb") as target:
+            target.write(source.read())
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds"""
+    if not values:
+        return {}
+    ms = np.asarray(values) * 1000
+    return {
+        "count": len(values),
+        "mean_ms": round(float(ms.mean()), 2),
+        "p50_ms": round(float(np.percentile(ms, 50)), 2),
+        "p95_ms": round(float(np.percentile(ms, 95)), 2),
+        "p99_ms": round(float(np.percentile(ms, 99)), 2),
+        "max_ms": round(float(ms.max()), 2),
+    }
+
+
+class Pipeline:
+    """The bot's processing stages, timed one by one"""
+
+    def __init__(self, inference: bool = True):
+        self.transcriber = None
+        if inference:
+            from transcriber import WhisperTranscriber
+
+            self.transcriber = WhisperTranscriber()
+            self.decoder = self.transcriber.decoder
+        else:
+            self.decoder = AudioDecoder(Config.FFMPEG_PROCESSES)
+
+    async def run(self, path: str) -> dict:
+        """Process one clip, returning per-stage and total seconds"""
+        timings = {}
+        start = time.perf_counter()
+
+        async with downloaded_audio(StubFile(path)) as audio:
+            timings["download"] = time.perf_counter() - start
+            if audio is None:
+                raise RuntimeError(f"Download stage failed for {path}")
+            pcm, timings["decode"] = await self.decoder.decode(audio.source)
+
+        media = pcm
+        if Config.VAD_ENABLED:
+            stage_start = time.perf_counter()
+            media, speech_map = await asyncio.to_thread(trim_silence, pcm)
+            timings["vad"] = time.perf_counter() - stage_start
+            if not speech_map:
+                media = None
+
+        text = ""
+        if self.transcriber is not None and media is not None:
+            from transcriber import _transcribe
+
+            segments, timings["inference"] = await self.transcriber.executor.run(
+                _transcribe, media
+            )
+            text = " ".join(segment.text.strip() for segment in segments)
+
+        stage_start = time.perf_counter()
+        format_transcription(text, time.perf_counter() - start)
+        timings["format"] = time.perf_counter() - stage_start
+
+        total = time.perf_counter() - start
+        return {
+            "clip": os.path.basename(path),
+            "audio_seconds": len(pcm) / SAMPLE_RATE,
+            "total": total,
+            "stages": timings,
+        }
+
+    def close(self):
+        if self.transcriber is not None:
+            self.transcriber.close()
+
+
+async def run_benchmark(
+    pipeline: Pipeline, clips: List[str], concurrency: int, repeat: int
+) -> dict:
+    """Run every clip repeat times, at most concurrency at once"""
+    # Warm up caches, thread pools and the model outside the measurement
+    await pipeline.run(clips[0])
+
+    slots = asyncio.Semaphore(max(1, concurrency))
+
+    async def job(path):
+        async with slots:
+            return await pipeline.run(path)
+
+    start = time.perf_counter()
+    runs = await asyncio.gather(*(job(path) for _ in range(repeat) for path in clips))
+    wall = time.perf_counter() - start
+
+    audio_seconds = sum(run["audio_seconds"] for run in runs)
+    per_clip = {}
+    for run in runs:
+        per_clip.setdefault(run["clip"], []).append(run)
+
+    return {
+        "jobs": len(runs),
+        "wall_seconds": round(wall, 3),
+        "throughput": {
+            "jobs_per_second": round(len(runs) / wall, 3),
+            "audio_seconds_per_second": round(audio_seconds / wall, 3),
+        },
+        "real_time_factor": {
+            "mean": round(sum(r["total"] for r in runs) / audio_seconds, 4),
+            "p95": round(
+                float(np.percentile([r["total"] / r["audio_seconds"] for r in runs], 95)),
+                4,
+            ),
+        },
+        "latency": {
+            "end_to_end": summarize([r["total"] for r in runs]),
+            **{
+                stage: summarize([r["stages"][stage] for r in runs if stage in r["stages"]])
+                for stage in STAGES
+            },
+        },
+        "per_clip": {
+            clip: {
+                "audio_seconds": round(clip_runs[0]["audio_seconds"], 2),
+                "end_to_end": summarize([r["total"] for r in clip_runs]),
+            }
+            for clip, clip_runs in sorted(per_clip.items())
+        },
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BENCHMARK_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(results: dict, baseline: Optional[dict] = None):
+    """Human-readable summary, with deltas against a previous run"""
+    print(
+        f"\n{results['jobs']} jobs in {results['wall_seconds']}s "
+        f"(concurrency {results['settings']['concurrency']}), "
+        f"{results['throughput']['audio_seconds_per_second']}s audio/s, "
+        f"RTF {results['real_time_factor']['mean']}"
+    )
+    print(f"{'stage':<12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for stage, summary in results["latency"].items():
+        if not summary:
+            continue
+        line = f"{stage:<12}{summary['p50_ms']:>10}{summary['p95_ms']:>10}{summary['p99_ms']:>10}"
+        previous = (baseline or {}).get("latency", {}).get(stage)
+        if previous:
+            change = (summary["p50_ms"] - previous["p50_ms"]) / max(previous["p50_ms"], 1e-6)
+            line += f"   p50 {change:+.0%} vs {baseline.get('commit') or 'baseline'}"
+        print(line)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clips", help="Directory of audio clips (default: generate)")
+    parser.add_argument(
+        "--durations",
+        default=",".join(str(d) for d in DEFAULT_DURATIONS),
+        help="Generated clip lengths in seconds",
+    )
+    parser.add_argument(
+        "--formats",
+        default=",".join(DEFAULT_FORMATS),
+        help="Generated clip formats (mp3/m4a need ffmpeg)",
+    )
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--skip-inference", action="store_true")
+    parser.add_argument("--model-path", help="Override WHISPER_MODEL_PATH")
+    parser.add_argument("--threads", type=int, help="Override WHISPER_THREADS")
+    parser.add_argument("--workers", type=int, help="Override INFERENCE_WORKERS")
+    parser.add_argument("--backend", choices=("thread", "process"))
+    parser.add_argument("--output", help="JSON results file")
+    parser.add_argument("--baseline", help="Previous JSON results to compare with")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> dict:
+    args = parse_args(argv)
+
+    if args.model_path:
+        Config.WHISPER_MODEL_PATH = args.model_path
+    if args.threads:
+        Config.WHISPER_THREADS = args.threads
+    if args.workers:
+        Config.INFERENCE_WORKERS = args.workers
+    if args.backend:
+        Config.INFERENCE_BACKEND = args.backend
+
+    if args.clips:
+        clips = sorted(
+            os.path.join(args.clips, name)
+            for name in os.listdir(args.clips)
+            if not name.startswith(".")
+        )
+    else:
+        clips = generate_clips(
+            os.path.join(BENCHMARK_DIR, "clips"),
+            [int(d) for d in args.durations.split(",")],
+            args.formats.split(","),
+        )
+    if not clips:
+        raise SystemExit("No clips to benchmark")
+
+    pipeline = Pipeline(inference=not args.skip_inference)
+    try:
+        results = asyncio.run(
+            run_benchmark(pipeline, clips, args.concurrency, args.repeat)
+        )
+    finally:
+        pipeline.close()
+
+    commit = git_commit()
+    results = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "settings": {
+            "model": Config.WHISPER_MODEL_NAME if not args.skip_inference else None,
+            "backend": Config.INFERENCE_BACKEND,
+            "workers": Config.INFERENCE_WORKERS,
+            "threads": Config.WHISPER_THREADS,
+            "ffmpeg_processes": Config.FFMPEG_PROCESSES,
+            "vad": Config.VAD_ENABLED,
+            "concurrency": args.concurrency,
+            "repeat": args.repeat,
+            "clips": [os.path.basename(path) for path in clips],
+        },
+        "host": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+        },
+        **results,
+    }
+
+    output = args.output or os.path.join(
+        BENCHMARK_DIR, "results", f"{commit or 'local'}-{int(time.time())}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+    print(f"\nResults written to {output}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import os
+import shutil
+import subprocess
+from typing import List
+
+import numpy as np
+import soundfile
+
+# Telegram voice notes are 48 kHz Opus
+CLIP_SAMPLE_RATE = 48000
+
+DEFAULT_DURATIONS = (5, 30, 120)
+DEFAULT_FORMATS = ("ogg", "wav", "mp3")
+
+
+def synth_speech(seconds: float, seed: int = 0) -> np.ndarray:
+    """Speech-like test signal: voiced syllables with pauses between phrases
+
+    Not intelligible speech, but it has the envelope, pitch movement and
+    silences that the decode and VAD stages care about. Use real
+    recordings (--clips) to benchmark transcription accuracy.
+    """
+    rng = np.random.default_rng(seed)
+    total = int(seconds * CLIP_SAMPLE_RATE)
+    audio = np.zeros(total, dtype=np.float32)
+
+    position = 0
+    while position < total:
+        # A phrase of a few syllables, then a pause
+        for _ in range(rng.integers(3, 9)):
+            length = int(rng.uniform(0.12, 0.3) * CLIP_SAMPLE_RATE)
+            end = min(position + length, total)
+            t = np.arange(end - position) / CLIP_SAMPLE_RATE
+            pitch = rng.uniform(100, 220) * (1 + 0.1 * t)
+            voiced = sum(
+                np.sin(2 * np.pi * pitch * harmonic * t) / harmonic
+                for harmonic in range(1, 6)
+            )
+            envelope = np.hanning(len(t))
+            audio[position:end] = 0.2 * voiced * envelope
+            position = end + int(rng.uniform(0.02, 0.08) * CLIP_SAMPLE_RATE)
+            if position >= total:
+                break
+        position += int(rng.uniform(0.3, 1.5) * CLIP_SAMPLE_RATE)
+
+    audio += 0.002 * rng.standard_normal(total).astype(np.float32)
+    return audio
+
+
+def write_clip(audio: np.ndarray, path: str):
+    """Encode a clip, using libsndfile where possible and ffmpeg otherwise"""
+    extension = os.path.splitext(path)[1].lstrip(".").lower()
+    if extension in ("ogg", "oga", "opus"):
+        soundfile.write(path, audio, CLIP_SAMPLE_RATE, format="OGG", subtype="OPUS")
+    elif extension in ("wav", "flac"):
+        soundfile.write(path, audio, CLIP_SAMPLE_RATE)
+    else:
+        if not shutil.which("ffmpeg"):
+            raise RuntimeError(f"ffmpeg is needed to encode .{extension} clips")
+        subprocess.run(
+            [
+                "ffmpeg",
+                "-loglevel",
+                "error",
+                "-y",
+                "-f",
+                "f32le",
+                "-ar",
+                str(CLIP_SAMPLE_RATE),
+                "-ac",
+                "1",
+                "-i",
+                "-",
+                path,
+            ],
+            input=audio.astype(np.float32).tobytes(),
+            check=True,
+        )
+
+
+def generate_clips(
+    directory: str,
+    durations=DEFAULT_DURATIONS,
+    formats=DEFAULT_FORMATS,
+) -> List[str]:
+    """Create reference clips (reused if they already exist)"""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for seconds in durations:
+        audio = None
+        for extension in formats:
+            path = os.path.join(directory, f"speech_{seconds}s.{extension}")
+            if not os.path.exists(path):
+                if audio is None:
+                    audio = synth_speech(seconds, seed=seconds)
+                try:
+                    write_clip(audio, path)
+                except RuntimeError as e:
+                    print(f"Skipping {os.path.basename(path)}: {e}")
+                    continue
+            paths.append(path)
+    return paths
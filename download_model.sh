@@ -1,34 +1,51 @@
 #!/bin/bash
 
 # Download Whisper model script
-# This script downloads the Whisper model for the transcriber bot
+# This script downloads the Whisper models for the transcriber bot
+#
+# Usage: ./download_model.sh [model ...]
+#   ./download_model.sh                      # base.en (default)
+#   ./download_model.sh tiny.en small.en     # extra models for WHISPER_MODELS
+#   ./download_model.sh base.en-q5_1         # quantized (q5_0, q5_1, q8_0)
 
 set -e
 
 MODEL_DIR="models"
 MODEL_URL="https://huggingface.co/ggerganov/whisper.cpp/resolve/main"
-MODEL_NAME="ggml-base.en.bin"
+MODELS=("$@")
+if [ ${#MODELS[@]} -eq 0 ]; then
+    MODELS=("base.en")
+fi
 
-echo "🔽 Downloading Whisper model..."
+echo "🔽 Downloading Whisper models: ${MODELS[*]}"
 
 # Create models directory if it doesn't exist
 mkdir -p "$MODEL_DIR"
 
-# Download the model
-if [ ! -f "$MODEL_DIR/$MODEL_NAME" ]; then
-    echo "📥 Downloading $MODEL_NAME..."
-    wget -O "$MODEL_DIR/$MODEL_NAME" "$MODEL_URL/$MODEL_NAME"
-    echo "✅ Model downloaded successfully!"
-else
-    echo "ℹ️  Model already exists: $MODEL_DIR/$MODEL_NAME"
-fi
+for MODEL in "${MODELS[@]}"; do
+    MODEL_NAME="ggml-$MODEL.bin"
+
+    # Download the model
+    if [ ! -f "$MODEL_DIR/$MODEL_NAME" ]; then
+        echo "📥 Downloading $MODEL_NAME..."
+        if ! wget -O "$MODEL_DIR/$MODEL_NAME" "$MODEL_URL/$MODEL_NAME"; then
+            rm -f "$MODEL_DIR/$MODEL_NAME"
+            echo "❌ Model download failed: $MODEL_NAME"
+            exit 1
+        fi
+        echo "✅ Model downloaded successfully!"
+    else
+        echo "ℹ️  Model already exists: $MODEL_DIR/$MODEL_NAME"
+    fi
+
+    # Verify download
+    if [ -f "$MODEL_DIR/$MODEL_NAME" ]; then
+        file_size=$(stat -c%s "$MODEL_DIR/$MODEL_NAME")
+        echo "📊 $MODEL_NAME size: $((file_size / 1024 / 1024)) MB"
+    else
+        echo "❌ Model download failed!"
+        exit 1
+    fi
+done
 
-# Verify download
-if [ -f "$MODEL_DIR/$MODEL_NAME" ]; then
-    file_size=$(stat -c%s "$MODEL_DIR/$MODEL_NAME")
-    echo "📊 Model size: $((file_size / 1024 / 1024)) MB"
-    echo "🎯 Model ready for use!"
-else
-    echo "❌ Model download failed!"
-    exit 1
-fi
\ No newline at end of file
+echo "🎯 Models ready for use!"
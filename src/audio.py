@@ -0,0 +1,294 @@
+import asyncio
+import io
+import logging
+import os
+import subprocess
+import time
+from typing import AsyncIterator, Iterator, List, Tuple, Union
+
+import numpy as np
+
+try:
+    import soundfile
+except ImportError:  # pragma: no cover - decoding falls back to ffmpeg
+    soundfile = None
+
+logger = logging.getLogger(__name__)
+
+# Whisper expects 16 kHz mono float32 PCM
+SAMPLE_RATE = 16000
+
+# Frame length used when looking for quiet cut points (20 ms)
+FRAME_SAMPLES = SAMPLE_RATE // 50
+
+# Containers libsndfile decodes in-process (OGG covers Opus voice notes)
+NATIVE_FORMATS = ("ogg", "oga", "opus", "wav", "flac")
+
+# PCM read from ffmpeg at a time when decoding a stream (1 s of audio)
+STREAM_READ_BYTES = SAMPLE_RATE * 4
+
+
+def _ffmpeg_command(source: Union[str, bytes]) -> list:
+    in_memory = isinstance(source, (bytes, bytearray))
+    return [
+        "ffmpeg",
+        "-loglevel",
+        "error",
+        "-i",
+        "pipe:0" if in_memory else source,
+        "-f",
+        "f32le",
+        "-ac",
+        "1",
+        "-ar",
+        str(SAMPLE_RATE),
+        "-",
+    ]
+
+
+def sniff_format(source: Union[str, bytes]) -> str:
+    """Guess the container of a file path or in-memory audio"""
+    if isinstance(source, str):
+        return os.path.splitext(source)[1].lstrip(".").lower()
+
+    header = bytes(source[:12])
+    if header.startswith(b"OggS"):
+        return "ogg"
+    if header.startswith(b"RIFF") and header[8:12] == b"WAVE":
+        return "wav"
+    if header.startswith(b"fLaC"):
+        return "flac"
+    return ""
+
+
+def _lowpass(audio: np.ndarray, cutoff: float, taps: int = 63) -> np.ndarray:
+    """Windowed-sinc low-pass filter, cutoff as a fraction of the sample rate"""
+    n = np.arange(taps) - (taps - 1) / 2
+    kernel = np.sinc(2 * cutoff * n) * np.hamming(taps)
+    kernel /= kernel.sum()
+    return np.convolve(audio, kernel.astype(np.float32), mode="same")
+
+
+def resample(audio: np.ndarray, sample_rate: int) -> np.ndarray:
+    """Resample mono audio to 16 kHz"""
+    audio = audio.astype(np.float32, copy=False)
+    if sample_rate == SAMPLE_RATE or not len(audio):
+        return audio
+
+    if sample_rate > SAMPLE_RATE:
+        # Remove content above the new Nyquist frequency before decimating
+        audio = _lowpass(audio, 0.45 * SAMPLE_RATE / sample_rate)
+        if sample_rate % SAMPLE_RATE == 0:
+            return np.ascontiguousarray(audio[:: sample_rate // SAMPLE_RATE])
+
+    length = int(len(audio) * SAMPLE_RATE / sample_rate)
+    positions = np.arange(length) * (sample_rate / SAMPLE_RATE)
+    return np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+
+
+def decode_native(source: Union[str, bytes]) -> np.ndarray:
+    """Decode OGG/Opus, WAV or FLAC in-process with libsndfile"""
+    stream = source if isinstance(source, str) else io.BytesIO(source)
+    data, sample_rate = soundfile.read(stream, dtype="float32", always_2d=True)
+    mono = data[:, 0] if data.shape[1] == 1 else data.mean(axis=1)
+    return resample(mono, sample_rate)
+
+
+class AudioDecoder:
+    """Decode stage in front of the model: audio in, 16 kHz float32 PCM out
+
+    Voice notes (OGG/Opus) and other libsndfile formats are decoded in
+    process on a thread. Everything else goes to ffmpeg subprocesses, at
+    most ffmpeg_processes at a time, streamed through pipes without temp
+    files.
+    """
+
+    def __init__(self, ffmpeg_processes: int = 2):
+        self.ffmpeg_processes = max(1, ffmpeg_processes)
+        self._ffmpeg_slots = asyncio.Semaphore(self.ffmpeg_processes)
+        self.native_decodes = 0
+        self.ffmpeg_decodes = 0
+
+    async def decode(self, source: Union[str, bytes]) -> Tuple[np.ndarray, float]:
+        """Decode audio, returning PCM and the time spent decoding"""
+        start_time = time.perf_counter()
+
+        audio = None
+        if soundfile is not None and sniff_format(source) in NATIVE_FORMATS:
+            try:
+                audio = await asyncio.to_thread(decode_native, source)
+                self.native_decodes += 1
+            except Exception as e:
+                logger.debug(f"Native decode failed, falling back to ffmpeg: {e}")
+
+        if audio is None:
+            audio = await self._decode_ffmpeg(source)
+            self.ffmpeg_decodes += 1
+
+        return audio, time.perf_counter() - start_time
+
+    async def _decode_ffmpeg(self, source: Union[str, bytes]) -> np.ndarray:
+        """Decode through an ffmpeg subprocess, bounded by the process pool"""
+        in_memory = isinstance(source, (bytes, bytearray))
+        async with self._ffmpeg_slots:
+            process = await asyncio.create_subprocess_exec(
+                *_ffmpeg_command(source),
+                stdin=subprocess.PIPE if in_memory else subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+            stdout, stderr = await process.communicate(
+                bytes(source) if in_memory else None
+            )
+
+        if process.returncode != 0:
+            error = stderr.decode("utf-8", errors="replace").strip()
+            raise RuntimeError(f"ffmpeg failed to decode audio: {error}")
+        return np.frombuffer(stdout, dtype=np.float32)
+
+    async def decode_stream(self, chunks: AsyncIterator[bytes]) -> AsyncIterator[np.ndarray]:
+        """Decode audio while it arrives, yielding PCM blocks as ffmpeg produces them
+
+        The chunks are written to ffmpeg's stdin as they come in, so
+        decoding starts with the first bytes instead of the whole file.
+        Only formats ffmpeg can read from a pipe work here (not MP4/M4A).
+        """
+        async with self._ffmpeg_slots:
+            process = await asyncio.create_subprocess_exec(
+                *_ffmpeg_command("pipe:0"),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+
+            async def feed():
+                try:
+                    async for chunk in chunks:
+                        process.stdin.write(chunk)
+                        await process.stdin.drain()
+                except (BrokenPipeError, ConnectionResetError):
+                    # ffmpeg gave up on the input; its exit status says why
+                    pass
+                finally:
+                    process.stdin.close()
+
+            feeder = asyncio.ensure_future(feed())
+            errors = asyncio.ensure_future(process.stderr.read())
+            try:
+                # Whole samples only: a read can end inside a float
+                leftover = b""
+                while True:
+                    data = await process.stdout.read(STREAM_READ_BYTES)
+                    if not data:
+                        break
+                    data = leftover + data
+                    usable = len(data) - len(data) % 4
+                    leftover = data[usable:]
+                    if usable:
+                        yield np.frombuffer(data[:usable], dtype=np.float32)
+
+                # Download errors surface here
+                await feeder
+                await process.wait()
+                if process.returncode != 0:
+                    error = (await errors).decode("utf-8", errors="replace").strip()
+                    raise RuntimeError(f"ffmpeg failed to decode audio: {error}")
+                self.ffmpeg_decodes += 1
+            finally:
+                feeder.cancel()
+                errors.cancel()
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+
+
+def _quietest_point(audio: np.ndarray, start: int, end: int) -> int:
+    """Return the sample index of the quietest frame in audio[start:end]"""
+    region = audio[start:end]
+    n_frames = len(region) // FRAME_SAMPLES
+    if n_frames < 2:
+        return end
+
+    frames = region[: n_frames * FRAME_SAMPLES].reshape(n_frames, FRAME_SAMPLES)
+    energy = np.einsum("ij,ij->i", frames, frames)
+    # Prefer the latest of equally quiet frames to keep windows long
+    quietest = n_frames - 1 - int(np.argmin(energy[::-1]))
+    return start + quietest * FRAME_SAMPLES + FRAME_SAMPLES // 2
+
+
+def split_chunks(
+    audio: np.ndarray,
+    chunk_seconds: float = 30,
+    search_seconds: float = 2,
+    overlap_seconds: float = 0,
+) -> Iterator[Tuple[int, int, np.ndarray]]:
+    """Split audio into windows of at most chunk_seconds
+
+    Each cut is moved back to the quietest frame within the last
+    search_seconds of the window, so words are rarely split in half.
+    Yields (start, end, chunk) where [start, end) is the range the window
+    owns and chunk extends overlap_seconds past end, so words at the cut
+    appear in both windows. Chunks are views, not copies.
+    """
+    chunk_samples = max(FRAME_SAMPLES, int(chunk_seconds * SAMPLE_RATE))
+    search_samples = min(int(search_seconds * SAMPLE_RATE), chunk_samples // 2)
+    overlap_samples = int(overlap_seconds * SAMPLE_RATE)
+    total = len(audio)
+
+    start = 0
+    while start < total:
+        end = min(start + chunk_samples, total)
+        if end < total and search_samples:
+            end = _quietest_point(audio, end - search_samples, end)
+        if total - end < search_samples:
+            # Fold a short remainder into this window instead of a tiny last one
+            end = total
+        yield start, end, audio[start : min(end + overlap_samples, total)]
+        start = end
+
+
+async def split_stream(
+    blocks: AsyncIterator[np.ndarray],
+    chunk_seconds: float = 30,
+    search_seconds: float = 2,
+    overlap_seconds: float = 0,
+) -> AsyncIterator[Tuple[int, int, np.ndarray]]:
+    """split_chunks for audio that is still arriving
+
+    A window is cut as soon as enough audio is buffered to place its cut
+    and overlap, so the first window is ready long before the stream
+    ends. Yields the same (start, end, chunk) tuples as split_chunks,
+    with start and end counted from the beginning of the stream.
+    """
+    chunk_samples = max(FRAME_SAMPLES, int(chunk_seconds * SAMPLE_RATE))
+    search_samples = min(int(search_seconds * SAMPLE_RATE), chunk_samples // 2)
+    overlap_samples = int(overlap_seconds * SAMPLE_RATE)
+    # Past this, the window is not the last one and the cut can be placed
+    needed = chunk_samples + max(overlap_samples, search_samples)
+
+    buffer = np.zeros(0, dtype=np.float32)
+    # Blocks are joined only once a window can be cut, not on every block
+    arrived: List[np.ndarray] = []
+    arrived_samples = 0
+    offset = 0
+    async for block in blocks:
+        arrived.append(block)
+        arrived_samples += len(block)
+        if len(buffer) + arrived_samples < needed:
+            continue
+        buffer = np.concatenate([buffer, *arrived])
+        arrived.clear()
+        arrived_samples = 0
+        while len(buffer) >= needed:
+            end = chunk_samples
+            if search_samples:
+                end = _quietest_point(buffer, end - search_samples, end)
+            yield offset, offset + end, buffer[: end + overlap_samples]
+            buffer = buffer[end:]
+            offset += end
+
+    buffer = np.concatenate([buffer, *arrived])
+    for start, end, chunk in split_chunks(
+        buffer, chunk_seconds, search_seconds, overlap_seconds
+    ):
+        yield offset + start, offset + end, chunk
@@ -0,0 +1,269 @@
+"""Pick the whisper model and worker/thread split that suit this host
+
+Benchmarks every model file next to the default model (quantized
+variants such as ggml-base.en-q5_1.bin included) with each way of
+splitting the CPU cores between inference workers, on a reference clip,
+and saves the best combination to TUNING_PATH. Config reads that file at
+startup; environment variables still take precedence.
+
+The most accurate model (largest, then least quantized) whose per-job
+real-time factor stays under --target-rtf wins, with the split that gives
+it the most throughput. If no model is fast enough, the fastest one wins.
+
+    python src/autotune.py
+    python src/autotune.py --clip samples/meeting.ogg --target-rtf 0.3
+    python src/autotune.py --models base.en,base.en-q5_1,small.en-q5_1
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import sys
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from audio import SAMPLE_RATE, AudioDecoder
+from config import TUNING_PATH, Config, model_name_from_path
+from executor import InferenceExecutor
+from models import QUANTIZATIONS, split_model_name
+
+logger = logging.getLogger(__name__)
+
+# Model sizes, smallest (least accurate) first
+MODEL_SIZES = ("tiny", "base", "small", "medium", "large")
+
+DEFAULT_CLIP_SECONDS = 30
+DEFAULT_REPEAT = 2
+# Per-job processing seconds per audio second the chosen model must reach
+DEFAULT_TARGET_RTF = 0.5
+
+
+def model_rank(name: str) -> Tuple[int, int]:
+    """Sort key for accuracy: model size, then quantization precision
+
+    Unknown sizes rank below tiny; unquantized (f16) files rank above q8_0.
+    """
+    base, quantization = split_model_name(name)
+    size = base.split(".")[0].split("-")[0]
+    size_rank = MODEL_SIZES.index(size) if size in MODEL_SIZES else -1
+    precision = (
+        len(QUANTIZATIONS) if quantization is None else QUANTIZATIONS.index(quantization)
+    )
+    return size_rank, precision
+
+
+def find_models(directory: str) -> Dict[str, str]:
+    """Whisper model files (ggml-<name>.bin) in a directory, by name"""
+    try:
+        files = sorted(os.listdir(directory))
+    except OSError:
+        return {}
+    return {
+        model_name_from_path(file): os.path.join(directory, file)
+        for file in files
+        if file.startswith("ggml-") and file.endswith(".bin")
+    }
+
+
+def thread_splits(cores: int, max_workers: Optional[int] = None) -> List[Tuple[int, int]]:
+    """(workers, threads per worker) pairs that use every core
+
+    Workers go up in powers of two, plus one worker per core.
+    """
+    cores = max(1, cores)
+    limit = min(cores, max_workers or cores)
+    workers = {1, limit}
+    count = 2
+    while count < limit:
+        workers.add(count)
+        count *= 2
+    return [(count, max(1, cores // count)) for count in sorted(workers)]
+
+
+def reference_signal(seconds: float, seed: int = 0) -> np.ndarray:
+    """Voiced syllables and pauses at 16 kHz, for timing without a --clip
+
+    Whisper decodes fewer tokens for it than for real speech, so a real
+    recording gives more faithful numbers.
+    """
+    rng = np.random.default_rng(seed)
+    total = int(seconds * SAMPLE_RATE)
+    audio = np.zeros(total, dtype=np.float32)
+    position = 0
+    while position < total:
+        length = int(rng.uniform(0.12, 0.3) * SAMPLE_RATE)
+        t = np.arange(min(length, total - position)) / SAMPLE_RATE
+        pitch = rng.uniform(100, 220)
+        voiced = sum(
+            np.sin(2 * np.pi * pitch * harmonic * t) / harmonic for harmonic in range(1, 6)
+        )
+        audio[position : position + len(t)] = 0.2 * voiced * np.hanning(len(t))
+        position += len(t) + int(rng.uniform(0.03, 0.6) * SAMPLE_RATE)
+    return audio
+
+
+async def load_clip(path: Optional[str], seconds: float) -> np.ndarray:
+    """The reference clip as 16 kHz PCM, cut to seconds"""
+    if not path:
+        return reference_signal(seconds)
+    audio, _ = await AudioDecoder().decode(path)
+    return audio[: int(seconds * SAMPLE_RATE)]
+
+
+async def measure(
+    model_path: str, workers: int, threads: int, clip: np.ndarray, repeat: int
+) -> Dict[str, float]:
+    """Run the clip through one worker/thread split of a model
+
+    Every round gives each worker one copy of the clip at the same time,
+    the way a busy bot keeps them all occupied.
+    """
+    from transcriber import _load_model, _transcribe
+
+    executor = InferenceExecutor([_load_model(model_path, threads) for _ in range(workers)])
+    try:
+        # The first call of a fresh model is slower; don't count it
+        await asyncio.gather(
+            *(executor.run(_transcribe, clip[:SAMPLE_RATE]) for _ in range(workers))
+        )
+
+        latencies = []
+        start_time = time.perf_counter()
+        for _ in range(repeat):
+            results = await asyncio.gather(
+                *(executor.run(_transcribe, clip) for _ in range(workers))
+            )
+            latencies.extend(seconds for _, seconds in results)
+        elapsed = time.perf_counter() - start_time
+    finally:
+        executor.shutdown()
+
+    clip_seconds = len(clip) / SAMPLE_RATE
+    return {
+        "rtf": round(float(np.mean(latencies)) / clip_seconds, 4),
+        "throughput": round(clip_seconds * len(latencies) / elapsed, 3),
+    }
+
+
+def pick(results: Sequence[dict], target_rtf: float) -> dict:
+    """The most accurate model that meets target_rtf, on its best split"""
+    fast_enough = [result for result in results if result["rtf"] <= target_rtf]
+    if not fast_enough:
+        return min(results, key=lambda result: result["rtf"])
+    return max(
+        fast_enough,
+        key=lambda result: (model_rank(result["model"]), result["throughput"]),
+    )
+
+
+async def autotune(
+    models: Dict[str, str],
+    clip: np.ndarray,
+    splits: Sequence[Tuple[int, int]],
+    repeat: int = DEFAULT_REPEAT,
+) -> List[dict]:
+    """Measure every model on every split"""
+    results = []
+    for name, path in models.items():
+        for workers, threads in splits:
+            try:
+                measured = await measure(path, workers, threads, clip, repeat)
+            except Exception as e:
+                logger.error(f"{name} with {workers}x{threads} failed: {e}")
+                continue
+            result = {"model": name, "path": path, "workers": workers, "threads": threads}
+            result.update(measured)
+            results.append(result)
+            logger.info(
+                f"{name:<18} {workers:>2} workers x {threads:>2} threads: "
+                f"RTF {measured['rtf']:.3f}, {measured['throughput']:.1f} audio s/s"
+            )
+    return results
+
+
+def tuning_file(best: dict, results: List[dict], clip_seconds: float, target_rtf: float) -> dict:
+    """The tuning file config.load_tuning reads back"""
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "host": {
+            "cpus": os.cpu_count(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+        },
+        "clip_seconds": clip_seconds,
+        "target_rtf": target_rtf,
+        "settings": {
+            "WHISPER_MODEL_NAME": best["model"],
+            "WHISPER_MODEL_PATH": best["path"],
+            "INFERENCE_WORKERS": best["workers"],
+            "WHISPER_THREADS": best["threads"],
+        },
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--models",
+        help="comma separated model names (default: every ggml-*.bin next to the default model)",
+    )
+    parser.add_argument("--clip", help="reference recording (default: a synthetic signal)")
+    parser.add_argument("--seconds", type=float, default=DEFAULT_CLIP_SECONDS)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--target-rtf", type=float, default=DEFAULT_TARGET_RTF)
+    parser.add_argument("--max-workers", type=int, help="most inference workers to try")
+    parser.add_argument("--output", default=TUNING_PATH)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(format="%(message)s", level=logging.INFO)
+
+    available = find_models(os.path.dirname(Config.WHISPER_MODEL_PATH) or ".")
+    if args.models:
+        names = [name.strip() for name in args.models.split(",") if name.strip()]
+        missing = [name for name in names if name not in available]
+        if missing:
+            logger.error(
+                f"Model files not found: {', '.join(missing)}. "
+                f"Run './download_model.sh <name>' to download them"
+            )
+            return 1
+        available = {name: available[name] for name in names}
+    if not available:
+        logger.error("No model files found; run './download_model.sh' first")
+        return 1
+
+    clip = asyncio.run(load_clip(args.clip, args.seconds))
+    splits = thread_splits(os.cpu_count() or 1, args.max_workers)
+    logger.info(
+        f"Tuning {len(available)} model(s) x {len(splits)} split(s) "
+        f"on {os.cpu_count()} CPUs with a {len(clip) / SAMPLE_RATE:.0f}s clip"
+    )
+
+    results = asyncio.run(autotune(available, clip, splits, args.repeat))
+    if not results:
+        logger.error("Every run failed; nothing written")
+        return 1
+
+    best = pick(results, args.target_rtf)
+    directory = os.path.dirname(args.output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(
+            tuning_file(best, results, len(clip) / SAMPLE_RATE, args.target_rtf), f, indent=2
+        )
+    logger.info(
+        f"Best: {best['model']} with {best['workers']} workers x {best['threads']} threads "
+        f"(RTF {best['rtf']:.3f}), saved to {args.output}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
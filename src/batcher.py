@@ -0,0 +1,186 @@
+import asyncio
+import bisect
+import logging
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+import numpy as np
+from pywhispercpp.model import Segment
+
+from audio import SAMPLE_RATE
+from metrics import BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Runs whisper on audio, returning (segments, inference seconds)
+InferenceCall = Callable[[np.ndarray], Awaitable[Tuple[List[Segment], float]]]
+
+
+class _PendingClip:
+    def __init__(self, audio: np.ndarray, future: asyncio.Future):
+        self.audio = audio
+        self.future = future
+
+
+class InferenceBatcher:
+    """Packs short clips that arrive close together into one whisper call
+
+    Whisper always encodes a 30 s context, so a 5 s voice note pays for the
+    same encoder pass as a 30 s one. Clips submitted within max_wait of the
+    first waiting clip are laid out one after another, separated by
+    gap_seconds of silence, and transcribed in a single call with word
+    timestamps. Each word goes back to the clip its midpoint falls in.
+
+    A batch is flushed when it holds max_batch_size clips, when the next
+    clip would not fit into context_seconds, or when max_wait runs out.
+    A batch of one runs through run_single, exactly as without batching.
+    """
+
+    def __init__(
+        self,
+        run_single: InferenceCall,
+        run_batch: InferenceCall,
+        max_batch_size: int = 4,
+        max_wait: float = 0.05,
+        max_clip_seconds: float = 15,
+        context_seconds: float = 30,
+        gap_seconds: float = 1.0,
+    ):
+        self.run_single = run_single
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self.context_samples = int(context_seconds * SAMPLE_RATE)
+        self.max_clip_samples = int(max_clip_seconds * SAMPLE_RATE)
+        self.gap_samples = int(gap_seconds * SAMPLE_RATE)
+
+        self.batches = 0
+        self.batched_clips = 0
+        self._pending: List[_PendingClip] = []
+        self._pending_samples = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+
+    def fits(self, audio: np.ndarray) -> bool:
+        """Check if a clip is short enough to share a context with others"""
+        return len(audio) <= min(
+            self.max_clip_samples, self.context_samples - self.gap_samples
+        )
+
+    async def transcribe(self, audio: np.ndarray) -> Tuple[List[Segment], float]:
+        """Transcribe a clip, possibly together with other waiting clips"""
+        if not self.fits(audio):
+            return await self.run_single(audio)
+
+        needed = len(audio) + (self.gap_samples if self._pending else 0)
+        if self._pending and self._pending_samples + needed > self.context_samples:
+            self._flush()
+            needed = len(audio)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(_PendingClip(audio, future))
+        self._pending_samples += needed
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.max_wait, self._flush
+            )
+        return await future
+
+    def _flush(self):
+        """Start transcribing everything that is waiting"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        clips, self._pending, self._pending_samples = self._pending, [], 0
+        if not clips:
+            return
+
+        task = asyncio.create_task(self._run(clips))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, clips: List[_PendingClip]):
+        BATCH_SIZE.observe(len(clips))
+        try:
+            if len(clips) == 1:
+                result = await self.run_single(clips[0].audio)
+                if not clips[0].future.done():
+                    clips[0].future.set_result(result)
+                return
+
+            packed, starts = self._pack([clip.audio for clip in clips])
+            segments, inference_time = await self.run_batch(packed)
+            self.batches += 1
+            self.batched_clips += len(clips)
+            logger.debug(f"Transcribed {len(clips)} clips in one pass")
+
+            results = self._split(segments, starts, clips)
+            for clip, clip_segments in zip(clips, results):
+                if not clip.future.done():
+                    clip.future.set_result((clip_segments, inference_time))
+        except Exception as e:
+            for clip in clips:
+                if not clip.future.done():
+                    clip.future.set_exception(e)
+
+    def _pack(self, clips: List[np.ndarray]) -> Tuple[np.ndarray, List[int]]:
+        """Lay clips out back to back with silence between them"""
+        starts = []
+        parts = []
+        position = 0
+        for index, audio in enumerate(clips):
+            if index:
+                parts.append(np.zeros(self.gap_samples, dtype=np.float32))
+                position += self.gap_samples
+            starts.append(position)
+            parts.append(audio)
+            position += len(audio)
+        return np.concatenate(parts), starts
+
+    def _split(
+        self, segments: List[Segment], starts: List[int], clips: List[_PendingClip]
+    ) -> List[List[Segment]]:
+        """Give each word back to its clip, as one segment per clip"""
+        # Clip i owns everything up to the middle of the gap after it
+        boundaries = [
+            (start + len(clip.audio) + self.gap_samples // 2) * 100 // SAMPLE_RATE
+            for start, clip in zip(starts, clips)
+        ][:-1]
+
+        words = [[] for _ in clips]
+        for segment in segments:
+            middle = (segment.t0 + segment.t1) // 2
+            words[bisect.bisect_right(boundaries, middle)].append(segment)
+
+        results = []
+        for start, clip_words in zip(starts, words):
+            text = "".join(word.text for word in clip_words).strip()
+            if not text:
+                results.append([])
+                continue
+            offset = start * 100 // SAMPLE_RATE
+            results.append(
+                [
+                    Segment(
+                        max(0, clip_words[0].t0 - offset),
+                        max(0, clip_words[-1].t1 - offset),
+                        text,
+                        mean_probability(clip_words),
+                    )
+                ]
+            )
+        return results
+
+
+def mean_probability(segments: List[Segment]) -> float:
+    """Segment probabilities averaged by length (NaN when none were extracted)"""
+    total = weight = 0.0
+    for segment in segments:
+        probability = getattr(segment, "probability", float("nan"))
+        if isinstance(probability, float) and not np.isnan(probability):
+            length = max(1, segment.t1 - segment.t0)
+            total += probability * length
+            weight += length
+    return total / weight if weight else float("nan")
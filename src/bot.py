@@ -1,7 +1,11 @@
 import asyncio
 import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
 
-from telegram import Update
+from telegram import Audio, Chat, Document, Message, Update, User
 from telegram.ext import (
     Application,
     CommandHandler,
@@ -10,15 +14,52 @@ from telegram.ext import (
     filters,
 )
 
+from broker import TranscriptionJob, create_broker
+from cache import SingleFlight, TranscriptionCache, file_cache_key
 from config import Config
+from estimator import CostEstimator
+from journal import JobJournal
+from memory import total_memory
+from metrics import (
+    ESTIMATE_RATIO,
+    IN_FLIGHT,
+    JOB_SECONDS,
+    JOBS,
+    JOBS_RESUMED,
+    MEMORY_BYTES,
+    MODELS_LOADED,
+    OUTBOUND_WAITING,
+    POOL_BUSY,
+    POOL_WORKERS,
+    QUEUED,
+    READY,
+    REJECTIONS,
+    STAGE_SECONDS,
+    STARTUP_SECONDS,
+    MetricsServer,
+)
+from models import is_english_only
+from ratelimit import OutboundLimiter
+from scheduler import JobScheduler, QueueFullError, UserQueueFullError
+from segments import EXPORT_FORMATS, Transcript
 from transcriber import WhisperTranscriber
 from utils import (
-    cleanup_temp_file,
-    download_audio_file,
+    DownloadError,
+    ProgressMessage,
+    audio_format,
+    download_stream,
+    downloaded_audio,
+    export_documents,
+    format_eta,
+    format_partial_transcription,
+    format_queued,
     format_transcription,
     get_file_info,
+    media_duration,
     send_long_message,
+    should_pipeline_download,
 )
+from webhook import WebhookServer
 
 # Configure logging
 logging.basicConfig(
@@ -28,22 +69,133 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+MB = 1024 * 1024
+
 # Avoid all GET and POST requests being logged
 logging.getLogger("httpx").setLevel(logging.WARNING)
 
 
 class TranscriberBot:
     def __init__(self):
-        self.transcriber = WhisperTranscriber()
-        self.app = Application.builder().token(Config.TELEGRAM_BOT_TOKEN).build()
+        self.cache = None
+        if Config.CACHE_ENABLED:
+            self.cache = TranscriptionCache(
+                max_entries=Config.CACHE_MAX_ENTRIES,
+                ttl_seconds=Config.CACHE_TTL_SECONDS,
+                db_path=Config.CACHE_DB_PATH or None,
+                max_db_entries=Config.CACHE_DB_MAX_ENTRIES,
+            )
+        # Transcriptions running now, joined by copies of the same file
+        self.in_flight = SingleFlight()
+        # Split deployments pass jobs from frontends to workers through a broker
+        self.role = Config.ROLE
+        self.broker = None
+        if Config.BROKER_URL:
+            self.broker = create_broker(
+                Config.BROKER_URL, lease_seconds=Config.BROKER_LEASE_SECONDS
+            )
+        # Accepted jobs, kept on disk so a restart resumes them
+        self.journal = None
+        if Config.JOURNAL_PATH:
+            self.journal = JobJournal(Config.JOURNAL_PATH)
+        # Frontends only talk to Telegram, they never load a model
+        self.transcriber = None
+        if self.role != "frontend":
+            self.transcriber = WhisperTranscriber(cache=self.cache, preload=False)
+        self.scheduler = JobScheduler(
+            max_in_flight=Config.MAX_CONCURRENT_TRANSCRIPTIONS,
+            max_queued=Config.MAX_QUEUED_JOBS,
+            short_audio_seconds=Config.SHORT_AUDIO_SECONDS,
+            max_queued_per_user=Config.MAX_QUEUED_JOBS_PER_USER,
+        )
+        # Predicts job times for ETAs and queue order, learned from finished jobs
+        self.estimator = CostEstimator(Config.WHISPER_THREADS)
+        # Models picked with /model, by user id (unset = routed automatically)
+        self.user_models = {}
+        # Files picked with /format, by user id (unset = EXPORT_FORMATS)
+        self.user_formats = {}
+        # Language of each user's last detected audio: (language, probability, when)
+        self.user_languages = {}
+        self.limiter = None
+        self.app = self.build_application()
+        self.webhook_server = None
+        self.metrics_server = None
+        self.consumer = None
+        # Background model load started by run(), and how long each phase took
+        self.loading = None
+        self.startup_phases = {}
+        self.setup_metrics()
         self.setup_handlers()
 
+    def build_application(self) -> Application:
+        """Build the telegram Application, optionally against another Bot API server"""
+        builder = Application.builder().token(Config.TELEGRAM_BOT_TOKEN)
+        if Config.TELEGRAM_API_BASE_URL:
+            base_url = Config.TELEGRAM_API_BASE_URL.rstrip("/")
+            builder = builder.base_url(f"{base_url}/bot").base_file_url(
+                f"{base_url}/file/bot"
+            )
+        if Config.OUTBOUND_RATE_LIMIT:
+            # Every Bot API call is paced under Telegram's flood limits
+            self.limiter = OutboundLimiter(
+                global_per_second=Config.OUTBOUND_GLOBAL_PER_SECOND,
+                chat_per_second=Config.OUTBOUND_CHAT_PER_SECOND,
+                group_per_minute=Config.OUTBOUND_GROUP_PER_MINUTE,
+                max_retries=Config.OUTBOUND_MAX_RETRIES,
+            )
+            builder = builder.rate_limiter(self.limiter)
+        return builder.build()
+
+    def setup_metrics(self):
+        """Expose queue and pool state as gauges read at scrape time"""
+        IN_FLIGHT.set_function(lambda: self.scheduler.in_flight)
+        QUEUED.set_function(lambda: self.scheduler.queued)
+        POOL_WORKERS.set_function(
+            lambda: self.executor.workers if self.executor else 0
+        )
+        POOL_BUSY.set_function(
+            lambda: self.executor.in_flight if self.executor else 0
+        )
+        READY.set_function(lambda: 1 if self.is_ready() else 0)
+        MODELS_LOADED.set_function(
+            lambda: len(self.transcriber.registry.loaded) if self.transcriber else 0
+        )
+        OUTBOUND_WAITING.set_function(
+            lambda: self.limiter.waiting if self.limiter else 0
+        )
+        for kind in ("rss", "pss"):
+            MEMORY_BYTES.set_function(
+                lambda kind=kind: self.memory_usage()[kind], kind=kind
+            )
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Memory of this process and, when it runs models, their workers"""
+        if self.transcriber is None:
+            return total_memory([os.getpid()])
+        return self.transcriber.memory_usage()
+
+    def record_startup(self, phase: str, seconds: float):
+        """Keep a startup phase's duration for the log, /status and metrics"""
+        self.startup_phases[phase] = seconds
+        STARTUP_SECONDS.set(seconds, phase=phase)
+
+    def is_ready(self) -> bool:
+        """Check if jobs can run (frontends have no model to wait for)"""
+        return self.transcriber is None or self.transcriber.ready.is_set()
+
+    @property
+    def executor(self):
+        """The inference pool, None on frontends"""
+        return self.transcriber.executor if self.transcriber else None
+
     def setup_handlers(self):
         """Setup bot command and message handlers"""
         self.app.add_handler(CommandHandler("start", self.start_command))
         self.app.add_handler(CommandHandler("help", self.help_command))
         self.app.add_handler(CommandHandler("about", self.about_command))
         self.app.add_handler(CommandHandler("status", self.status_command))
+        self.app.add_handler(CommandHandler("model", self.model_command))
+        self.app.add_handler(CommandHandler("format", self.format_command))
 
         # Handle voice messages
         self.app.add_handler(MessageHandler(filters.VOICE, self.handle_voice))
@@ -91,6 +243,8 @@ Transform your voice into text instantly with AI-powered transcription! 🚀
 • /help - Show this help message
 • /about - About this bot
 • /status - Check bot status
+• /model - Choose the AI model for your audio
+• /format - Get subtitles (SRT/VTT) or JSON with your text
 
 *🚀 How to use:*
 1. 🎙️ Send a voice message or audio file
@@ -146,16 +300,66 @@ Give us a ⭐ on GitHub if you find this useful!
 
     async def status_command(self, update: Update, _: ContextTypes.DEFAULT_TYPE):
         """Handle /status command"""
-        transcriber_status = "✅ Ready" if self.transcriber.is_healthy() else "❌ Error"
+        if self.transcriber is None:
+            transcriber_status = "🛰️ Remote workers"
+            busy_workers = "remote"
+            decode_ms = inference_ms = 0.0
+            loaded_models = ""
+        else:
+            if not self.is_ready():
+                transcriber_status = "⏳ Starting (loading model)"
+            else:
+                transcriber_status = (
+                    "✅ Ready" if self.transcriber.is_healthy() else "❌ Error"
+                )
+            executor = self.transcriber.executor
+            busy_workers = (
+                f"{executor.in_flight}/{executor.workers} busy"
+                if executor
+                else "stopped"
+            )
+            decode_ms = self.transcriber.average_timing("decode") * 1000
+            inference_ms = self.transcriber.average_timing("inference") * 1000
+            loaded_models = (
+                f" ({len(self.transcriber.registry.loaded)}/"
+                f"{len(Config.WHISPER_MODELS)} models loaded)"
+            )
+        memory = self.memory_usage()
+        memory_status = (
+            f"{memory['rss'] / MB:.0f}MB RSS / {memory['pss'] / MB:.0f}MB PSS "
+            f"({memory['processes']} processes)"
+        )
+        broker_status = (
+            f", {await self.broker.size()} waiting for workers" if self.broker else ""
+        )
+        rtf = self.estimator.rtf(Config.WHISPER_MODEL_NAME)
+        speed_status = f"{rtf:.2f}× real time" if rtf is not None else "Not measured yet"
+        if Config.LANGUAGE_DETECTION:
+            languages = f"Auto-detected (other languages use {Config.MULTILINGUAL_MODEL})"
+        elif is_english_only(Config.WHISPER_MODEL_NAME):
+            languages = "English"
+        else:
+            languages = "Multilingual"
+        cache_status = (
+            f"{self.cache.hits} hits, {self.cache.misses} misses ({self.cache.hit_rate:.0%})"
+            if self.cache
+            else "Disabled"
+        )
 
         status_message = f"""
 🔍 *Bot Status Dashboard*
 
 *🤖 Transcriber:* {transcriber_status}
-*🧠 AI Model:* {Config.WHISPER_MODEL_NAME.upper()}
+*🧠 AI Model:* {Config.WHISPER_MODEL_NAME.upper()}{loaded_models}
 *📁 Formats:* {', '.join(Config.SUPPORTED_FORMATS).upper()}
 *📊 Max Size:* {Config.MAX_AUDIO_SIZE_MB}MB
-*⚡ Processing:* Concurrent
+*⚡ Processing:* Concurrent ({Config.INFERENCE_WORKERS} {Config.INFERENCE_BACKEND} workers × {Config.WHISPER_THREADS} threads)
+*🧮 Workers:* {busy_workers}
+*🗄️ Memory:* {memory_status}
+*💾 Cache:* {cache_status}
+*⏱️ Avg decode / inference:* {decode_ms:.0f}ms / {inference_ms:.0f}ms
+*🏎️ Speed:* {speed_status}
+*📥 Jobs:* {self.scheduler.in_flight} running, {self.scheduler.queued} queued{broker_status}
 *💻 Platform:* CPU-optimized
 
 *🚀 Performance:*
@@ -165,68 +369,434 @@ Give us a ⭐ on GitHub if you find this useful!
 
 *📈 Quick Stats:*
 • Model size: 147MB
-• Languages: English optimized
+• Languages: {languages}
 • Accuracy: High-quality AI transcription
 
 *🔗 More info:* /about
         """
         await update.message.reply_text(status_message, parse_mode="Markdown")
 
+    async def model_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /model command: show the models or pick one for your audio"""
+        user_id = update.effective_user.id
+        names = list(Config.WHISPER_MODELS)
+        choice = context.args[0].strip() if context.args else None
+
+        if choice == "auto":
+            self.user_models.pop(user_id, None)
+            message = "🧠 *Model:* Automatic\nEach file gets the model that suits its length."
+        elif choice in Config.WHISPER_MODELS:
+            self.user_models[user_id] = choice
+            message = f"🧠 *Model:* `{choice}`\nYour audio will be transcribed with this model."
+        elif choice:
+            message = f"❌ *Unknown Model*\nAvailable: {', '.join(f'`{name}`' for name in names)}"
+        else:
+            current = self.user_models.get(user_id)
+            loaded = self.transcriber.registry.loaded if self.transcriber else []
+            lines = [
+                f"{'▶️' if name == current else '•'} `{name}`"
+                + (" (loaded)" if name in loaded else "")
+                for name in names
+            ]
+            message = (
+                "🧠 *Available Models*\n"
+                + "\n".join(lines)
+                + f"\n\n*Current:* {f'`{current}`' if current else 'Automatic'}"
+                + "\nUse `/model <name>` to pick one or `/model auto` to reset."
+            )
+        await update.message.reply_text(message, parse_mode="Markdown")
+
+    async def format_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /format command: pick files to receive with each transcription"""
+        user_id = update.effective_user.id
+        choices = [arg.strip().lower().lstrip(".") for arg in context.args or []]
+        usage = (
+            "Use `/format srt vtt json` to pick any of them, "
+            "or `/format off` for text only."
+        )
+
+        if choices == ["off"]:
+            self.user_formats[user_id] = []
+            message = "📄 *Files:* Off\nYou will receive the text only."
+        elif choices and all(choice in EXPORT_FORMATS for choice in choices):
+            self.user_formats[user_id] = list(dict.fromkeys(choices))
+            message = (
+                f"📄 *Files:* {', '.join(self.user_formats[user_id]).upper()}\n"
+                "Sent with every transcription."
+            )
+        elif choices:
+            message = f"❌ *Unknown Format*\n{usage}"
+        else:
+            current = self.export_formats(user_id)
+            message = (
+                f"📄 *Files:* {', '.join(current).upper() if current else 'Off'}\n"
+                + usage
+            )
+        await update.message.reply_text(message, parse_mode="Markdown")
+
+    def export_formats(self, user_id: int) -> List[str]:
+        """Files a user gets with their transcriptions"""
+        return self.user_formats.get(user_id, Config.EXPORT_FORMATS)
+
     async def handle_voice(self, update: Update, _: ContextTypes.DEFAULT_TYPE):
         """Handle voice messages"""
-        # Process audio concurrently without blocking other requests
-        asyncio.create_task(self.process_audio(update, update.message.voice))
+        await self.enqueue_audio(update, update.message.voice)
 
     async def handle_audio(self, update: Update, _: ContextTypes.DEFAULT_TYPE):
         """Handle audio files"""
-        # Process audio concurrently without blocking other requests
-        asyncio.create_task(self.process_audio(update, update.message.audio))
+        await self.enqueue_audio(update, update.message.audio)
 
     async def handle_document_audio(self, update: Update, _: ContextTypes.DEFAULT_TYPE):
         """Handle audio files sent as documents"""
         document = update.message.document
         if document.mime_type and document.mime_type.startswith("audio/"):
-            # Process audio concurrently without blocking other requests
-            asyncio.create_task(self.process_audio(update, document))
+            await self.enqueue_audio(update, document)
         else:
             await update.message.reply_text(
                 "❌ *Invalid File*\nPlease send an audio file.\n\n📁 *Supported:* MP3, M4A, WAV, OGG, FLAC\n⭐ [Star us on GitHub](https://github.com/Malith-Rukshan/whisper-transcriber-bot)",
                 parse_mode="Markdown",
             )
 
-    async def process_audio(self, update: Update, audio_file):
-        """Process audio file for transcription"""
+    async def enqueue_audio(self, update: Update, audio_file):
+        """Queue audio for transcription, rejecting quickly when overloaded"""
+        job = TranscriptionJob.from_message(
+            update,
+            audio_file,
+            model=self.user_models.get(update.effective_user.id),
+            formats=self.export_formats(update.effective_user.id),
+        )
+        _, cost = self.estimate_job(audio_file, self.job_model(audio_file, job.model, job.user_id))
+        if Config.MAX_JOB_SECONDS and cost is not None and cost > Config.MAX_JOB_SECONDS:
+            REJECTIONS.inc(reason="too_long")
+            logger.info(
+                f"Rejecting job from user {job.user_id}: predicted {cost:.0f}s "
+                f"over the {Config.MAX_JOB_SECONDS}s limit"
+            )
+            await update.message.reply_text(
+                f"⏳ *Audio Too Long*\nThis file would take {format_eta(cost)} to transcribe, over the {format_eta(Config.MAX_JOB_SECONDS)} limit. Please send a shorter recording.",
+                parse_mode="Markdown",
+            )
+            return
+
+        if self.journal is not None and not await self.journal.record(job):
+            # Delivered again after a restart: it is already queued or answered
+            logger.info(
+                f"Ignoring message {job.message_id} in chat {job.chat_id}, already accepted"
+            )
+            return
+
+        if self.broker is not None:
+            await self.enqueue_remote(update, job)
+            return
+
         try:
-            # Send processing message
-            processing_msg = await update.message.reply_text(
-                "🎙️ *Transcribing audio...*\n⏳ AI is working on your audio...\n🚀 Powered by OpenAI Whisper",
+            await self.submit_local(update, audio_file, job)
+        except UserQueueFullError:
+            await self.forget_job(job)
+            await update.message.reply_text(
+                "⏳ *Too Many Files*\nYou already have several audio files waiting. Please wait for them to finish before sending more.",
+                parse_mode="Markdown",
+            )
+        except QueueFullError:
+            await self.forget_job(job)
+            await update.message.reply_text(
+                "⏳ *Queue Full*\nToo many audio files are being processed right now. Please try again in a few minutes.",
                 parse_mode="Markdown",
             )
 
+    async def submit_local(self, update: Update, audio_file, job: TranscriptionJob):
+        """Queue a job on this bot's own scheduler, telling the user where it stands"""
+        # Documents have no duration; it is guessed from their size
+        audio_seconds, cost = self.estimate_job(
+            audio_file, self.job_model(audio_file, job.model, job.user_id)
+        )
+        queued_msg = asyncio.get_running_loop().create_future()
+        scheduled = self.scheduler.submit(
+            job.user_id,
+            audio_seconds,
+            lambda: self.run_local_job(update, audio_file, job, queued_msg),
+            cost=cost,
+        )
+        processing_msg = None
+        try:
+            if scheduled.started_at is None:
+                position, eta = self.scheduler.eta(scheduled)
+                processing_msg = await update.message.reply_text(
+                    format_queued(position, eta), parse_mode="Markdown"
+                )
+        except Exception as e:
+            logger.error(f"Failed to send queue position: {e}")
+        finally:
+            queued_msg.set_result(processing_msg)
+
+    async def run_local_job(
+        self, update: Update, audio_file, job: TranscriptionJob, queued_msg
+    ):
+        """Transcribe a job from this bot's scheduler, keeping the journal current"""
+        if self.journal is not None:
+            await self.journal.start(job)
+        # The "Queued" message, if the job had to wait, becomes the processing message
+        processing_msg = await queued_msg
+        await self.process_audio(
+            update,
+            audio_file,
+            processing_msg,
+            preferred_model=job.model,
+            formats=job.formats,
+        )
+        # Not reached if cancelled by a shutdown: the job is resumed on restart
+        await self.finish_job(job)
+
+    async def finish_job(self, job: TranscriptionJob):
+        if self.journal is not None:
+            await self.journal.finish(job)
+
+    async def forget_job(self, job: TranscriptionJob):
+        """Drop a rejected job, so sending the message again is not ignored"""
+        if self.journal is not None:
+            await self.journal.remove(job)
+
+    async def enqueue_remote(self, update: Update, job: TranscriptionJob):
+        """Hand a job to the transcription workers through the broker"""
+        if await self.broker.size() >= Config.MAX_QUEUED_JOBS:
+            REJECTIONS.inc(reason="queue_full")
+            await self.forget_job(job)
+            await update.message.reply_text(
+                "⏳ *Queue Full*\nToo many audio files are being processed right now. Please try again in a few minutes.",
+                parse_mode="Markdown",
+            )
+            return
+
+        processing_msg = await update.message.reply_text(
+            "⏳ *Queued*\nYour audio will be transcribed shortly.",
+            parse_mode="Markdown",
+        )
+        job.processing_message_id = processing_msg.message_id
+        await self.broker.put(job)
+        # The broker keeps it from here on
+        await self.finish_job(job)
+        logger.info(f"Queued job {job.job_id} for user {job.user_id}")
+
+    async def resume_jobs(self):
+        """Queue the journal's unfinished jobs again after a restart"""
+        jobs = await self.journal.unfinished()
+        if not jobs:
+            return
+        logger.info(f"Resuming {len(jobs)} unfinished job(s) from the journal")
+        for job in jobs:
+            try:
+                update, audio_file, processing_msg = self.job_context(job)
+                if self.broker is not None:
+                    # Accepted but not yet handed to a worker
+                    await self.broker.put(job)
+                    await self.finish_job(job)
+                elif job.attempts >= Config.JOURNAL_MAX_ATTEMPTS:
+                    # Started that many times without finishing: likely what stopped the bot
+                    await self.abandon_job(job, update, processing_msg)
+                    await self.finish_job(job)
+                else:
+                    await self.submit_local(update, audio_file, job)
+                    JOBS_RESUMED.inc()
+            except QueueFullError:
+                logger.warning(f"Queue full, job {job.job_id} waits for the next restart")
+            except Exception as e:
+                logger.error(f"Failed to resume job {job.job_id}: {e}")
+
+    async def consume_jobs(self):
+        """Worker loop: take jobs from the broker while there are free slots"""
+        slots = asyncio.Semaphore(self.scheduler.max_in_flight)
+        while True:
+            await slots.acquire()
+            try:
+                job = await self.broker.get(timeout=1.0)
+            except Exception as e:
+                slots.release()
+                logger.error(f"Failed to take a job from the broker: {e}")
+                await asyncio.sleep(1)
+                continue
+            if job is None:
+                slots.release()
+                continue
+
+            self.scheduler.submit(
+                job.user_id, job.duration, lambda job=job: self.run_job(job, slots)
+            )
+
+    async def run_job(self, job: TranscriptionJob, slots: asyncio.Semaphore):
+        """Transcribe a job taken from the broker and acknowledge it"""
+        heartbeat = None
+        try:
+            update, audio_file, processing_msg = self.job_context(job)
+            if job.attempts > Config.BROKER_MAX_ATTEMPTS:
+                await self.abandon_job(job, update, processing_msg)
+                await self.broker.ack(job)
+                return
+
+            # Long files outlast the lease; keep it while this worker is alive
+            heartbeat = asyncio.create_task(self.renew_lease(job))
+            await self.process_audio(
+                update,
+                audio_file,
+                processing_msg,
+                preferred_model=job.model,
+                formats=job.formats,
+            )
+            # Not reached if cancelled: the job's lease expires and it is retried
+            await self.broker.ack(job)
+        finally:
+            if heartbeat:
+                heartbeat.cancel()
+            slots.release()
+
+    async def renew_lease(self, job: TranscriptionJob):
+        """Renew a job's lease until cancelled"""
+        while True:
+            await asyncio.sleep(Config.BROKER_LEASE_SECONDS / 3)
+            try:
+                await self.broker.renew(job)
+            except Exception as e:
+                logger.error(f"Failed to renew the lease of job {job.job_id}: {e}")
+
+    async def abandon_job(self, job: TranscriptionJob, update: Update, processing_msg):
+        """Give up on a job whose earlier attempts never finished"""
+        logger.error(f"Giving up job {job.job_id}, earlier attempts never finished")
+        JOBS.inc(outcome="abandoned")
+        text = "❌ *Transcription Failed*\nThis audio could not be processed. Please try with a different file.\n\n🐛 [Report issues](https://github.com/Malith-Rukshan/whisper-transcriber-bot/issues)"
+        try:
+            if processing_msg is not None:
+                await processing_msg.edit_text(text, parse_mode="Markdown")
+            else:
+                await update.message.reply_text(text, parse_mode="Markdown")
+        except Exception as e:
+            logger.error(f"Failed to report abandoned job {job.job_id}: {e}")
+
+    def job_context(self, job: TranscriptionJob):
+        """Rebuild the Telegram objects a worker needs to answer a job"""
+        bot = self.app.bot
+        now = datetime.now(timezone.utc)
+        # Only the id matters for API calls; negative ids are groups
+        chat = Chat(job.chat_id, Chat.PRIVATE if job.chat_id > 0 else Chat.GROUP)
+        user = User(job.user_id, "", False)
+
+        message = Message(job.message_id, now, chat, from_user=user)
+        message.set_bot(bot)
+        processing_msg = None
+        if job.processing_message_id:
+            processing_msg = Message(job.processing_message_id, now, chat)
+            processing_msg.set_bot(bot)
+
+        # Documents carry no duration, which keeps them on the long-audio path
+        if job.duration is None:
+            audio_file = Document(
+                job.file_id, job.file_unique_id or job.file_id, file_size=job.file_size
+            )
+        else:
+            audio_file = Audio(
+                job.file_id,
+                job.file_unique_id or job.file_id,
+                int(job.duration),
+                file_size=job.file_size,
+            )
+        audio_file.set_bot(bot)
+        return Update(0, message=message), audio_file, processing_msg
+
+    async def process_audio(
+        self,
+        update: Update,
+        audio_file,
+        processing_msg=None,
+        preferred_model=None,
+        formats=(),
+    ):
+        """Process audio file for transcription"""
+        start_time = time.perf_counter()
+        outcome = "error"
+        try:
+            user_id = update.effective_user.id
+            model_name = self.job_model(audio_file, preferred_model, user_id)
+
+            # Forwards and re-sends keep their file_unique_id: answer without downloading
+            # (keyed by the routed model; an escalated answer is stored under it too)
+            cache_key = None
+            file_unique_id = getattr(audio_file, "file_unique_id", None)
+            if self.cache is not None and file_unique_id:
+                cache_key = file_cache_key(model_name, file_unique_id)
+                cached = self.cache.get(cache_key)
+                if cached:
+                    logger.info(
+                        f"Cached transcription for user {update.effective_user.id}"
+                    )
+                    transcript = Transcript.loads(cached)
+                    await send_long_message(
+                        update,
+                        format_transcription(transcript.text, 0.0),
+                        processing_msg,
+                        export_documents(transcript, formats),
+                    )
+                    outcome = "cached"
+                    return
+
+            # Send processing message (jobs from a frontend already have one)
+            processing_text = "🎙️ *Transcribing audio...*\n⏳ AI is working on your audio...\n🚀 Powered by OpenAI Whisper"
+            _, cost = self.estimate_job(audio_file, model_name)
+            if cost is not None:
+                processing_text += f"\n⏱️ *Estimated time:* {format_eta(cost)}"
+            if processing_msg is None:
+                processing_msg = await update.message.reply_text(
+                    processing_text, parse_mode="Markdown"
+                )
+            else:
+                await processing_msg.edit_text(processing_text, parse_mode="Markdown")
+
             logger.info(
                 f"Processing audio from user {update.effective_user.id}: {get_file_info(audio_file)}"
             )
 
-            # Get the actual file object
-            file_obj = await audio_file.get_file()
-
-            # Download audio file
-            file_path = await download_audio_file(file_obj)
-            if not file_path:
+            # Copies of a file forwarded into many chats at once share one
+            # download and transcription
+            coalesced = False
+            try:
+                if file_unique_id:
+                    result, coalesced = await self.in_flight.run(
+                        file_cache_key(model_name, file_unique_id),
+                        lambda: self.transcribe_file(
+                            audio_file, processing_msg, model_name, user_id
+                        ),
+                    )
+                else:
+                    result = await self.transcribe_file(
+                        audio_file, processing_msg, model_name, user_id
+                    )
+            except DownloadError:
                 await processing_msg.edit_text(
                     "❌ *Download Failed*\nCouldn't download your audio file. Please try again!\n\n⭐ [Star us on GitHub](https://github.com/Malith-Rukshan/whisper-transcriber-bot)",
                     parse_mode="Markdown",
                 )
+                outcome = "download_failed"
                 return
-
-            # Transcribe audio
-            result = await self.transcriber.transcribe_audio(file_path)
+            if coalesced:
+                logger.info(
+                    f"Shared an in-flight transcription with user {update.effective_user.id}"
+                )
 
             # Send result
             if result:
-                transcription, processing_time = result
-                formatted_text = format_transcription(transcription, processing_time)
-                await send_long_message(update, formatted_text, processing_msg)
+                transcript, processing_time = result
+                if transcript and not coalesced:
+                    self.record_cost(
+                        audio_file, model_name, transcript, time.perf_counter() - start_time
+                    )
+                if cache_key and transcript and not coalesced:
+                    self.cache.set(cache_key, transcript.dumps())
+                formatted_text = format_transcription(transcript.text, processing_time)
+                with STAGE_SECONDS.time(stage="send"):
+                    await send_long_message(
+                        update,
+                        formatted_text,
+                        processing_msg,
+                        export_documents(transcript, formats),
+                    )
+                outcome = "success" if transcript else "no_speech"
                 logger.info(
                     f"Transcription completed for user {update.effective_user.id} in {processing_time:.2f}s"
                 )
@@ -238,9 +808,7 @@ Give us a ⭐ on GitHub if you find this useful!
                 logger.warning(
                     f"Transcription failed for user {update.effective_user.id}"
                 )
-
-            # Clean up temp file
-            cleanup_temp_file(file_path)
+                outcome = "failed"
 
         except Exception as e:
             logger.error(f"Error processing audio: {e}")
@@ -248,22 +816,252 @@ Give us a ⭐ on GitHub if you find this useful!
                 "❌ *Processing Error*\nAn error occurred while processing your audio. Please try again.\n\n🐛 [Report issues](https://github.com/Malith-Rukshan/whisper-transcriber-bot/issues)\n⭐ [Star us on GitHub](https://github.com/Malith-Rukshan/whisper-transcriber-bot)",
                 parse_mode="Markdown",
             )
+        finally:
+            JOBS.inc(outcome=outcome)
+            JOB_SECONDS.observe(time.perf_counter() - start_time)
+
+    async def transcribe_file(
+        self, audio_file, processing_msg, model_name: str, user_id: Optional[int] = None
+    ):
+        """Download and transcribe a file: (transcript, seconds), or None if it failed
+
+        The user's last language skips detection while it is fresh, and a
+        new detection replaces it. Raises DownloadError when the file can't
+        be downloaded.
+        """
+        language = self.language_hint(user_id)
+
+        def on_language(detected: str, probability: float):
+            self.remember_language(user_id, detected, probability)
+
+        file_obj = await audio_file.get_file()
+
+        if (
+            self.should_stream(audio_file)
+            and self.is_ready()
+            and should_pipeline_download(file_obj)
+        ):
+            # Large file: the first windows are transcribed while the rest downloads
+            logger.info("Transcribing while downloading")
+            return await self.transcribe_streaming(
+                download_stream(file_obj),
+                processing_msg,
+                model_name,
+                language,
+                on_language,
+            )
+
+        # Download audio file (temp files are removed when the block exits)
+        async with downloaded_audio(file_obj) as audio:
+            if not audio:
+                raise DownloadError(f"Could not download {file_obj.file_id}")
+
+            if not self.is_ready():
+                # Started during startup: the download overlapped model loading
+                logger.info("Waiting for the model to finish loading")
+                await self.transcriber.ready.wait()
+
+            # Transcribe audio
+            if self.should_stream(audio_file):
+                return await self.transcribe_streaming(
+                    audio.source, processing_msg, model_name, language, on_language
+                )
+            return await self.transcriber.transcribe_audio(
+                audio.source, model_name, language, on_language
+            )
+
+    def estimate_job(
+        self, audio_file, model_name: str
+    ) -> Tuple[Optional[float], Optional[float]]:
+        """Audio seconds (guessed from the size of documents) and predicted job seconds"""
+        fmt = audio_format(audio_file)
+        file_size = getattr(audio_file, "file_size", None)
+        audio_seconds = self.estimator.audio_seconds(
+            fmt,
+            media_duration(audio_file),
+            file_size if isinstance(file_size, int) else None,
+        )
+        return audio_seconds, self.estimator.estimate(model_name, fmt, audio_seconds)
+
+    def job_model(self, audio_file, preferred_model=None, user_id=None) -> str:
+        """The model a job will run on (frontends go by the default routing)
+
+        Users whose last audio was confidently not English go straight to
+        the multilingual model.
+        """
+        if self.transcriber is None:
+            return preferred_model or Config.WHISPER_MODEL_NAME
+        model_name = self.transcriber.registry.route(
+            getattr(audio_file, "duration", None), preferred_model
+        )
+        language = self.language_hint(user_id)
+        if language and language != "en" and is_english_only(model_name):
+            return Config.MULTILINGUAL_MODEL
+        return model_name
+
+    def language_hint(self, user_id: Optional[int]) -> Optional[str]:
+        """The user's last language, if detection was sure of it recently"""
+        if not Config.LANGUAGE_DETECTION or user_id not in self.user_languages:
+            return None
+        language, probability, detected_at = self.user_languages[user_id]
+        if (
+            probability < Config.LANGUAGE_HINT_CONFIDENCE
+            or time.monotonic() - detected_at > Config.LANGUAGE_HINT_SECONDS
+        ):
+            return None
+        return language
+
+    def remember_language(self, user_id: Optional[int], language: str, probability: float):
+        if user_id is not None:
+            self.user_languages[user_id] = (language, probability, time.monotonic())
+
+    def record_cost(self, audio_file, model_name: str, transcript: Transcript, seconds: float):
+        """Teach the estimator how long a finished job took"""
+        fmt = audio_format(audio_file)
+        # Documents: the end of the last segment is close to the audio's length
+        audio_seconds = media_duration(audio_file) or transcript.duration
+        if not audio_seconds:
+            return
+        predicted = self.estimator.estimate(model_name, fmt, audio_seconds)
+        if predicted:
+            ESTIMATE_RATIO.observe(seconds / predicted)
+        file_size = getattr(audio_file, "file_size", None)
+        self.estimator.record(
+            model_name,
+            fmt,
+            audio_seconds,
+            seconds,
+            file_size if isinstance(file_size, int) else None,
+        )
+
+    def should_stream(self, audio_file) -> bool:
+        """Check if audio is long enough to show partial results while transcribing"""
+        if not Config.STREAMING_ENABLED:
+            return False
+        # Documents have no duration, they might be long
+        duration = getattr(audio_file, "duration", None)
+        return duration is None or duration > Config.STREAM_CHUNK_SECONDS
+
+    async def transcribe_streaming(
+        self,
+        audio_source,
+        processing_msg,
+        model_name=None,
+        language=None,
+        on_language=None,
+    ):
+        """Transcribe chunk by chunk, editing the processing message with partial text"""
+        progress = ProgressMessage(processing_msg, Config.STREAM_EDIT_INTERVAL)
+        parts = []
+        segments = []
+        start_time = time.time()
+
+        try:
+            async for segment in self.transcriber.transcribe_stream(
+                audio_source, model_name, language, on_language
+            ):
+                parts.append(segment.text)
+                segments.append(segment)
+                if progress.due():
+                    elapsed = time.time() - start_time
+                    progress.push(format_partial_transcription(parts, elapsed))
+        except Exception as e:
+            logger.error(f"Streaming transcription failed: {e}")
+            return None
+        finally:
+            await progress.close()
+
+        processing_time = time.time() - start_time
+        if not parts:
+            # VAD found no speech and skipped inference
+            return Transcript(), processing_time
+        transcript = Transcript.from_segments(segments)
+        if not transcript:
+            logger.warning("Streaming transcription returned empty result")
+            return None
+        return transcript, processing_time
+
+    async def start_webhook(self):
+        """Serve the webhook locally and register its public URL with Telegram
+
+        The webhook is left registered on shutdown, so Telegram holds updates
+        sent during a restart and delivers them once the bot is back.
+        """
+        self.webhook_server = WebhookServer(
+            self.app,
+            listen=Config.WEBHOOK_LISTEN,
+            port=Config.WEBHOOK_PORT,
+            path=Config.WEBHOOK_PATH,
+            secret_token=Config.WEBHOOK_SECRET_TOKEN or None,
+        )
+        await self.webhook_server.start()
+        await self.app.bot.set_webhook(
+            url=Config.WEBHOOK_URL,
+            secret_token=Config.WEBHOOK_SECRET_TOKEN or None,
+            max_connections=Config.WEBHOOK_MAX_CONNECTIONS,
+            allowed_updates=Update.ALL_TYPES,
+            drop_pending_updates=Config.DROP_PENDING_UPDATES,
+        )
+        logger.info(f"Webhook registered at {Config.WEBHOOK_URL}")
 
     async def run(self):
         """Run the bot"""
+        startup_start = time.perf_counter()
         try:
             Config.validate()
             logger.info(f"Starting {Config.BOT_USERNAME}...")
+            self.record_startup("validate", time.perf_counter() - startup_start)
 
-            if not self.transcriber.is_healthy():
-                raise RuntimeError("Transcriber is not ready")
+            if self.transcriber is not None:
+                # Load and warm up the model while the Telegram connection comes up
+                self.loading = asyncio.create_task(self.transcriber.start())
 
-            logger.info("Bot started successfully! Press Ctrl+C to stop.")
+            if Config.METRICS_ENABLED:
+                try:
+                    self.metrics_server = MetricsServer(
+                        Config.METRICS_HOST, Config.METRICS_PORT
+                    )
+                    await self.metrics_server.start()
+                except OSError as e:
+                    logger.error(f"Failed to start metrics server: {e}")
+                    self.metrics_server = None
 
             # Run the bot with async context manager
+            phase_start = time.perf_counter()
             async with self.app:
                 await self.app.start()
-                await self.app.updater.start_polling(drop_pending_updates=True)
+                if self.journal is not None:
+                    # Ahead of anything sent while the bot was down
+                    await self.resume_jobs()
+                # Workers only pull jobs, they never receive updates
+                if self.role == "worker":
+                    logger.info("Running as a transcription worker")
+                elif Config.RUN_MODE == "webhook":
+                    await self.start_webhook()
+                else:
+                    await self.app.updater.start_polling(
+                        drop_pending_updates=Config.DROP_PENDING_UPDATES
+                    )
+                self.record_startup("telegram", time.perf_counter() - phase_start)
+
+                # Updates are accepted from here on; jobs wait for the model
+                if self.loading is not None:
+                    await self.loading
+                    for phase, seconds in self.transcriber.startup_timings.items():
+                        self.record_startup(phase, seconds)
+                    if not self.transcriber.is_healthy():
+                        raise RuntimeError("Transcriber is not ready")
+                self.record_startup("total", time.perf_counter() - startup_start)
+                logger.info(
+                    "Bot started successfully! Press Ctrl+C to stop. Startup: "
+                    + ", ".join(
+                        f"{phase} {seconds:.2f}s"
+                        for phase, seconds in self.startup_phases.items()
+                    )
+                )
+
+                if self.broker is not None and self.role != "frontend":
+                    self.consumer = asyncio.create_task(self.consume_jobs())
 
                 # Keep the bot running
                 await asyncio.Event().wait()
@@ -273,6 +1071,24 @@ Give us a ⭐ on GitHub if you find this useful!
         except Exception as e:
             logger.error(f"Failed to start bot: {e}")
             raise
+        finally:
+            if self.loading:
+                self.loading.cancel()
+            if self.webhook_server:
+                await self.webhook_server.stop()
+            if self.metrics_server:
+                await self.metrics_server.stop()
+            if self.consumer:
+                self.consumer.cancel()
+            await self.scheduler.shutdown()
+            if self.transcriber:
+                self.transcriber.close()
+            if self.broker:
+                await self.broker.close()
+            if self.journal:
+                await self.journal.close()
+            if self.cache:
+                self.cache.close()
 
 
 def main():
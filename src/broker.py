@@ -0,0 +1,304 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import time
+import uuid
+from typing import List, Optional, Tuple
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # pragma: no cover - only needed for redis:// brokers
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptionJob:
+    """A transcription request passed from the frontend to a worker
+
+    Carries everything a worker needs to download the audio and answer in
+    the right chat: the Telegram file, the user's message and the
+    processing message to edit.
+    """
+
+    FIELDS = (
+        "job_id",
+        "user_id",
+        "chat_id",
+        "message_id",
+        "processing_message_id",
+        "file_id",
+        "file_unique_id",
+        "file_size",
+        "duration",
+        "model",
+        "formats",
+        "enqueued_at",
+    )
+
+    def __init__(
+        self,
+        user_id: int,
+        chat_id: int,
+        message_id: int,
+        file_id: str,
+        file_unique_id: Optional[str] = None,
+        file_size: Optional[int] = None,
+        duration: Optional[float] = None,
+        processing_message_id: Optional[int] = None,
+        model: Optional[str] = None,
+        formats: Optional[List[str]] = None,
+        job_id: Optional[str] = None,
+        enqueued_at: Optional[float] = None,
+    ):
+        self.job_id = job_id or uuid.uuid4().hex
+        self.user_id = user_id
+        self.chat_id = chat_id
+        self.message_id = message_id
+        self.processing_message_id = processing_message_id
+        self.file_id = file_id
+        self.file_unique_id = file_unique_id
+        self.file_size = file_size
+        self.duration = duration
+        # Model the user picked with /model (None = routed by the worker)
+        self.model = model
+        # Files to send with the text, picked with /format
+        self.formats = formats or []
+        self.enqueued_at = enqueued_at or time.time()
+        # Deliveries so far, counted by the broker (not part of the payload)
+        self.attempts = 0
+
+    @classmethod
+    def from_message(
+        cls, update, audio_file, processing_message_id=None, model=None, formats=None
+    ):
+        """Build a job from an incoming update and its voice/audio/document"""
+        return cls(
+            user_id=update.effective_user.id,
+            chat_id=update.effective_chat.id,
+            message_id=update.message.message_id,
+            file_id=audio_file.file_id,
+            file_unique_id=getattr(audio_file, "file_unique_id", None),
+            file_size=getattr(audio_file, "file_size", None),
+            duration=getattr(audio_file, "duration", None),
+            processing_message_id=processing_message_id,
+            model=model,
+            formats=formats,
+        )
+
+    def to_json(self) -> str:
+        return json.dumps({field: getattr(self, field) for field in self.FIELDS})
+
+    @classmethod
+    def from_json(cls, data: str) -> "TranscriptionJob":
+        return cls(**json.loads(data))
+
+
+class InProcessBroker:
+    """Job queue inside one process (frontend and worker in the same bot)"""
+
+    def __init__(self):
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    async def put(self, job: TranscriptionJob):
+        await self._queue.put(job)
+
+    async def get(self, timeout: float = 1.0) -> Optional[TranscriptionJob]:
+        """Take the next job, or None if none arrived within timeout"""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def ack(self, job: TranscriptionJob):
+        """Mark a job as done"""
+
+    async def renew(self, job: TranscriptionJob):
+        """Extend a job's lease while it is being worked on"""
+
+    async def size(self) -> int:
+        return self._queue.qsize()
+
+    async def close(self):
+        pass
+
+
+class SqliteBroker:
+    """Job queue in a SQLite file, shared by processes on one machine
+
+    A taken job is leased for lease_seconds and the worker renews the lease
+    while it works. If the worker dies before acknowledging the job, the
+    lease expires and another worker gets it. Every delivery is counted in
+    the job's attempts.
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 600, poll_interval: float = 0.5):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "job_id TEXT PRIMARY KEY, payload TEXT NOT NULL, "
+            "enqueued_at REAL NOT NULL, leased_until REAL NOT NULL DEFAULT 0, "
+            "attempts INTEGER NOT NULL DEFAULT 0)"
+        )
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(jobs)")]
+        if "attempts" not in columns:
+            # Queue files created before attempts were counted
+            self._db.execute(
+                "ALTER TABLE jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0"
+            )
+        self._lock = asyncio.Lock()
+
+    async def put(self, job: TranscriptionJob):
+        async with self._lock:
+            await asyncio.to_thread(
+                self._db.execute,
+                "INSERT INTO jobs (job_id, payload, enqueued_at) VALUES (?, ?, ?)",
+                (job.job_id, job.to_json(), job.enqueued_at),
+            )
+
+    def _claim(self) -> Optional[Tuple[str, int]]:
+        """Lease the oldest available job in one write transaction"""
+        now = time.time()
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._db.execute(
+                "SELECT job_id, payload, attempts FROM jobs WHERE leased_until < ? "
+                "ORDER BY enqueued_at LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is not None:
+                self._db.execute(
+                    "UPDATE jobs SET leased_until = ?, attempts = attempts + 1 "
+                    "WHERE job_id = ?",
+                    (now + self.lease_seconds, row[0]),
+                )
+            self._db.execute("COMMIT")
+        except Exception:
+            self._db.execute("ROLLBACK")
+            raise
+        return (row[1], row[2] + 1) if row else None
+
+    async def get(self, timeout: float = 1.0) -> Optional[TranscriptionJob]:
+        """Take the next job, or None if none arrived within timeout"""
+        deadline = time.monotonic() + timeout
+        while True:
+            async with self._lock:
+                claimed = await asyncio.to_thread(self._claim)
+            if claimed is not None:
+                job = TranscriptionJob.from_json(claimed[0])
+                job.attempts = claimed[1]
+                return job
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            await asyncio.sleep(min(self.poll_interval, remaining))
+
+    async def ack(self, job: TranscriptionJob):
+        async with self._lock:
+            await asyncio.to_thread(
+                self._db.execute, "DELETE FROM jobs WHERE job_id = ?", (job.job_id,)
+            )
+
+    async def renew(self, job: TranscriptionJob):
+        """Extend a job's lease while it is being worked on"""
+        async with self._lock:
+            await asyncio.to_thread(
+                self._db.execute,
+                "UPDATE jobs SET leased_until = ? WHERE job_id = ?",
+                (time.time() + self.lease_seconds, job.job_id),
+            )
+
+    async def size(self) -> int:
+        """Jobs waiting for a worker"""
+        async with self._lock:
+            row = await asyncio.to_thread(
+                lambda: self._db.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE leased_until < ?", (time.time(),)
+                ).fetchone()
+            )
+        return row[0]
+
+    async def close(self):
+        self._db.close()
+
+
+class RedisBroker:
+    """Job queue in Redis, shared by workers on any number of machines
+
+    Jobs move atomically from the queue list to a processing list when
+    taken. Taken jobs carry a lease that the worker renews while it works;
+    expired leases are returned to the queue so a crashed worker's jobs are
+    retried elsewhere. Deliveries per job are counted in a hash.
+    """
+
+    def __init__(self, url: str, name: str = "transcriber", lease_seconds: float = 600):
+        if redis is None:
+            raise RuntimeError("redis:// brokers need the 'redis' package installed")
+        self.lease_seconds = lease_seconds
+        self.queue_key = f"{name}:jobs"
+        self.processing_key = f"{name}:processing"
+        self.leases_key = f"{name}:leases"
+        self.attempts_key = f"{name}:attempts"
+        self._redis = redis.from_url(url, decode_responses=True)
+
+    async def put(self, job: TranscriptionJob):
+        await self._redis.lpush(self.queue_key, job.to_json())
+
+    async def _requeue_expired(self):
+        """Return jobs whose worker stopped renewing the lease"""
+        expired = await self._redis.zrangebyscore(self.leases_key, 0, time.time())
+        for payload in expired:
+            if await self._redis.lrem(self.processing_key, 1, payload):
+                await self._redis.rpush(self.queue_key, payload)
+            await self._redis.zrem(self.leases_key, payload)
+
+    async def get(self, timeout: float = 1.0) -> Optional[TranscriptionJob]:
+        """Take the next job, or None if none arrived within timeout"""
+        await self._requeue_expired()
+        payload = await self._redis.blmove(
+            self.queue_key, self.processing_key, timeout, "RIGHT", "LEFT"
+        )
+        if payload is None:
+            return None
+        await self._redis.zadd(
+            self.leases_key, {payload: time.time() + self.lease_seconds}
+        )
+        job = TranscriptionJob.from_json(payload)
+        job.attempts = await self._redis.hincrby(self.attempts_key, job.job_id, 1)
+        return job
+
+    async def ack(self, job: TranscriptionJob):
+        payload = job.to_json()
+        await self._redis.lrem(self.processing_key, 1, payload)
+        await self._redis.zrem(self.leases_key, payload)
+        await self._redis.hdel(self.attempts_key, job.job_id)
+
+    async def renew(self, job: TranscriptionJob):
+        """Extend a job's lease while it is being worked on"""
+        await self._redis.zadd(
+            self.leases_key,
+            {job.to_json(): time.time() + self.lease_seconds},
+            xx=True,
+        )
+
+    async def size(self) -> int:
+        return await self._redis.llen(self.queue_key)
+
+    async def close(self):
+        await self._redis.aclose()
+
+
+def create_broker(url: str, lease_seconds: float = 600):
+    """Create a broker from a URL: memory://, sqlite:///path or redis://host"""
+    if url.startswith("memory://"):
+        return InProcessBroker()
+    if url.startswith("sqlite:///"):
+        return SqliteBroker(url[len("sqlite:///") :], lease_seconds=lease_seconds)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBroker(url, lease_seconds=lease_seconds)
+    raise ValueError(f"Unsupported BROKER_URL: {url}")
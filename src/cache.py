@@ -0,0 +1,213 @@
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from metrics import CACHE_LOOKUPS, COALESCED_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+
+def file_cache_key(model_name: str, file_unique_id: str) -> str:
+    """Key for a Telegram file, stable across forwards and re-sends"""
+    return f"{model_name}:file:{file_unique_id}"
+
+
+def pcm_hasher():
+    """Hash for audio_cache_key, to feed PCM block by block as it is decoded"""
+    return hashlib.blake2b(digest_size=16)
+
+
+def audio_cache_key(model_name: str, audio) -> str:
+    """Key for decoded PCM, catching the same audio uploaded as a new file
+
+    audio is the PCM, or a pcm_hasher() that was fed all of it.
+    """
+    if isinstance(audio, np.ndarray):
+        hasher = pcm_hasher()
+        hasher.update(audio.tobytes())
+    else:
+        hasher = audio
+    return f"{model_name}:pcm:{hasher.hexdigest()}"
+
+
+class SingleFlight:
+    """Runs identical concurrent work once, sharing the result
+
+    The first caller for a key runs the work; callers that ask for the
+    same key while it is in flight wait for that run and get its result
+    (or its exception). The key is dropped when the run finishes, so later
+    callers are left to the cache. A waiting caller that is cancelled
+    doesn't cancel the shared run.
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._flights: Dict[str, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def run(self, key: str, work: Callable[[], Awaitable]) -> Tuple[Any, bool]:
+        """Result of work() for key, and whether it came from another caller's run"""
+        flight = self._flights.get(key)
+        if flight is not None:
+            self.coalesced += 1
+            COALESCED_REQUESTS.inc()
+            return await asyncio.shield(flight), True
+
+        flight = asyncio.ensure_future(work())
+        self._flights[key] = flight
+        flight.add_done_callback(lambda _: self._forget(key, flight))
+        return await flight, False
+
+    def _forget(self, key: str, flight: asyncio.Task):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+
+class TranscriptionCache:
+    """Two-tier transcription cache: in-memory LRU plus optional SQLite
+
+    Entries expire after ttl_seconds. The memory tier holds at most
+    max_entries, the SQLite tier at most max_db_entries (least recently
+    used entries are evicted first). A hit in SQLite is promoted to memory.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl_seconds: float = 7 * 24 * 3600,
+        db_path: Optional[str] = None,
+        max_db_entries: int = 100000,
+    ):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.max_db_entries = max(1, max_db_entries)
+
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            self._open_db(db_path)
+
+    def _open_db(self, db_path: str):
+        """Open (and create) the SQLite tier"""
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS transcriptions ("
+            "key TEXT PRIMARY KEY, text TEXT NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS transcriptions_accessed "
+            "ON transcriptions (accessed)"
+        )
+        self._db.commit()
+        logger.info(f"Transcription cache database: {db_path}")
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a cached transcription, or None"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                text, created = entry
+                if now - created < self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    CACHE_LOOKUPS.inc(result="hit")
+                    return text
+                del self._memory[key]
+
+            text = self._db_get(key, now)
+            if text is not None:
+                self.hits += 1
+                self.disk_hits += 1
+                CACHE_LOOKUPS.inc(result="hit")
+                return text
+
+            self.misses += 1
+            CACHE_LOOKUPS.inc(result="miss")
+            return None
+
+    def set(self, key: str, text: str):
+        """Store a transcription in every tier"""
+        now = time.time()
+        with self._lock:
+            self._memory_put(key, text, now)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO transcriptions VALUES (?, ?, ?, ?)",
+                        (key, text, now, now),
+                    )
+                    self._evict_db(now)
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.error(f"Failed to write transcription cache: {e}")
+
+    def _memory_put(self, key: str, text: str, created: float):
+        self._memory[key] = (text, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _db_get(self, key: str, now: float) -> Optional[str]:
+        """Look up the SQLite tier and promote a hit to memory"""
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute(
+                "SELECT text, created FROM transcriptions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            text, created = row
+            if now - created >= self.ttl_seconds:
+                self._db.execute("DELETE FROM transcriptions WHERE key = ?", (key,))
+                self._db.commit()
+                return None
+
+            self._db.execute(
+                "UPDATE transcriptions SET accessed = ? WHERE key = ?", (now, key)
+            )
+            self._db.commit()
+            self._memory_put(key, text, created)
+            return text
+        except sqlite3.Error as e:
+            logger.error(f"Failed to read transcription cache: {e}")
+            return None
+
+    def _evict_db(self, now: float):
+        """Drop expired rows and the least recently used rows over the limit"""
+        self._db.execute(
+            "DELETE FROM transcriptions WHERE created < ?", (now - self.ttl_seconds,)
+        )
+        self._db.execute(
+            "DELETE FROM transcriptions WHERE key IN ("
+            "SELECT key FROM transcriptions ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+            (self.max_db_entries,),
+        )
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def close(self):
+        """Close the SQLite tier"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
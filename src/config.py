@@ -1,22 +1,91 @@
+import json
+import logging
 import os
+from typing import Any, Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
 
+from models import is_english_only
+from segments import EXPORT_FORMATS
+
 load_dotenv()
 
+logger = logging.getLogger(__name__)
 
-def get_model_path():
-    """Get the correct model path based on current working directory"""
-    env_path = os.getenv("WHISPER_MODEL_PATH")
-    if env_path:
+# Settings autotune.py may choose; an environment variable still wins
+TUNED_SETTINGS = (
+    "WHISPER_MODEL_NAME",
+    "WHISPER_MODEL_PATH",
+    "INFERENCE_WORKERS",
+    "WHISPER_THREADS",
+)
+
+
+def load_tuning(path: str) -> Dict[str, Any]:
+    """Read the settings autotune.py picked for this host (empty if none)
+
+    A file tuned on a host with a different core count is ignored, so a
+    copied models/ directory doesn't carry another machine's thread split.
+    """
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path) as f:
+            tuning = json.load(f)
+        settings = tuning["settings"]
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Ignoring unreadable tuning file {path}: {e}")
+        return {}
+    cpus = tuning.get("host", {}).get("cpus")
+    if cpus != os.cpu_count():
+        logger.warning(
+            f"Ignoring {path}: tuned for {cpus} CPUs, this host has {os.cpu_count()}"
+        )
+        return {}
+    return {name: settings[name] for name in TUNED_SETTINGS if name in settings}
+
+
+TUNING_PATH = os.getenv("TUNING_PATH", "models/autotune.json")
+TUNING = load_tuning(TUNING_PATH)
+
+
+def get_setting(name: str, default: Optional[str] = None) -> Optional[str]:
+    """An environment variable, else the tuned value for this host, else default"""
+    value = os.getenv(name)
+    if value is None and name in TUNING:
+        value = str(TUNING[name])
+    return default if value is None else value
+
+
+def model_name_from_path(path: str) -> str:
+    """Model name from a whisper.cpp file name, e.g. ggml-base.en-q5_1.bin -> base.en-q5_1"""
+    name = os.path.basename(path)
+    if name.startswith("ggml-"):
+        name = name[len("ggml-"):]
+    if name.endswith(".bin"):
+        name = name[: -len(".bin")]
+    return name
+
+
+def get_model_path(name: Optional[str] = None):
+    """Get the correct model path based on current working directory
+
+    Without a name this is the default model (WHISPER_MODEL_PATH). Named
+    models are looked up as ggml-<name>.bin next to the default model.
+    """
+    env_path = get_setting("WHISPER_MODEL_PATH")
+    if env_path and name is None:
         return env_path
 
+    filename = f"ggml-{name or 'base.en'}.bin"
     # Try different possible paths
     possible_paths = [
-        "models/ggml-base.en.bin",  # Docker container
-        "../models/ggml-base.en.bin",  # Running from src/
-        "./models/ggml-base.en.bin",  # Running from root
+        f"models/{filename}",  # Docker container
+        f"../models/{filename}",  # Running from src/
+        f"./models/{filename}",  # Running from root
     ]
+    if env_path:
+        possible_paths.insert(0, os.path.join(os.path.dirname(env_path), filename))
 
     for path in possible_paths:
         if os.path.exists(path):
@@ -26,17 +95,179 @@ def get_model_path():
     return possible_paths[0]
 
 
+def get_model_paths(default_name: str, default_path: str) -> Dict[str, str]:
+    """Get the models that can be used, from WHISPER_MODELS
+
+    Comma separated model names ("tiny.en,small.en") or name=path pairs.
+    The default model is always included.
+    """
+    models = {default_name: default_path}
+    for entry in os.getenv("WHISPER_MODELS", "").split(","):
+        name, _, path = entry.partition("=")
+        name = name.strip()
+        if name and name not in models:
+            models[name] = path.strip() or get_model_path(name)
+    return models
+
+
+def get_model_routes() -> List[Tuple[float, str]]:
+    """Get duration routes from MODEL_ROUTES, e.g. "10:tiny.en,120:base.en"
+
+    Audio up to the given seconds is transcribed with that model; longer
+    audio falls through to the next route and finally the default model.
+    """
+    routes = []
+    for entry in os.getenv("MODEL_ROUTES", "").split(","):
+        if entry.strip():
+            seconds, _, name = entry.partition(":")
+            routes.append((float(seconds), name.strip()))
+    return sorted(routes)
+
+
+def get_thread_budget(workers: int) -> int:
+    """Get whisper threads per worker, splitting the host's cores between workers"""
+    env_threads = get_setting("WHISPER_THREADS")
+    if env_threads:
+        return int(env_threads)
+
+    cores = os.cpu_count() or 1
+    return max(1, min(6, cores // max(1, workers)))
+
+
 class Config:
     # Telegram Bot Settings
     TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
     BOT_USERNAME = os.getenv("BOT_USERNAME", "TranscriberXBOT")
+    # Bot API server, e.g. a local telegram-bot-api or a test fake (empty = official)
+    TELEGRAM_API_BASE_URL = os.getenv("TELEGRAM_API_BASE_URL", "")
+
+    # Deployment role: "all" (one process does everything), "frontend"
+    # (receives updates, queues jobs) or "worker" (transcribes queued jobs)
+    ROLE = os.getenv("ROLE", "all").lower()
+    # Job broker between frontends and workers: memory://, sqlite:///path or
+    # redis://host:6379/0 (empty = no broker, jobs run in this process)
+    BROKER_URL = os.getenv("BROKER_URL", "")
+    # Seconds a taken job stays leased; workers renew it while they work
+    BROKER_LEASE_SECONDS = int(os.getenv("BROKER_LEASE_SECONDS", "120"))
+    # Deliveries before a job that keeps failing its worker is given up
+    BROKER_MAX_ATTEMPTS = int(os.getenv("BROKER_MAX_ATTEMPTS", "3"))
+
+    # Update Delivery: "polling" or "webhook"
+    RUN_MODE = os.getenv("RUN_MODE", "polling").lower()
+    WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")  # public HTTPS URL Telegram posts to
+    WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "0.0.0.0")
+    WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8443"))
+    WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/telegram")
+    WEBHOOK_SECRET_TOKEN = os.getenv("WEBHOOK_SECRET_TOKEN", "")
+    WEBHOOK_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "40"))
+    # Keep updates sent while the bot was down (true skips that backlog)
+    DROP_PENDING_UPDATES = os.getenv("DROP_PENDING_UPDATES", "false").lower() == "true"
+    # Accepted jobs are journaled here and resumed after a restart (empty = off)
+    JOURNAL_PATH = os.getenv("JOURNAL_PATH", "")
+    JOURNAL_MAX_ATTEMPTS = int(os.getenv("JOURNAL_MAX_ATTEMPTS", "3"))
 
     # Whisper Model Settings
+    # WHISPER_MODEL_*, INFERENCE_WORKERS and WHISPER_THREADS fall back to
+    # the values `python src/autotune.py` saved in TUNING_PATH for this host
     WHISPER_MODEL_PATH = get_model_path()
-    WHISPER_MODEL_NAME = os.getenv("WHISPER_MODEL_NAME", "base.en")
+    # Quantized files (ggml-base.en-q5_1.bin) work like any other; the name
+    # defaults to the one in the file name
+    WHISPER_MODEL_NAME = get_setting(
+        "WHISPER_MODEL_NAME", model_name_from_path(WHISPER_MODEL_PATH)
+    )
+    # Extra models loaded on first use, e.g. "tiny.en,small.en"
+    WHISPER_MODELS = get_model_paths(WHISPER_MODEL_NAME, WHISPER_MODEL_PATH)
+    # Unload idle extra models above this estimate (0 = never unload)
+    MODEL_MEMORY_BUDGET_MB = int(os.getenv("MODEL_MEMORY_BUDGET_MB", "0"))
+    # Route by duration, e.g. "10:tiny.en" sends clips up to 10 s to tiny.en
+    MODEL_ROUTES = get_model_routes()
+    # Run a short silent clip through every worker before taking jobs
+    WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+    # Re-transcribe short audio with this model when confidence is low
+    ESCALATION_MODEL = os.getenv("ESCALATION_MODEL", "")
+    ESCALATION_MIN_CONFIDENCE = float(os.getenv("ESCALATION_MIN_CONFIDENCE", "0.6"))
+
+    # Language Detection: the first seconds of speech decide whether an
+    # English-only (.en) model keeps the audio or MULTILINGUAL_MODEL takes it
+    LANGUAGE_DETECTION = os.getenv("LANGUAGE_DETECTION", "false").lower() == "true"
+    MULTILINGUAL_MODEL = os.getenv("MULTILINGUAL_MODEL", "base")
+    LANGUAGE_DETECT_SECONDS = float(os.getenv("LANGUAGE_DETECT_SECONDS", "10"))
+    # Less sure than this, whisper is left to pick the language itself
+    LANGUAGE_MIN_CONFIDENCE = float(os.getenv("LANGUAGE_MIN_CONFIDENCE", "0.5"))
+    # A user's last language is reused without detecting when it was this
+    # sure, for this many seconds
+    LANGUAGE_HINT_CONFIDENCE = float(os.getenv("LANGUAGE_HINT_CONFIDENCE", "0.9"))
+    LANGUAGE_HINT_SECONDS = int(os.getenv("LANGUAGE_HINT_SECONDS", "600"))
+
+    # Inference Settings
+    INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "thread")  # thread or process
+    INFERENCE_WORKERS = int(get_setting("INFERENCE_WORKERS", "1"))
+    WHISPER_THREADS = get_thread_budget(INFERENCE_WORKERS)
+    # Process backend: load the model once and share its pages between workers
+    SHARE_MODEL_MEMORY = os.getenv("SHARE_MODEL_MEMORY", "true").lower() == "true"
+
+    # Dynamic Batching (short clips arriving together share one whisper call)
+    BATCHING_ENABLED = os.getenv("BATCHING_ENABLED", "false").lower() == "true"
+    BATCH_MAX_SIZE = int(os.getenv("BATCH_MAX_SIZE", "4"))
+    BATCH_MAX_WAIT_MS = int(os.getenv("BATCH_MAX_WAIT_MS", "50"))
+    BATCH_MAX_CLIP_SECONDS = int(os.getenv("BATCH_MAX_CLIP_SECONDS", "15"))
+
+    # Audio Decoding
+    FFMPEG_PROCESSES = int(os.getenv("FFMPEG_PROCESSES", "2"))
+
+    # Job Scheduling
+    MAX_CONCURRENT_TRANSCRIPTIONS = int(
+        os.getenv("MAX_CONCURRENT_TRANSCRIPTIONS", str(INFERENCE_WORKERS * 2))
+    )
+    MAX_QUEUED_JOBS = int(os.getenv("MAX_QUEUED_JOBS", "100"))
+    MAX_QUEUED_JOBS_PER_USER = int(os.getenv("MAX_QUEUED_JOBS_PER_USER", "10"))
+    SHORT_AUDIO_SECONDS = int(os.getenv("SHORT_AUDIO_SECONDS", "60"))
+    # Jobs predicted to take longer than this are refused (0 = no limit)
+    MAX_JOB_SECONDS = int(os.getenv("MAX_JOB_SECONDS", "0"))
+
+    # Streaming Transcription
+    STREAMING_ENABLED = os.getenv("STREAMING_ENABLED", "true").lower() == "true"
+    STREAM_CHUNK_SECONDS = int(os.getenv("STREAM_CHUNK_SECONDS", "30"))
+    STREAM_EDIT_INTERVAL = float(os.getenv("STREAM_EDIT_INTERVAL", "3"))
+    CHUNK_OVERLAP_SECONDS = float(os.getenv("CHUNK_OVERLAP_SECONDS", "1"))
+
+    # Subtitle/data files sent with every transcription, unless a user picks
+    # their own with /format (srt, vtt, json)
+    EXPORT_FORMATS = [
+        fmt.strip().lower()
+        for fmt in os.getenv("EXPORT_FORMATS", "").split(",")
+        if fmt.strip()
+    ]
+
+    # Voice Activity Detection (silence is trimmed before inference)
+    VAD_ENABLED = os.getenv("VAD_ENABLED", "true").lower() == "true"
+
+    # Transcription Cache
+    CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1000"))
+    CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", "")  # empty disables the disk tier
+    CACHE_DB_MAX_ENTRIES = int(os.getenv("CACHE_DB_MAX_ENTRIES", "100000"))
+
+    # Outbound Rate Limiting (Telegram flood limits)
+    OUTBOUND_RATE_LIMIT = os.getenv("OUTBOUND_RATE_LIMIT", "true").lower() == "true"
+    OUTBOUND_GLOBAL_PER_SECOND = float(os.getenv("OUTBOUND_GLOBAL_PER_SECOND", "30"))
+    OUTBOUND_CHAT_PER_SECOND = float(os.getenv("OUTBOUND_CHAT_PER_SECOND", "1"))
+    OUTBOUND_GROUP_PER_MINUTE = float(os.getenv("OUTBOUND_GROUP_PER_MINUTE", "20"))
+    OUTBOUND_MAX_RETRIES = int(os.getenv("OUTBOUND_MAX_RETRIES", "3"))
+
+    # Metrics (Prometheus text format on http://METRICS_HOST:METRICS_PORT/metrics)
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+    METRICS_PORT = int(os.getenv("METRICS_PORT", "9464"))
 
     # Bot Limits
     MAX_AUDIO_SIZE_MB = int(os.getenv("MAX_AUDIO_SIZE_MB", "50"))
+    IN_MEMORY_DOWNLOAD_MAX_MB = int(os.getenv("IN_MEMORY_DOWNLOAD_MAX_MB", "20"))
+    # Large files are decoded and transcribed while they download
+    PIPELINED_DOWNLOAD = os.getenv("PIPELINED_DOWNLOAD", "true").lower() == "true"
+    PIPELINE_MIN_MB = int(os.getenv("PIPELINE_MIN_MB", "10"))
+    PIPELINE_BUFFER_MB = int(os.getenv("PIPELINE_BUFFER_MB", "4"))
     SUPPORTED_FORMATS = os.getenv("SUPPORTED_FORMATS", "mp3,m4a,wav,ogg,flac").split(
         ","
     )
@@ -48,15 +279,63 @@ class Config:
     def validate(cls):
         if not cls.TELEGRAM_BOT_TOKEN:
             raise ValueError("TELEGRAM_BOT_TOKEN is required")
-        # Check if the downloaded model file exists
-        if not os.path.exists(cls.WHISPER_MODEL_PATH):
-            # Provide detailed error for debugging
+        if cls.INFERENCE_BACKEND not in ("thread", "process"):
+            raise ValueError(
+                f"INFERENCE_BACKEND must be 'thread' or 'process', got '{cls.INFERENCE_BACKEND}'"
+            )
+        if cls.ROLE not in ("all", "frontend", "worker"):
+            raise ValueError(
+                f"ROLE must be 'all', 'frontend' or 'worker', got '{cls.ROLE}'"
+            )
+        if cls.ROLE != "all" and (
+            not cls.BROKER_URL or cls.BROKER_URL.startswith("memory://")
+        ):
+            raise ValueError(
+                f"ROLE '{cls.ROLE}' needs a shared BROKER_URL (sqlite:/// or redis://)"
+            )
+        if cls.RUN_MODE not in ("polling", "webhook"):
+            raise ValueError(
+                f"RUN_MODE must be 'polling' or 'webhook', got '{cls.RUN_MODE}'"
+            )
+        if cls.RUN_MODE == "webhook" and not cls.WEBHOOK_URL:
+            raise ValueError("WEBHOOK_URL is required when RUN_MODE is 'webhook'")
+        for _, name in cls.MODEL_ROUTES:
+            if name not in cls.WHISPER_MODELS:
+                raise ValueError(
+                    f"MODEL_ROUTES uses '{name}', which is not in WHISPER_MODELS"
+                )
+        if cls.ESCALATION_MODEL and cls.ESCALATION_MODEL not in cls.WHISPER_MODELS:
+            raise ValueError(
+                f"ESCALATION_MODEL '{cls.ESCALATION_MODEL}' is not in WHISPER_MODELS"
+            )
+        if cls.LANGUAGE_DETECTION:
+            if cls.MULTILINGUAL_MODEL not in cls.WHISPER_MODELS:
+                raise ValueError(
+                    f"MULTILINGUAL_MODEL '{cls.MULTILINGUAL_MODEL}' is not in WHISPER_MODELS"
+                )
+            if is_english_only(cls.MULTILINGUAL_MODEL):
+                raise ValueError(
+                    f"MULTILINGUAL_MODEL '{cls.MULTILINGUAL_MODEL}' only knows English"
+                )
+        for fmt in cls.EXPORT_FORMATS:
+            if fmt not in EXPORT_FORMATS:
+                raise ValueError(
+                    f"EXPORT_FORMATS must be from {', '.join(EXPORT_FORMATS)}, got '{fmt}'"
+                )
+        # Check if the downloaded model file exists (frontends load no model)
+        if cls.ROLE != "frontend" and not os.path.exists(cls.WHISPER_MODEL_PATH):
+            # Provide detailed error for debugging (only the model directory is
+            # listed; walking the whole working tree can take minutes)
             cwd = os.getcwd()
-            available_files = []
-            for root, _, files in os.walk("."):
-                for file in files:
-                    if "ggml-base.en.bin" in file:
-                        available_files.append(os.path.join(root, file))
+            model_dir = os.path.dirname(cls.WHISPER_MODEL_PATH) or "."
+            try:
+                available_files = sorted(
+                    os.path.join(model_dir, name)
+                    for name in os.listdir(model_dir)
+                    if name.startswith("ggml-") and name.endswith(".bin")
+                )
+            except OSError:
+                available_files = []
 
             error_msg = f"""
 Whisper model file not found: {cls.WHISPER_MODEL_PATH}
@@ -69,3 +348,14 @@ Troubleshooting:
 3. Check WHISPER_MODEL_PATH environment variable
 """
             raise ValueError(error_msg)
+        if cls.ROLE != "frontend":
+            missing = [
+                f"{name} ({path})"
+                for name, path in cls.WHISPER_MODELS.items()
+                if name != cls.WHISPER_MODEL_NAME and not os.path.exists(path)
+            ]
+            if missing:
+                raise ValueError(
+                    f"Model files not found: {', '.join(missing)}. "
+                    f"Run './download_model.sh <name>' to download them"
+                )
@@ -0,0 +1,138 @@
+import logging
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Processing seconds per audio second before any job has finished
+DEFAULT_RTF = 0.15
+
+# Typical bitrates (bytes per audio second) for files without a duration:
+# 32 kbit/s Opus voice notes, 128 kbit/s MP3/AAC, 16-bit 44.1 kHz WAV
+DEFAULT_BYTES_PER_SECOND = {
+    "ogg": 4000,
+    "opus": 4000,
+    "mp3": 16000,
+    "m4a": 16000,
+    "wav": 176400,
+    "flac": 90000,
+}
+FALLBACK_BYTES_PER_SECOND = 16000
+
+# Weight kept by older jobs each time a new one is recorded
+DECAY = 0.95
+
+# A bitrate sample moves the learned value this far towards it
+BITRATE_WEIGHT = 0.2
+
+
+class _Fit:
+    """Least-squares line of processing seconds over audio seconds
+
+    Older samples fade by DECAY so the fit follows load and hardware
+    changes. The intercept captures per-job overhead (download, model
+    setup) and the slope the real-time factor.
+    """
+
+    __slots__ = ("n", "sx", "sy", "sxx", "sxy")
+
+    def __init__(self):
+        self.n = self.sx = self.sy = self.sxx = self.sxy = 0.0
+
+    def add(self, x: float, y: float):
+        self.n = self.n * DECAY + 1
+        self.sx = self.sx * DECAY + x
+        self.sy = self.sy * DECAY + y
+        self.sxx = self.sxx * DECAY + x * x
+        self.sxy = self.sxy * DECAY + x * y
+
+    @property
+    def rtf(self) -> float:
+        """Processing seconds per audio second, overhead included"""
+        return self.sy / self.sx if self.sx else DEFAULT_RTF
+
+    def predict(self, x: float) -> float:
+        variance = self.n * self.sxx - self.sx * self.sx
+        if self.n >= 2 and variance > 1e-9 * self.n * self.sxx:
+            slope = (self.n * self.sxy - self.sx * self.sy) / variance
+            intercept = (self.sy - slope * self.sx) / self.n
+            if slope > 0 and intercept >= 0:
+                return intercept + slope * x
+        # One length seen so far (or a noisy fit): scale by the mean ratio
+        return self.rtf * x
+
+
+class CostEstimator:
+    """Predicts how long a job will take from its metadata, before download
+
+    Learns from finished jobs, per model, thread count and format, how
+    processing time grows with audio length. Files without a duration
+    (documents) get one from their size and the format's bitrate, which
+    is learned from files that have both.
+    """
+
+    def __init__(self, threads: int):
+        self.threads = threads
+        self._fits: Dict[Tuple[str, int, str], _Fit] = {}
+        self._bitrates: Dict[str, float] = {}
+
+    def audio_seconds(
+        self, fmt: str, duration: Optional[float], file_size: Optional[int]
+    ) -> Optional[float]:
+        """The audio's length, or a guess from its size"""
+        if duration:
+            return float(duration)
+        if not file_size:
+            return None
+        bitrate = self._bitrates.get(fmt) or DEFAULT_BYTES_PER_SECOND.get(
+            fmt, FALLBACK_BYTES_PER_SECOND
+        )
+        return file_size / bitrate
+
+    def estimate(self, model: str, fmt: str, audio_seconds: Optional[float]) -> Optional[float]:
+        """Predicted seconds to transcribe audio_seconds of audio (None if unknown)"""
+        if audio_seconds is None:
+            return None
+        fit = self._fits.get((model, self.threads, fmt))
+        if fit is not None:
+            return fit.predict(audio_seconds)
+        # New format: go by the model's other formats
+        rtf = self.rtf(model)
+        return (DEFAULT_RTF if rtf is None else rtf) * audio_seconds
+
+    def record(
+        self,
+        model: str,
+        fmt: str,
+        audio_seconds: float,
+        seconds: float,
+        file_size: Optional[int] = None,
+    ):
+        """Learn from a finished job"""
+        if audio_seconds <= 0:
+            return
+        self._fits.setdefault((model, self.threads, fmt), _Fit()).add(
+            audio_seconds, seconds
+        )
+        if file_size:
+            bitrate = file_size / audio_seconds
+            learned = self._bitrates.get(fmt)
+            self._bitrates[fmt] = (
+                bitrate
+                if learned is None
+                else learned + BITRATE_WEIGHT * (bitrate - learned)
+            )
+        logger.debug(
+            f"{model}/{fmt}: {audio_seconds:.1f}s audio took {seconds:.1f}s "
+            f"(RTF {seconds / audio_seconds:.2f})"
+        )
+
+    def rtf(self, model: str) -> Optional[float]:
+        """Learned real-time factor of a model over all formats (None if unseen)"""
+        fits = [
+            fit
+            for (name, threads, _), fit in self._fits.items()
+            if name == model and threads == self.threads
+        ]
+        if not fits:
+            return None
+        return sum(fit.sy for fit in fits) / sum(fit.sx for fit in fits)
@@ -0,0 +1,285 @@
+import asyncio
+import functools
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Model owned by the current worker process (process backend only)
+_worker_model = None
+_ready_barrier = None
+
+# Model the forkserver loads before forking workers, as JSON {factory, args}
+PRELOAD_ENV = "TRANSCRIBER_PRELOAD_MODEL"
+# Set once a model has been handed to the forkserver (it starts only once)
+_preload_key = None
+
+
+class InferenceExecutor:
+    """Run blocking model calls on a dedicated worker pool"""
+
+    def __init__(self, models: List[Any]):
+        if not models:
+            raise ValueError("InferenceExecutor needs at least one model")
+
+        # Each worker thread checks out its own model, so a whisper
+        # context is never used by two threads at the same time
+        self._models = queue.Queue()
+        for model in models:
+            self._models.put(model)
+
+        self.workers = len(models)
+        self.in_flight = 0
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="whisper-inference"
+        )
+        logger.info(f"Inference executor started with {self.workers} worker(s)")
+
+    def _call_with_model(self, fn: Callable, args: tuple, kwargs: dict):
+        """Run fn with a checked-out model (executes on a worker thread)"""
+        model = self._models.get()
+        try:
+            return fn(model, *args, **kwargs)
+        finally:
+            self._models.put(model)
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """Run fn(model, *args, **kwargs) on the pool and await its result"""
+        loop = asyncio.get_running_loop()
+        self.in_flight += 1
+        try:
+            return await loop.run_in_executor(
+                self._pool,
+                functools.partial(self._call_with_model, fn, args, kwargs),
+            )
+        finally:
+            self.in_flight -= 1
+
+    def is_healthy(self) -> bool:
+        """Check if the pool can accept work"""
+        return self._pool is not None
+
+    def worker_pids(self) -> List[int]:
+        """Processes holding this pool's models (all threads share this one)"""
+        return [os.getpid()] if self._pool is not None else []
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker pool"""
+        if self._pool:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+            logger.info("Inference executor stopped")
+
+
+def _factory_key(model_factory: Callable, factory_args: tuple) -> str:
+    return json.dumps(
+        {
+            "factory": f"{model_factory.__module__}:{model_factory.__qualname__}",
+            "args": list(factory_args),
+        }
+    )
+
+
+def _init_worker(model_factory: Callable, factory_args: tuple, ready_barrier):
+    """Load this worker process's own model, or take the forkserver's copy"""
+    global _worker_model, _ready_barrier
+    # Only present in children of a forkserver that preloaded it; never
+    # imported here, since importing it loads the model
+    shared = sys.modules.get("shared_model")
+    if shared is not None and shared.KEY == _factory_key(model_factory, factory_args):
+        _worker_model = shared.MODEL
+    else:
+        _worker_model = model_factory(*factory_args)
+    _ready_barrier = ready_barrier
+
+
+def _call_in_worker(fn: Callable, args: tuple, kwargs: dict):
+    """Run fn with the worker process's model"""
+    return fn(_worker_model, *args, **kwargs)
+
+
+def _report_ready(timeout: float) -> int:
+    """Block until every worker has loaded its model, then return this pid"""
+    _ready_barrier.wait(timeout)
+    return os.getpid()
+
+
+class ProcessInferenceExecutor:
+    """Run blocking model calls on a pool of processes, one model per process
+
+    Jobs are pickled onto the pool's call queue, so ``fn`` and its arguments
+    must be module-level functions and picklable values. If a worker dies
+    (for example whisper.cpp crashing on bad audio) the job it was running
+    fails and the pool is rebuilt for the jobs that follow. Jobs arriving
+    during a rebuild wait for it; a rebuild that fails is retried with
+    backoff, and again by the next job if every attempt failed.
+
+    With share_memory the model is loaded once, in the forkserver, and the
+    workers are forked from it. Inference only reads the weights, so their
+    pages stay shared copy-on-write between all workers instead of each
+    worker holding a private copy. Only the first pool created with
+    share_memory can preload (the forkserver starts once); later ones
+    fall back to loading per worker.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        model_factory: Callable,
+        factory_args: tuple = (),
+        start_timeout: float = 300,
+        restart_attempts: int = 3,
+        restart_backoff: float = 1.0,
+        share_memory: bool = False,
+    ):
+        if workers < 1:
+            raise ValueError("ProcessInferenceExecutor needs at least one worker")
+
+        self.workers = workers
+        self.in_flight = 0
+        self.restarts = 0
+        self._model_factory = model_factory
+        self._factory_args = factory_args
+        self._start_timeout = start_timeout
+        self._restart_attempts = max(1, restart_attempts)
+        self._restart_backoff = restart_backoff
+        # Set while the current pool is broken and could not be replaced yet
+        self._broken: Optional[ProcessPoolExecutor] = None
+        self._pids: List[int] = []
+        self._context = multiprocessing.get_context("spawn")
+        if share_memory and "forkserver" in multiprocessing.get_all_start_methods():
+            self._context = multiprocessing.get_context("forkserver")
+            _preload_in_forkserver(self._context, model_factory, factory_args)
+        self._restart_lock = asyncio.Lock()
+        self._pool = self._start_pool()
+        logger.info(f"Inference process pool started with {workers} worker(s)")
+
+    def _start_pool(self) -> ProcessPoolExecutor:
+        """Start all workers and wait until each one has loaded its model"""
+        barrier = self._context.Barrier(self.workers)
+        pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=self._context,
+            initializer=_init_worker,
+            initargs=(self._model_factory, self._factory_args, barrier),
+        )
+
+        # One blocking task per worker: spawn children are only created on
+        # demand, and the barrier makes every one of them start and load
+        futures = [
+            pool.submit(_report_ready, self._start_timeout) for _ in range(self.workers)
+        ]
+        try:
+            pids = {future.result() for future in futures}
+        except Exception:
+            # Release workers still waiting for the one that failed
+            barrier.abort()
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise RuntimeError("Inference worker failed to load its model")
+
+        if len(pids) != self.workers:
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise RuntimeError(
+                f"Expected {self.workers} inference workers, {len(pids)} started"
+            )
+        self._pids = sorted(pids)
+        return pool
+
+    async def _restart(self, broken_pool: ProcessPoolExecutor):
+        """Replace a broken pool, once, however many jobs noticed it
+
+        The broken pool stays in place until a new one is up, so a failed
+        restart leaves the executor marked broken rather than stopped.
+        """
+        async with self._restart_lock:
+            if self._pool is not broken_pool:
+                return
+            if self._broken is not broken_pool:
+                self._broken = broken_pool
+                broken_pool.shutdown(wait=False, cancel_futures=True)
+                logger.error("Inference worker died, restarting the process pool")
+
+            for attempt in range(self._restart_attempts):
+                try:
+                    pool = await asyncio.to_thread(self._start_pool)
+                except Exception as e:
+                    logger.error(
+                        f"Restarting the inference pool failed "
+                        f"(attempt {attempt + 1}/{self._restart_attempts}): {e}"
+                    )
+                    if attempt + 1 < self._restart_attempts:
+                        await asyncio.sleep(self._restart_backoff * 2**attempt)
+                    continue
+                self._pool = pool
+                self._broken = None
+                self.restarts += 1
+                logger.info("Inference process pool restarted")
+                return
+            logger.error("Inference pool is down, the next job will retry the restart")
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """Run fn(model, *args, **kwargs) in a worker process and await its result"""
+        loop = asyncio.get_running_loop()
+        if self._restart_lock.locked():
+            # A restart is reloading the models: wait for it instead of failing
+            async with self._restart_lock:
+                pass
+        if self._pool is not None and self._pool is self._broken:
+            await self._restart(self._pool)
+
+        pool = self._pool
+        if pool is None:
+            raise RuntimeError("Inference process pool is not running")
+        if pool is self._broken:
+            raise RuntimeError("Inference process pool could not be restarted")
+
+        self.in_flight += 1
+        try:
+            return await loop.run_in_executor(pool, _call_in_worker, fn, args, kwargs)
+        except BrokenProcessPool:
+            await self._restart(pool)
+            raise
+        finally:
+            self.in_flight -= 1
+
+    def is_healthy(self) -> bool:
+        """Check if the pool can accept work"""
+        return self._pool is not None and self._pool is not self._broken
+
+    def worker_pids(self) -> List[int]:
+        """Processes holding this pool's models"""
+        return list(self._pids) if self.is_healthy() else []
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker processes"""
+        if self._pool:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
+            self._broken = None
+            logger.info("Inference process pool stopped")
+
+
+def _preload_in_forkserver(context, model_factory: Callable, factory_args: tuple):
+    """Have the forkserver load the model before it forks any worker"""
+    global _preload_key
+    if _preload_key is not None:
+        return
+    _preload_key = _factory_key(model_factory, factory_args)
+    # The forkserver inherits this environment when it starts, but not
+    # sys.path, so it has to be told where shared_model and the factory live
+    paths = [os.path.dirname(os.path.abspath(__file__))]
+    factory_module = sys.modules.get(model_factory.__module__)
+    if getattr(factory_module, "__file__", None):
+        paths.append(os.path.dirname(os.path.abspath(factory_module.__file__)))
+    if os.environ.get("PYTHONPATH"):
+        paths.append(os.environ["PYTHONPATH"])
+    os.environ["PYTHONPATH"] = os.pathsep.join(dict.fromkeys(paths))
+    os.environ[PRELOAD_ENV] = _preload_key
+    context.set_forkserver_preload(["shared_model"])
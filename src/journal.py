@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+from typing import List
+
+from broker import TranscriptionJob
+
+logger = logging.getLogger(__name__)
+
+# Telegram keeps undelivered updates for a day, so a message can come back
+# at most that long after it was first accepted
+RETENTION_SECONDS = 24 * 3600
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+
+
+class JobJournal:
+    """Accepted transcription jobs, kept in a SQLite file until they are done
+
+    Every job is recorded when its message is accepted and marked done
+    once answered, so jobs that were queued or running when the bot
+    stopped can be resumed on the next start. A message is accepted once:
+    recording the same chat and message again is refused, which makes
+    updates Telegram delivers twice (after a crash, before the update
+    offset was saved) harmless. Done jobs are remembered for a day for
+    that check, then dropped.
+    """
+
+    def __init__(self, path: str, retention_seconds: float = RETENTION_SECONDS):
+        self.path = path
+        self.retention_seconds = retention_seconds
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "job_id TEXT PRIMARY KEY, chat_id INTEGER NOT NULL, "
+            "message_id INTEGER NOT NULL, payload TEXT NOT NULL, "
+            "state TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, "
+            "updated REAL NOT NULL, UNIQUE (chat_id, message_id))"
+        )
+        self._lock = asyncio.Lock()
+        logger.info(f"Job journal: {path}")
+
+    async def _execute(self, sql: str, params=()) -> sqlite3.Cursor:
+        async with self._lock:
+            return await asyncio.to_thread(self._db.execute, sql, params)
+
+    async def _query(self, sql: str, params=()) -> list:
+        async with self._lock:
+            return await asyncio.to_thread(
+                lambda: self._db.execute(sql, params).fetchall()
+            )
+
+    async def record(self, job: TranscriptionJob) -> bool:
+        """Record an accepted job; False if its message was accepted before"""
+        cursor = await self._execute(
+            "INSERT OR IGNORE INTO jobs "
+            "(job_id, chat_id, message_id, payload, state, updated) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (job.job_id, job.chat_id, job.message_id, job.to_json(), QUEUED, time.time()),
+        )
+        return cursor.rowcount == 1
+
+    async def start(self, job: TranscriptionJob):
+        """Mark a job as running and count the attempt"""
+        job.attempts += 1
+        await self._execute(
+            "UPDATE jobs SET state = ?, attempts = ?, updated = ? WHERE job_id = ?",
+            (RUNNING, job.attempts, time.time(), job.job_id),
+        )
+
+    async def finish(self, job: TranscriptionJob):
+        """Mark a job as done (answered, handed to a worker, or given up)"""
+        now = time.time()
+        await self._execute(
+            "UPDATE jobs SET state = ?, updated = ? WHERE job_id = ?",
+            (DONE, now, job.job_id),
+        )
+        await self._execute(
+            "DELETE FROM jobs WHERE state = ? AND updated < ?",
+            (DONE, now - self.retention_seconds),
+        )
+
+    async def remove(self, job: TranscriptionJob):
+        """Forget a job that was rejected, so its message can be accepted again"""
+        await self._execute("DELETE FROM jobs WHERE job_id = ?", (job.job_id,))
+
+    async def unfinished(self) -> List[TranscriptionJob]:
+        """Jobs that were queued or running when the bot last stopped, oldest first"""
+        rows = await self._query(
+            "SELECT payload, attempts FROM jobs WHERE state != ? ORDER BY rowid",
+            (DONE,),
+        )
+        jobs = []
+        for payload, attempts in rows:
+            try:
+                job = TranscriptionJob.from_json(payload)
+            except (ValueError, TypeError) as e:
+                logger.error(f"Skipping unreadable journal entry: {e}")
+                continue
+            job.attempts = attempts
+            jobs.append(job)
+        return jobs
+
+    async def close(self):
+        async with self._lock:
+            self._db.close()
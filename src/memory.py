@@ -0,0 +1,57 @@
+import logging
+import os
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Fields read from /proc/<pid>/smaps_rollup, reported in bytes
+FIELDS = {"Rss": "rss", "Pss": "pss", "Shared_Clean": "shared", "Shared_Dirty": "shared"}
+
+
+def process_memory(pid: int) -> Optional[Dict[str, int]]:
+    """Resident (RSS), proportional (PSS) and shared memory of a process
+
+    PSS splits every shared page between the processes mapping it, so the
+    PSS of all workers adds up to what they really use together, while
+    their RSS counts shared model weights once per worker. Returns None
+    where /proc is not available.
+    """
+    usage = {"rss": 0, "pss": 0, "shared": 0}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                name, _, value = line.partition(":")
+                if name in FIELDS:
+                    usage[FIELDS[name]] += int(value.split()[0]) * 1024
+    except FileNotFoundError:
+        return _status_memory(pid)
+    except (OSError, ValueError) as e:
+        logger.debug(f"Cannot read memory of process {pid}: {e}")
+        return None
+    return usage
+
+
+def _status_memory(pid: int) -> Optional[Dict[str, int]]:
+    """RSS only, for kernels without smaps_rollup (PSS reported as RSS)"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    rss = int(line.split()[1]) * 1024
+                    return {"rss": rss, "pss": rss, "shared": 0}
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def total_memory(pids: Iterable[int]) -> Dict[str, int]:
+    """Summed memory of several processes (those that can be read)"""
+    total = {"rss": 0, "pss": 0, "shared": 0, "processes": 0}
+    for pid in set(pids):
+        usage = process_memory(pid)
+        if usage is None:
+            continue
+        for key, value in usage.items():
+            total[key] += value
+        total["processes"] += 1
+    return total
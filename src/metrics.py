@@ -0,0 +1,342 @@
+import asyncio
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Seconds, from a cache hit up to a long file
+DEFAULT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _format_labels(
+    names: Sequence[str], values: Tuple[str, ...], extra: str = ""
+) -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Metric:
+    """Base class for a metric family with optional labels"""
+
+    kind = ""
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+    def _samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Monotonically increasing count"""
+
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}{labels} {_format_value(value)}"
+
+
+class Gauge(Metric):
+    """Value that goes up and down, set directly or read at scrape time"""
+
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._functions: Dict[Tuple[str, ...], Callable[[], float]] = {}
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, function: Callable[[], float], **labels):
+        """Read the value from function whenever metrics are scraped"""
+        key = self._key(labels)
+        with self._lock:
+            self._functions[key] = function
+
+    def value(self, **labels) -> float:
+        key = self._key(labels)
+        function = self._functions.get(key)
+        return function() if function else self._values.get(key, 0)
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            values = dict(self._values)
+            functions = dict(self._functions)
+        for key, function in functions.items():
+            try:
+                values[key] = function()
+            except Exception as e:
+                logger.error(f"Failed to read gauge {self.name}: {e}")
+        for key, value in sorted(values.items()):
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}{labels} {_format_value(value)}"
+
+
+class Histogram(Metric):
+    """Distribution of observed values in cumulative buckets"""
+
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: (bucket counts, sum, count)
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of a with block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        entry = self._values.get(self._key(labels))
+        return entry[2] if entry else 0
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            items = sorted(
+                (key, (list(counts), total, count))
+                for key, (counts, total, count) in self._values.items()
+            )
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(
+                    self.labelnames, key, f'le="{_format_value(bound)}"'
+                )
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            yield f"{self.name}_bucket{labels} {count}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+class Registry:
+    """Collection of metrics rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+QUEUE_WAIT = REGISTRY.register(
+    Histogram("transcriber_queue_wait_seconds", "Time jobs wait in the scheduler queue")
+)
+STAGE_SECONDS = REGISTRY.register(
+    Histogram(
+        "transcriber_stage_seconds",
+        "Time spent per pipeline stage (download, decode, vad, inference, send)",
+        ["stage"],
+    )
+)
+JOB_SECONDS = REGISTRY.register(
+    Histogram("transcriber_job_seconds", "Time per job after leaving the queue")
+)
+JOBS = REGISTRY.register(
+    Counter("transcriber_jobs_total", "Finished jobs by outcome", ["outcome"])
+)
+ESTIMATE_RATIO = REGISTRY.register(
+    Histogram(
+        "transcriber_estimate_ratio",
+        "Actual over predicted job time (1 = exact)",
+        buckets=(0.25, 0.5, 0.8, 1, 1.25, 2, 4),
+    )
+)
+JOBS_RESUMED = REGISTRY.register(
+    Counter("transcriber_jobs_resumed_total", "Unfinished jobs resumed from the journal")
+)
+REJECTIONS = REGISTRY.register(
+    Counter("transcriber_rejections_total", "Jobs rejected at submission", ["reason"])
+)
+CACHE_LOOKUPS = REGISTRY.register(
+    Counter("transcriber_cache_lookups_total", "Cache lookups by result", ["result"])
+)
+COALESCED_REQUESTS = REGISTRY.register(
+    Counter(
+        "transcriber_coalesced_requests_total",
+        "Requests that shared an identical transcription already in flight",
+    )
+)
+IN_FLIGHT = REGISTRY.register(Gauge("transcriber_jobs_in_flight", "Jobs running"))
+QUEUED = REGISTRY.register(Gauge("transcriber_jobs_queued", "Jobs waiting to run"))
+POOL_WORKERS = REGISTRY.register(Gauge("transcriber_pool_workers", "Inference workers"))
+POOL_BUSY = REGISTRY.register(Gauge("transcriber_pool_busy", "Workers in use"))
+BATCH_SIZE = REGISTRY.register(
+    Histogram(
+        "transcriber_batch_size",
+        "Clips transcribed per whisper call when batching",
+        buckets=(1, 2, 3, 4, 6, 8, 12, 16),
+    )
+)
+MODEL_LOADS = REGISTRY.register(
+    Counter("transcriber_model_loads_total", "Models loaded on demand", ["model"])
+)
+MODEL_EVICTIONS = REGISTRY.register(
+    Counter(
+        "transcriber_model_evictions_total",
+        "Models unloaded to stay within the memory budget",
+        ["model"],
+    )
+)
+MODELS_LOADED = REGISTRY.register(Gauge("transcriber_models_loaded", "Models in memory"))
+READY = REGISTRY.register(
+    Gauge("transcriber_ready", "1 once the model is loaded and warmed up")
+)
+MEMORY_BYTES = REGISTRY.register(
+    Gauge(
+        "transcriber_memory_bytes",
+        "Memory of the bot and its inference workers (rss, pss)",
+        ["kind"],
+    )
+)
+STARTUP_SECONDS = REGISTRY.register(
+    Gauge("transcriber_startup_seconds", "Duration of each startup phase", ["phase"])
+)
+OUTBOUND_WAITING = REGISTRY.register(
+    Gauge("transcriber_telegram_requests_waiting", "Bot API calls waiting for their turn")
+)
+OUTBOUND_RETRIES = REGISTRY.register(
+    Counter("transcriber_telegram_retries_total", "Bot API calls retried after RetryAfter")
+)
+OUTBOUND_COALESCED = REGISTRY.register(
+    Counter(
+        "transcriber_telegram_edits_coalesced_total",
+        "Message edits dropped for a newer edit of the same message",
+    )
+)
+WEBHOOK_REQUESTS = REGISTRY.register(
+    Counter("transcriber_webhook_requests_total", "Webhook requests by status", ["status"])
+)
+
+
+class MetricsServer:
+    """Minimal HTTP server answering GET /metrics on the event loop"""
+
+    def __init__(
+        self, host: str = "127.0.0.1", port: int = 9464, registry: Registry = REGISTRY
+    ):
+        self.host = host
+        self.port = port
+        self.registry = registry
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        # Pick up the real port when started on port 0
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Metrics available at http://{self.host}:{self.port}/metrics")
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            # Drain headers
+            while True:
+                line = await asyncio.wait_for(reader.readline(), timeout=5)
+                if line in (b"\r\n", b"\n", b""):
+                    break
+
+            parts = request_line.decode("latin-1").split()
+            path = parts[1].split("?")[0] if len(parts) >= 2 else ""
+            if parts and parts[0] == "GET" and path == "/metrics":
+                status = "200 OK"
+                body = self.registry.render().encode()
+            else:
+                status = "404 Not Found"
+                body = b"Not Found\n"
+
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                "Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError) as e:
+            logger.debug(f"Metrics request failed: {e}")
+        finally:
+            writer.close()
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
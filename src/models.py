@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import os
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+
+from metrics import MODEL_EVICTIONS, MODEL_LOADS
+
+logger = logging.getLogger(__name__)
+
+# whisper.cpp quantization suffixes, least to most precise (f16 files have none)
+QUANTIZATIONS = ("q4_0", "q4_1", "q5_0", "q5_1", "q8_0")
+
+
+def split_model_name(name: str) -> Tuple[str, Optional[str]]:
+    """Base model and quantization, e.g. "base.en-q5_1" -> ("base.en", "q5_1")"""
+    base, _, suffix = name.rpartition("-")
+    if base and suffix in QUANTIZATIONS:
+        return base, suffix
+    return name, None
+
+
+def is_english_only(name: str) -> bool:
+    """Whether a model only transcribes English (tiny.en, base.en-q5_1, ...)"""
+    return split_model_name(name)[0].endswith(".en")
+
+
+class UnknownModelError(ValueError):
+    """Raised when asking for a model that is not registered"""
+
+
+class ModelRegistry:
+    """Whisper models the bot can transcribe with, loaded on first use
+
+    Every loaded model has its own inference pool, started by
+    create_executor(model_path). The default model is loaded at startup and
+    stays loaded. Other models are loaded the first time a job asks for
+    them. When loading one would push the estimated memory (model file size
+    × workers) over memory_budget_mb, the least recently used models with
+    no running jobs are unloaded first.
+    """
+
+    def __init__(
+        self,
+        paths: Dict[str, str],
+        default: str,
+        create_executor: Callable[[str], Any],
+        workers: int = 1,
+        memory_budget_mb: float = 0,
+        routes: Sequence[Tuple[float, str]] = (),
+    ):
+        if default not in paths:
+            raise ValueError(f"Default model '{default}' is not registered")
+        self.paths = dict(paths)
+        self.default = default
+        self.create_executor = create_executor
+        self.workers = max(1, workers)
+        self.memory_budget_mb = memory_budget_mb
+        self.routes = sorted(routes)
+
+        self.loads = 0
+        self.evictions = 0
+        # Loaded pools, least recently used first
+        self._executors: "OrderedDict[str, Any]" = OrderedDict()
+        # Jobs currently using each model; models in use are never unloaded
+        self._users: Dict[str, int] = {}
+        # One load at a time keeps the memory accounting simple
+        self._load_lock = asyncio.Lock()
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.paths)
+
+    @property
+    def loaded(self) -> List[str]:
+        return list(self._executors)
+
+    def add(self, name: str, executor: Any):
+        """Register a pool that was started elsewhere (the default model at startup)"""
+        self._executors[name] = executor
+        self._executors.move_to_end(name)
+
+    def get(self, name: str) -> Optional[Any]:
+        """The pool of a loaded model, None if it is not loaded"""
+        return self._executors.get(name)
+
+    def resolve(self, name: Optional[str]) -> str:
+        """Check a model name, None meaning the default model"""
+        if name is None:
+            return self.default
+        if name not in self.paths:
+            raise UnknownModelError(f"Unknown model: {name}")
+        return name
+
+    def route(self, duration: Optional[float] = None, preferred: Optional[str] = None) -> str:
+        """Pick the model for a job
+
+        A registered model the user picked wins. Otherwise the first route
+        whose limit covers the duration is used, then the default model.
+        Audio without a duration (documents) always gets the default.
+        """
+        if preferred in self.paths:
+            return preferred
+        if duration is not None:
+            for max_seconds, name in self.routes:
+                if duration <= max_seconds and name in self.paths:
+                    return name
+        return self.default
+
+    def estimate_mb(self, name: str) -> float:
+        """Estimated memory of a loaded model: one copy per worker"""
+        try:
+            size = os.path.getsize(self.paths[name])
+        except OSError:
+            size = 0
+        return size / (1024 * 1024) * self.workers
+
+    def loaded_mb(self) -> float:
+        return sum(self.estimate_mb(name) for name in self._executors)
+
+    @asynccontextmanager
+    async def use(self, name: Optional[str] = None) -> AsyncIterator[Any]:
+        """Hold a model's pool for the duration of a job, loading it if needed"""
+        name = self.resolve(name)
+        self._users[name] = self._users.get(name, 0) + 1
+        try:
+            executor = self._executors.get(name)
+            if executor is None:
+                executor = await self._load(name)
+            self._executors.move_to_end(name)
+            yield executor
+        finally:
+            self._users[name] -= 1
+
+    async def _load(self, name: str) -> Any:
+        async with self._load_lock:
+            # Another job may have loaded it while this one waited
+            executor = self._executors.get(name)
+            if executor is not None:
+                return executor
+
+            await self._make_room(self.estimate_mb(name))
+            logger.info(f"Loading model {name} from {self.paths[name]}")
+            executor = await asyncio.to_thread(self.create_executor, self.paths[name])
+            self._executors[name] = executor
+            self.loads += 1
+            MODEL_LOADS.inc(model=name)
+            return executor
+
+    async def _make_room(self, needed_mb: float):
+        """Unload idle models, least recently used first, until needed_mb fits"""
+        if self.memory_budget_mb <= 0:
+            return
+        for name in list(self._executors):
+            if self.loaded_mb() + needed_mb <= self.memory_budget_mb:
+                return
+            if name == self.default or self._users.get(name):
+                continue
+            executor = self._executors.pop(name)
+            await asyncio.to_thread(executor.shutdown)
+            self.evictions += 1
+            MODEL_EVICTIONS.inc(model=name)
+            logger.info(f"Unloaded model {name} to stay within the memory budget")
+
+        if self.loaded_mb() + needed_mb > self.memory_budget_mb:
+            logger.warning(
+                f"Loading the next model exceeds MODEL_MEMORY_BUDGET_MB "
+                f"({self.loaded_mb() + needed_mb:.0f}MB > {self.memory_budget_mb}MB), "
+                f"the other loaded models are in use"
+            )
+
+    def shutdown(self):
+        """Stop every loaded pool"""
+        for executor in self._executors.values():
+            executor.shutdown()
+        self._executors.clear()
@@ -0,0 +1,300 @@
+import asyncio
+import bisect
+import contextvars
+import datetime
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+from metrics import OUTBOUND_COALESCED, OUTBOUND_RETRIES
+
+logger = logging.getLogger(__name__)
+
+# Request lanes: final results and replies go before progress updates
+FINAL = 0
+PROGRESS = 1
+
+# Requests a chat may send back to back before its rate applies
+CHAT_BURST = 3
+# Idle chat buckets are dropped once this many are tracked
+MAX_TRACKED_CHATS = 1000
+
+# Edits that can be replaced by a newer edit of the same message
+EDIT_ENDPOINTS = ("editMessageText", "editMessageCaption")
+
+_priority = contextvars.ContextVar("outbound_priority", default=FINAL)
+
+
+@contextmanager
+def progress_updates():
+    """Send the requests made in this block in the progress lane"""
+    token = _priority.set(PROGRESS)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class EditSuperseded(Exception):
+    """Raised for an edit replaced by a newer edit of the same message before it was sent"""
+
+
+class TokenBucket:
+    """rate tokens per second, holding at most capacity"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Seconds until a token is available"""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self, now: float):
+        self._refill(now)
+        self.tokens -= 1
+
+    def full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+class _Request:
+    """A request waiting for its turn"""
+
+    def __init__(self, seq: int, priority: int, chat_id: Any, key: Optional[Tuple]):
+        self.seq = seq
+        self.priority = priority
+        self.chat_id = chat_id
+        self.key = key
+        self.granted = asyncio.get_running_loop().create_future()
+
+    def __lt__(self, other: "_Request") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class OutboundLimiter(BaseRateLimiter):
+    """Paces every Bot API call under Telegram's flood limits
+
+    A global token bucket caps requests per second across all chats, and a
+    bucket per chat caps each chat (groups get the stricter per-minute
+    limit). A chat has at most one request in flight, so its requests
+    reach Telegram in order. Waiting requests are granted final results
+    first and progress updates (made inside progress_updates()) second.
+
+    An edit waiting for its turn is dropped, raising EditSuperseded, when a
+    newer edit of the same message arrives; only the latest text is sent.
+    A RetryAfter answer pauses the chat (or every chat, for requests
+    without one) for the time Telegram asks and the request is retried up
+    to max_retries times.
+    """
+
+    def __init__(
+        self,
+        global_per_second: float = 30,
+        chat_per_second: float = 1,
+        group_per_minute: float = 20,
+        max_retries: int = 3,
+    ):
+        self.global_per_second = global_per_second
+        self.chat_per_second = chat_per_second
+        self.group_per_minute = group_per_minute
+        self.max_retries = max_retries
+
+        self.retries = 0
+        self.coalesced = 0
+        self._global = TokenBucket(global_per_second, global_per_second)
+        self._chats: Dict[Any, TokenBucket] = {}
+        self._paused_until: Dict[Any, float] = {}
+        self._paused_all_until = 0.0
+        # Waiting requests, in grant order
+        self._waiting: List[_Request] = []
+        # Waiting edits by (endpoint, chat, message), for coalescing
+        self._edits: Dict[Tuple, _Request] = {}
+        self._busy: Set[Any] = set()
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiting)
+
+    async def initialize(self):
+        self._start()
+
+    async def shutdown(self):
+        if self._dispatcher:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+            self._dispatcher = None
+
+    def _start(self):
+        if self._dispatcher is None or self._dispatcher.done():
+            self._wakeup = asyncio.Event()
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def process_request(
+        self,
+        callback,
+        args: Any,
+        kwargs: Dict[str, Any],
+        endpoint: str,
+        data: Dict[str, Any],
+        rate_limit_args: Optional[Any],
+    ):
+        chat_id = data.get("chat_id")
+        key = None
+        if endpoint in EDIT_ENDPOINTS and data.get("message_id") is not None:
+            key = (endpoint, chat_id, data["message_id"])
+        priority = _priority.get()
+
+        for attempt in itertools.count():
+            await self._acquire(chat_id, priority, key)
+            try:
+                return await callback(*args, **kwargs)
+            except RetryAfter as e:
+                delay = e.retry_after
+                if isinstance(delay, datetime.timedelta):
+                    delay = delay.total_seconds()
+                self._pause(chat_id, float(delay))
+                if attempt >= self.max_retries:
+                    raise
+                self.retries += 1
+                OUTBOUND_RETRIES.inc()
+                logger.warning(
+                    f"Telegram asked to wait {delay}s ({endpoint} to chat {chat_id}), "
+                    f"retrying"
+                )
+            finally:
+                self._busy.discard(chat_id)
+                self._wakeup.set()
+
+    async def _acquire(self, chat_id: Any, priority: int, key: Optional[Tuple]):
+        """Wait until this request may be sent"""
+        self._start()
+        request = _Request(next(self._seq), priority, chat_id, key)
+        if key is not None:
+            older = self._edits.pop(key, None)
+            if older is not None:
+                # The newer text wins, with the more urgent of the two lanes
+                self._waiting.remove(older)
+                if not older.granted.done():
+                    older.granted.set_exception(EditSuperseded())
+                request.priority = min(priority, older.priority)
+                self.coalesced += 1
+                OUTBOUND_COALESCED.inc()
+            self._edits[key] = request
+        bisect.insort(self._waiting, request)
+        self._wakeup.set()
+        try:
+            await request.granted
+        except asyncio.CancelledError:
+            if request.granted.cancelled():
+                self._forget(request)
+            else:
+                # Granted as it was cancelled: hand the turn back
+                self._busy.discard(chat_id)
+                self._wakeup.set()
+            raise
+
+    def _forget(self, request: _Request):
+        if request in self._waiting:
+            self._waiting.remove(request)
+        if request.key is not None and self._edits.get(request.key) is request:
+            del self._edits[request.key]
+        self._wakeup.set()
+
+    def _pause(self, chat_id: Any, seconds: float):
+        until = time.monotonic() + seconds
+        if chat_id is None:
+            self._paused_all_until = max(self._paused_all_until, until)
+        else:
+            self._paused_until[chat_id] = max(self._paused_until.get(chat_id, 0.0), until)
+
+    def _chat_bucket(self, chat_id: Any) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            # Negative ids are groups and channels
+            if isinstance(chat_id, int) and chat_id < 0:
+                bucket = TokenBucket(self.group_per_minute / 60, CHAT_BURST)
+            else:
+                bucket = TokenBucket(self.chat_per_second, CHAT_BURST)
+            self._chats[chat_id] = bucket
+        return bucket
+
+    def _ready_in(self, request: _Request, now: float) -> float:
+        """Seconds until a request could be granted (0 = now)"""
+        ready_at = max(
+            now + self._global.delay(now),
+            self._paused_all_until,
+        )
+        if request.chat_id is not None:
+            ready_at = max(
+                ready_at,
+                now + self._chat_bucket(request.chat_id).delay(now),
+                self._paused_until.get(request.chat_id, 0.0),
+            )
+        return max(0.0, ready_at - now)
+
+    def _grant(self, request: _Request, now: float):
+        self._waiting.remove(request)
+        if request.key is not None and self._edits.get(request.key) is request:
+            del self._edits[request.key]
+        if request.granted.done():
+            # Cancelled, its task just hasn't run yet to clean up
+            return
+        self._global.take(now)
+        if request.chat_id is not None:
+            self._chat_bucket(request.chat_id).take(now)
+            self._busy.add(request.chat_id)
+        request.granted.set_result(None)
+
+    def _prune(self, now: float):
+        """Forget idle chats so the buckets don't grow with every chat ever seen"""
+        if len(self._chats) <= MAX_TRACKED_CHATS:
+            return
+        waiting = {request.chat_id for request in self._waiting}
+        for chat_id, bucket in list(self._chats.items()):
+            if chat_id not in self._busy and chat_id not in waiting and bucket.full(now):
+                del self._chats[chat_id]
+                self._paused_until.pop(chat_id, None)
+
+    async def _dispatch(self):
+        while True:
+            self._wakeup.clear()
+            now = time.monotonic()
+            wait = None
+            for request in list(self._waiting):
+                if request.chat_id is not None and request.chat_id in self._busy:
+                    # Its chat's previous request is still in flight
+                    continue
+                delay = self._ready_in(request, now)
+                if delay <= 0:
+                    self._grant(request, now)
+                else:
+                    wait = delay if wait is None else min(wait, delay)
+            self._prune(now)
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+
@@ -0,0 +1,205 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, Set, Tuple
+
+from metrics import QUEUE_WAIT, REJECTIONS
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised when the scheduler cannot accept another job"""
+
+
+class UserQueueFullError(QueueFullError):
+    """Raised when a single user already has too many jobs waiting"""
+
+
+class Job:
+    """A queued transcription request"""
+
+    def __init__(
+        self,
+        seq: int,
+        user_id: int,
+        duration: Optional[float],
+        run: Callable[[], Awaitable],
+        cost: Optional[float] = None,
+    ):
+        self.seq = seq
+        self.user_id = user_id
+        self.duration = duration
+        self.run = run
+        # Predicted processing seconds (None = unknown)
+        self.cost = cost
+        self.enqueued_at = time.monotonic()
+        self.started_at = None
+
+    def is_short(self, short_audio_seconds: float) -> bool:
+        """Check if the job qualifies for the short-audio lane"""
+        return self.duration is not None and self.duration <= short_audio_seconds
+
+
+class JobScheduler:
+    """Bounded job queue with per-user fairness and short-audio priority
+
+    Waiting jobs are kept in one FIFO per user. When a slot frees up, the
+    head of every user's FIFO is considered and the winner is picked by:
+    short clips first, then the user with the fewest running jobs, then the
+    job predicted to finish soonest, then the user served least recently
+    (round robin), then arrival order. Long jobs that have waited
+    ``starvation_seconds`` are promoted to the short lane, ahead of any
+    prediction, so they cannot wait forever.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        max_queued: int,
+        short_audio_seconds: float = 60,
+        starvation_seconds: float = 120,
+        max_queued_per_user: int = 10,
+    ):
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queued = max(0, max_queued)
+        self.max_queued_per_user = max(1, max_queued_per_user)
+        self.short_audio_seconds = short_audio_seconds
+        self.starvation_seconds = starvation_seconds
+
+        self.in_flight = 0
+        self.queued = 0
+        self.rejected = 0
+        self._queues: Dict[int, Deque[Job]] = {}
+        self._running: Dict[int, int] = {}
+        # Running jobs by seq, for ETAs
+        self._running_jobs: Dict[int, Job] = {}
+        self._last_served: Dict[int, int] = {}
+        self._dispatched = itertools.count()
+        self._tasks: Set[asyncio.Task] = set()
+        self._seq = itertools.count()
+
+    def submit(
+        self,
+        user_id: int,
+        duration: Optional[float],
+        run: Callable[[], Awaitable],
+        cost: Optional[float] = None,
+    ) -> Job:
+        """Queue a job, raising QueueFullError instead of growing unbounded"""
+        if self.in_flight >= self.max_in_flight and self.queued >= self.max_queued:
+            self.rejected += 1
+            REJECTIONS.inc(reason="queue_full")
+            logger.warning(f"Job queue full, rejecting job from user {user_id}")
+            raise QueueFullError("Job queue is full")
+
+        # One user's burst must not fill the queue for everyone else
+        user_queue = self._queues.get(user_id)
+        if user_queue and len(user_queue) >= self.max_queued_per_user:
+            self.rejected += 1
+            REJECTIONS.inc(reason="user_queue_full")
+            logger.warning(f"User {user_id} has too many queued jobs, rejecting")
+            raise UserQueueFullError("Too many queued jobs for this user")
+
+        job = Job(next(self._seq), user_id, duration, run, cost)
+        self._queues.setdefault(user_id, deque()).append(job)
+        self.queued += 1
+        self._dispatch()
+        return job
+
+    def _priority(self, job: Job, now: float) -> tuple:
+        """Sort key for picking the next job (lower runs first)"""
+        starved = now - job.enqueued_at >= self.starvation_seconds
+        short = job.is_short(self.short_audio_seconds) or starved
+        return (
+            0 if short else 1,
+            self._running.get(job.user_id, 0),
+            0 if starved or job.cost is None else job.cost,
+            self._last_served.get(job.user_id, -1),
+            job.seq,
+        )
+
+    def eta(self, job: Job) -> Tuple[int, Optional[float]]:
+        """Queue position of a waiting job (1 = next) and seconds until it is done
+
+        Plays the queue forward with every job taking its predicted cost,
+        so the time is None if a running job or one ahead has no prediction.
+        """
+        now = time.monotonic()
+        key = self._priority(job, now)
+        ahead = []
+        for user_queue in self._queues.values():
+            for other in user_queue:
+                if other is job:
+                    break
+                # A user's own jobs run in order, whatever their priority
+                if other.user_id == job.user_id or self._priority(other, now) < key:
+                    ahead.append(other)
+        position = len(ahead) + 1
+
+        running = list(self._running_jobs.values())
+        if any(other.cost is None for other in [job, *ahead, *running]):
+            return position, None
+        # When each slot frees up: running jobs take what is left of their cost
+        slots = [max(0.0, other.cost - (now - other.started_at)) for other in running]
+        slots += [0.0] * (self.max_in_flight - len(slots))
+        heapq.heapify(slots)
+        for other in sorted(ahead, key=lambda other: self._priority(other, now)):
+            heapq.heapreplace(slots, slots[0] + other.cost)
+        return position, slots[0] + job.cost
+
+    def _pop_next(self) -> Job:
+        """Remove and return the highest priority waiting job"""
+        now = time.monotonic()
+        user_id = min(
+            self._queues, key=lambda uid: self._priority(self._queues[uid][0], now)
+        )
+        user_queue = self._queues[user_id]
+        job = user_queue.popleft()
+        if not user_queue:
+            del self._queues[user_id]
+        self.queued -= 1
+        return job
+
+    def _dispatch(self):
+        """Start waiting jobs while there are free slots"""
+        while self.queued and self.in_flight < self.max_in_flight:
+            job = self._pop_next()
+            job.started_at = time.monotonic()
+            QUEUE_WAIT.observe(job.started_at - job.enqueued_at)
+            self.in_flight += 1
+            self._running_jobs[job.seq] = job
+            self._running[job.user_id] = self._running.get(job.user_id, 0) + 1
+            self._last_served[job.user_id] = next(self._dispatched)
+
+            task = asyncio.create_task(self._run(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, job: Job):
+        """Run a job and free its slot afterwards"""
+        try:
+            await job.run()
+        except Exception as e:
+            logger.error(f"Job for user {job.user_id} failed: {e}")
+        finally:
+            self.in_flight -= 1
+            del self._running_jobs[job.seq]
+            self._running[job.user_id] -= 1
+            if not self._running[job.user_id]:
+                del self._running[job.user_id]
+                if job.user_id not in self._queues:
+                    self._last_served.pop(job.user_id, None)
+            self._dispatch()
+
+    async def shutdown(self):
+        """Drop waiting jobs and cancel running ones"""
+        self._queues.clear()
+        self.queued = 0
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -0,0 +1,144 @@
+import json
+import math
+from typing import Iterable, List, Optional
+
+# Subtitle and data formats a transcript can be exported as
+EXPORT_FORMATS = ("srt", "vtt", "json")
+
+
+class TranscriptSegment:
+    """One timed piece of a transcript
+
+    Times are in centiseconds, like whisper's segments, so both can be
+    used interchangeably.
+    """
+
+    __slots__ = ("t0", "t1", "text", "probability")
+
+    def __init__(self, t0: int, t1: int, text: str, probability: float = math.nan):
+        self.t0 = t0
+        self.t1 = t1
+        self.text = text
+        self.probability = probability
+
+    def __repr__(self) -> str:
+        return f"TranscriptSegment({self.t0}, {self.t1}, {self.text!r})"
+
+
+class Transcript:
+    """Segments of a transcription, with the joined text built once"""
+
+    __slots__ = ("segments", "_text")
+
+    def __init__(self, segments: Iterable[TranscriptSegment] = ()):
+        self.segments: List[TranscriptSegment] = list(segments)
+        self._text: Optional[str] = None
+
+    @classmethod
+    def from_segments(cls, segments: Iterable) -> "Transcript":
+        """Copy whisper segments (anything with t0, t1, text), dropping empty ones"""
+        return cls(
+            TranscriptSegment(
+                segment.t0,
+                segment.t1,
+                segment.text.strip(),
+                getattr(segment, "probability", math.nan),
+            )
+            for segment in segments
+            if segment.text.strip()
+        )
+
+    @classmethod
+    def from_text(cls, text: str, duration_cs: int = 0) -> "Transcript":
+        """A transcript without timing: one segment covering the audio"""
+        text = text.strip()
+        return cls([TranscriptSegment(0, duration_cs, text)] if text else [])
+
+    @property
+    def text(self) -> str:
+        # One join instead of growing a string segment by segment
+        if self._text is None:
+            self._text = " ".join(segment.text for segment in self.segments)
+        return self._text
+
+    @property
+    def duration(self) -> float:
+        """Seconds up to the end of the last segment"""
+        return self.segments[-1].t1 / 100 if self.segments else 0.0
+
+    def __len__(self) -> int:
+        return len(self.segments)
+
+    def __iter__(self):
+        return iter(self.segments)
+
+    def to_srt(self) -> str:
+        cues = (
+            f"{index}\n{_timestamp(s.t0, ',')} --> {_timestamp(s.t1, ',')}\n{s.text}\n"
+            for index, s in enumerate(self.segments, 1)
+        )
+        return "\n".join(cues)
+
+    def to_vtt(self) -> str:
+        cues = (
+            f"{_timestamp(s.t0, '.')} --> {_timestamp(s.t1, '.')}\n{s.text}\n"
+            for s in self.segments
+        )
+        return "WEBVTT\n\n" + "\n".join(cues)
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "text": self.text,
+                "segments": [
+                    {
+                        "start": s.t0 / 100,
+                        "end": s.t1 / 100,
+                        "text": s.text,
+                        # NaN is not valid JSON
+                        "probability": None
+                        if math.isnan(s.probability)
+                        else round(s.probability, 4),
+                    }
+                    for s in self.segments
+                ],
+            },
+            ensure_ascii=False,
+        )
+
+    def export(self, fmt: str) -> str:
+        """The transcript as srt, vtt or json"""
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {fmt}")
+        return getattr(self, f"to_{fmt}")()
+
+    def dumps(self) -> str:
+        """Serialize for the cache"""
+        return self.to_json()
+
+    @classmethod
+    def loads(cls, data: str) -> "Transcript":
+        """Read a cached transcript; entries from before segments were kept are plain text"""
+        try:
+            parsed = json.loads(data)
+            segments = parsed["segments"]
+        except (ValueError, TypeError, KeyError):
+            return cls.from_text(data)
+        return cls(
+            TranscriptSegment(
+                round(s["start"] * 100),
+                round(s["end"] * 100),
+                s["text"],
+                math.nan if s.get("probability") is None else s["probability"],
+            )
+            for s in segments
+        )
+
+
+def _timestamp(centiseconds: int, separator: str) -> str:
+    """HH:MM:SS,mmm (SRT) or HH:MM:SS.mmm (VTT)"""
+    milliseconds = int(centiseconds) * 10
+    hours, milliseconds = divmod(milliseconds, 3600000)
+    minutes, milliseconds = divmod(milliseconds, 60000)
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{separator}{milliseconds:03d}"
@@ -0,0 +1,38 @@
+"""Model loaded by the forkserver and inherited by the workers it forks
+
+The forkserver imports this module as a preload (see
+ProcessInferenceExecutor's share_memory), so the model named in
+TRANSCRIBER_PRELOAD_MODEL is loaded once before any worker exists. Workers
+start with the weights already mapped and share those pages copy-on-write.
+"""
+
+import importlib
+import json
+import logging
+import os
+
+from executor import PRELOAD_ENV
+
+logger = logging.getLogger(__name__)
+
+KEY = None
+MODEL = None
+
+
+def _load():
+    global KEY, MODEL
+    spec = os.environ.get(PRELOAD_ENV)
+    if not spec:
+        return
+    try:
+        preload = json.loads(spec)
+        module_name, _, name = preload["factory"].partition(":")
+        factory = getattr(importlib.import_module(module_name), name)
+        MODEL = factory(*preload["args"])
+        KEY = spec
+    except Exception as e:
+        # Workers then load their own copy
+        logger.error(f"Failed to preload the shared model: {e}")
+
+
+_load()
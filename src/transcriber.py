@@ -1,20 +1,113 @@
+import asyncio
+import itertools
 import logging
 import os
 import tempfile
 import time
-from typing import Optional, Tuple
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
 
-from pywhispercpp.model import Model
+import numpy as np
+from pywhispercpp.model import Model, Segment
 
+from audio import SAMPLE_RATE, AudioDecoder, split_chunks, split_stream
+from batcher import InferenceBatcher, mean_probability
+from cache import TranscriptionCache, audio_cache_key, pcm_hasher
 from config import Config
+from executor import InferenceExecutor, ProcessInferenceExecutor
+from memory import total_memory
+from metrics import STAGE_SECONDS
+from models import ModelRegistry, is_english_only
+from segments import Transcript, TranscriptSegment
+from vad import SpeechMap, trim_silence
 
 logger = logging.getLogger(__name__)
 
+# Decode settings passed on every call: pywhispercpp keeps overrides on the
+# model, so a batched call would otherwise change later single calls
+SEGMENT_PARAMS = {
+    "token_timestamps": False,
+    "max_len": 0,
+    "split_on_word": False,
+    # Per-segment confidence, used to escalate to a larger model
+    "extract_probability": True,
+    # Let whisper pick (overridden by detected languages)
+    "language": "",
+}
+# One segment per word, so batched clips can be split apart by timestamp
+WORD_PARAMS = {
+    "token_timestamps": True,
+    "max_len": 1,
+    "split_on_word": True,
+    "extract_probability": True,
+    "language": "",
+}
+
+# Length of the silent clip run through every worker before the first job
+WARMUP_SECONDS = 1
+
+# Shortest and longest run of words matched when stitching overlapping windows
+MIN_OVERLAP_WORDS = 2
+MAX_OVERLAP_WORDS = 20
+
 
 class WhisperTranscriber:
-    def __init__(self):
+    def __init__(self, cache: Optional[TranscriptionCache] = None, preload: bool = True):
         self.model = None
-        self.load_model()
+        self.executor = None
+        # Other models are loaded when a job first asks for them
+        self.registry = ModelRegistry(
+            Config.WHISPER_MODELS,
+            Config.WHISPER_MODEL_NAME,
+            self.create_executor,
+            workers=max(1, Config.INFERENCE_WORKERS),
+            memory_budget_mb=Config.MODEL_MEMORY_BUDGET_MB,
+            routes=Config.MODEL_ROUTES,
+        )
+        self.cache = cache
+        self.decoder = AudioDecoder(Config.FFMPEG_PROCESSES)
+        self.batcher = None
+        if Config.BATCHING_ENABLED:
+            self.batcher = InferenceBatcher(
+                lambda audio: self.executor.run(_transcribe, audio),
+                lambda audio: self.executor.run(_transcribe, audio, WORD_PARAMS),
+                max_batch_size=Config.BATCH_MAX_SIZE,
+                max_wait=Config.BATCH_MAX_WAIT_MS / 1000,
+                max_clip_seconds=Config.BATCH_MAX_CLIP_SECONDS,
+            )
+        # Cumulative (count, seconds) per pipeline stage
+        self.timings = {"decode": [0, 0.0], "vad": [0, 0.0], "inference": [0, 0.0]}
+        # Set by start() once the model is loaded and warmed up
+        self.ready = asyncio.Event()
+        self.startup_timings = {}
+        # Without preload the model is loaded by start(), off the event loop
+        if preload:
+            self.load_model()
+
+    async def start(self):
+        """Load the model if needed, warm up every worker and mark ready"""
+        if self.executor is None:
+            start_time = time.perf_counter()
+            await asyncio.to_thread(self.load_model)
+            self.startup_timings["model_load"] = time.perf_counter() - start_time
+
+        if Config.WARMUP_ENABLED:
+            start_time = time.perf_counter()
+            await self.warm_up()
+            self.startup_timings["warmup"] = time.perf_counter() - start_time
+
+        self.ready.set()
+
+    async def warm_up(self):
+        """Run a short silent clip on every worker so the first job starts warm
+
+        One call per worker, all at once, so each worker (and its model)
+        takes one of them.
+        """
+        clip = np.zeros(SAMPLE_RATE * WARMUP_SECONDS, dtype=np.float32)
+        await asyncio.gather(
+            *(self.executor.run(_transcribe, clip) for _ in range(self.executor.workers))
+        )
+        logger.info(f"Warmed up {self.executor.workers} inference worker(s)")
 
     def load_model(self):
         """Load Whisper model from downloaded file"""
@@ -27,53 +120,211 @@ class WhisperTranscriber:
                     f"Model file not found: {Config.WHISPER_MODEL_PATH}"
                 )
 
-            # Load model from file path (not download automatically)
-            self.model = Model(Config.WHISPER_MODEL_PATH, n_threads=6)
+            workers = max(1, Config.INFERENCE_WORKERS)
+            if Config.INFERENCE_BACKEND == "process":
+                self.executor = self.create_executor(Config.WHISPER_MODEL_PATH)
+                logger.info(
+                    f"Whisper model loaded in {workers} worker processes "
+                    f"({Config.WHISPER_THREADS} threads each)"
+                )
+            else:
+                # Load one model per inference worker (not download automatically)
+                models = [
+                    _load_model(Config.WHISPER_MODEL_PATH, Config.WHISPER_THREADS)
+                    for _ in range(workers)
+                ]
+                self.model = models[0]
 
-            # Test if the model is working by checking if it can be used
-            if hasattr(self.model, "transcribe"):
+                # Test if the model is working by checking if it can be used
+                if not hasattr(self.model, "transcribe"):
+                    logger.error("Model loaded but transcribe method not available")
+                    self.model = None
+                    raise RuntimeError("Model not properly initialized")
+                self.executor = self.create_executor(Config.WHISPER_MODEL_PATH, models)
                 logger.info(
                     "Whisper model loaded successfully and ready for transcription"
                 )
-            else:
-                logger.error("Model loaded but transcribe method not available")
-                self.model = None
-                raise RuntimeError("Model not properly initialized")
+
+            self.registry.add(Config.WHISPER_MODEL_NAME, self.executor)
 
         except Exception as e:
             logger.error(f"Failed to load Whisper model: {e}")
             self.model = None
             raise
 
+    def create_executor(self, model_path: str, models: Optional[List[Model]] = None):
+        """Start an inference pool for a model file"""
+        workers = max(1, Config.INFERENCE_WORKERS)
+        if Config.INFERENCE_BACKEND == "process":
+            # Every worker process runs its own model, shared copy-on-write
+            # with the other workers when SHARE_MODEL_MEMORY is on
+            return ProcessInferenceExecutor(
+                workers,
+                _load_model,
+                (model_path, Config.WHISPER_THREADS),
+                share_memory=Config.SHARE_MODEL_MEMORY,
+            )
+        if models is None:
+            models = [
+                _load_model(model_path, Config.WHISPER_THREADS) for _ in range(workers)
+            ]
+        return InferenceExecutor(models)
+
+    async def run_inference(
+        self, media: np.ndarray, model_name: Optional[str] = None, language: str = ""
+    ) -> Tuple[List[Segment], float]:
+        """Transcribe PCM with a model (the default model goes through the batcher)
+
+        Batches are transcribed in one call with one language, so clips in a
+        known language other than English run alone on multilingual models.
+        """
+        async with self.registry.use(model_name) as executor:
+            if (
+                self.batcher is not None
+                and executor is self.executor
+                and (not language or is_english_only(Config.WHISPER_MODEL_NAME))
+            ):
+                return await self.batcher.transcribe(media)
+            return await executor.run(_transcribe, media, SEGMENT_PARAMS, language)
+
+    async def detect_language(self, audio: np.ndarray) -> Tuple[str, float]:
+        """Language of the first LANGUAGE_DETECT_SECONDS of audio, and its probability
+
+        One encoder pass of MULTILINGUAL_MODEL over a short window, not a
+        transcription.
+        """
+        window = audio[: int(Config.LANGUAGE_DETECT_SECONDS * SAMPLE_RATE)]
+        async with self.registry.use(Config.MULTILINGUAL_MODEL) as executor:
+            (language, probability), seconds = await executor.run(
+                _detect_language, window
+            )
+        self.record_timing("language", seconds)
+        return language, probability
+
+    async def route_language(
+        self,
+        audio: np.ndarray,
+        model_name: str,
+        language: Optional[str] = None,
+        on_language: Optional[Callable[[str, float], None]] = None,
+    ) -> Tuple[str, str]:
+        """The model and language to transcribe speech with
+
+        English-only (.en) models keep English audio; anything else, or
+        audio whose language is unclear, goes to MULTILINGUAL_MODEL. A known
+        language (the user's last one) skips detection. Returns the model and
+        the language for whisper ("" lets whisper decide); on_language gets
+        every detection.
+        """
+        if not Config.LANGUAGE_DETECTION or not len(audio):
+            return model_name, ""
+        if not language:
+            language, probability = await self.detect_language(audio)
+            logger.info(f"Detected language: {language} ({probability:.2f})")
+            if on_language is not None:
+                on_language(language, probability)
+            if probability < Config.LANGUAGE_MIN_CONFIDENCE:
+                language = ""
+        if language != "en" and is_english_only(model_name):
+            logger.info(
+                f"Switching from {model_name} to {Config.MULTILINGUAL_MODEL} "
+                f"for {language or 'unclear'} audio"
+            )
+            model_name = Config.MULTILINGUAL_MODEL
+        return model_name, language
+
     async def transcribe_audio(
-        self, audio_file_path: str
-    ) -> Optional[Tuple[str, float]]:
-        """Transcribe audio file to text and return with processing time"""
+        self,
+        audio_source: Union[str, bytes],
+        model_name: Optional[str] = None,
+        language: Optional[str] = None,
+        on_language: Optional[Callable[[str, float], None]] = None,
+    ) -> Optional[Tuple[Transcript, float]]:
+        """Transcribe an audio file path or in-memory bytes and return with processing time
+
+        language and on_language are passed to route_language.
+        """
         try:
-            logger.info(f"Starting transcription of: {audio_file_path}")
+            model_name = self.registry.resolve(model_name)
+            logger.info(
+                f"Starting transcription of: {_describe(audio_source)} with {model_name}"
+            )
 
             # Start timing
             start_time = time.time()
 
-            # Transcribe audio
-            segments = self.model.transcribe(audio_file_path)
+            # Decode once here; the model only ever sees PCM
+            media, decode_time = await self.decoder.decode(audio_source)
+            self.record_timing("decode", decode_time)
+
+            cache_key = None
+            if self.cache is not None:
+                # Same audio uploaded as a different file: hash the decoded PCM
+                cache_key = audio_cache_key(model_name, media)
+                cached = self.cache.get(cache_key)
+                if cached:
+                    logger.info("Transcription served from audio cache")
+                    return Transcript.loads(cached), time.time() - start_time
+
+            media, speech_map = await self.speech_only(media)
+            if speech_map is not None and not speech_map:
+                # An empty transcript is reported as "No speech detected"
+                logger.info("No speech detected, skipping inference")
+                return Transcript(), time.time() - start_time
+
+            model_name, language = await self.route_language(
+                media, model_name, language, on_language
+            )
+
+            # Transcribe audio on the inference pool so the event loop stays free
+            segments, inference_time = await self.run_inference(
+                media, model_name, language
+            )
+            self.record_timing("inference", inference_time)
+
+            # Streamed transcriptions are shown as they arrive, so only this
+            # single-call path can swap in a larger model's answer
+            escalation = Config.ESCALATION_MODEL
+            # Non-English audio is never redone by an English-only model
+            english_only_retry = (
+                Config.LANGUAGE_DETECTION
+                and language != "en"
+                and is_english_only(escalation)
+            )
+            if escalation and escalation != model_name and not english_only_retry:
+                confidence = mean_probability(segments)
+                if confidence < Config.ESCALATION_MIN_CONFIDENCE:
+                    logger.info(
+                        f"Low confidence ({confidence:.2f}) from {model_name}, "
+                        f"re-transcribing with {escalation}"
+                    )
+                    segments, retry_time = await self.run_inference(
+                        media, escalation, language
+                    )
+                    self.record_timing("inference", retry_time)
+                    inference_time += retry_time
 
             # End timing
             end_time = time.time()
             processing_time = end_time - start_time
 
-            # Combine all segments into single text
-            full_text = ""
-            for segment in segments:
-                full_text += segment.text + " "
-
-            full_text = full_text.strip()
+            transcript = Transcript.from_segments(segments)
+            if speech_map:
+                # Report times against the original, untrimmed audio
+                for segment in transcript:
+                    segment.t0 = speech_map.to_original_cs(segment.t0)
+                    segment.t1 = speech_map.to_original_cs(segment.t1)
 
-            if full_text:
+            if transcript:
                 logger.info(
-                    f"Transcription completed successfully in {processing_time:.2f}s"
+                    f"Transcription completed successfully in {processing_time:.2f}s "
+                    f"(decode {decode_time:.2f}s, inference {inference_time:.2f}s)"
                 )
-                return full_text, processing_time
+                if cache_key:
+                    # Kept under the routed model's key, even when escalated, so
+                    # the next lookup skips both the small model and the retry
+                    self.cache.set(cache_key, transcript.dumps())
+                return transcript, processing_time
             else:
                 logger.warning("Transcription returned empty result")
                 return None
@@ -82,6 +333,347 @@ class WhisperTranscriber:
             logger.error(f"Transcription failed: {e}")
             return None
 
+    async def transcribe_stream(
+        self,
+        audio_source: Union[str, bytes, AsyncIterator[bytes]],
+        model_name: Optional[str] = None,
+        language: Optional[str] = None,
+        on_language: Optional[Callable[[str, float], None]] = None,
+    ) -> AsyncIterator[Union[Segment, TranscriptSegment]]:
+        """Transcribe audio window by window, yielding segments in timestamp order
+
+        Up to one window per inference worker is transcribed in parallel, so
+        long files scale with the pool while segments still arrive as soon
+        as every earlier window is done. Low-confidence escalation does not
+        apply here, since partial text has already been shown to the user.
+
+        audio_source can also be the file's bytes as they download: then
+        decoding starts with the first bytes and each window is transcribed
+        as soon as it is decoded. The audio cache is only written in that
+        case (its key needs all of the PCM) and VAD trims window by window.
+        The language is detected on the first window of a download.
+        """
+        model_name = self.registry.resolve(model_name)
+        logger.info(
+            f"Starting streaming transcription of: {_describe(audio_source)} "
+            f"with {model_name}"
+        )
+
+        cache_key = None
+        hasher = None
+        speech_map = None
+        if isinstance(audio_source, (str, bytes)):
+            audio, decode_time = await self.decoder.decode(audio_source)
+            self.record_timing("decode", decode_time)
+
+            if self.cache is not None:
+                cache_key = audio_cache_key(model_name, audio)
+                cached = self.cache.get(cache_key)
+                if cached:
+                    logger.info("Transcription served from audio cache")
+                    for segment in Transcript.loads(cached):
+                        yield segment
+                    return
+
+            audio, speech_map = await self.speech_only(audio)
+            if speech_map is not None and not speech_map:
+                logger.info("No speech detected, skipping inference")
+                return
+
+            model_name, language = await self.route_language(
+                audio, model_name, language, on_language
+            )
+            windows = _iterate(
+                split_chunks(
+                    audio,
+                    Config.STREAM_CHUNK_SECONDS,
+                    overlap_seconds=Config.CHUNK_OVERLAP_SECONDS,
+                )
+            )
+            trim_windows = False
+        else:
+            blocks = self.decoder.decode_stream(audio_source)
+            if self.cache is not None:
+                hasher = pcm_hasher()
+                blocks = _hashed(blocks, hasher)
+            windows = split_stream(
+                blocks,
+                Config.STREAM_CHUNK_SECONDS,
+                overlap_seconds=Config.CHUNK_OVERLAP_SECONDS,
+            )
+            trim_windows = Config.VAD_ENABLED
+
+            cache_model = model_name
+            language = language or ""
+            if Config.LANGUAGE_DETECTION:
+                first = await anext(windows, None)
+                if first is not None:
+                    sample = first[2]
+                    if trim_windows:
+                        sample, _ = await asyncio.to_thread(trim_silence, sample)
+                    model_name, language = await self.route_language(
+                        sample, model_name, language, on_language
+                    )
+                    windows = _chain(first, windows)
+
+        previous_words = []
+        previous_end = 0
+        transcribed = []
+        # The model stays loaded until every window is done
+        async with self.registry.use(model_name) as executor:
+            async for start, end, segments in self._transcribe_windows(
+                windows, executor, trim_windows, language
+            ):
+                # Segment timestamps are in 10 ms units, relative to the chunk
+                offset = start * 100 // SAMPLE_RATE
+                owned_end = end * 100 // SAMPLE_RATE
+                for segment in segments:
+                    segment.t0 += offset
+                    segment.t1 += offset
+
+                # Later windows re-transcribe anything past this window's cut
+                segments = [s for s in segments if s.t0 < owned_end]
+                segments = _drop_repeated_words(previous_words, previous_end, segments)
+                for segment in segments:
+                    previous_end = segment.t1
+                    previous_words = (previous_words + segment.text.split())[
+                        -MAX_OVERLAP_WORDS:
+                    ]
+                    if speech_map:
+                        # Report times against the original, untrimmed audio
+                        segment.t0 = speech_map.to_original_cs(segment.t0)
+                        segment.t1 = speech_map.to_original_cs(segment.t1)
+                    yield segment
+                    transcribed.append(segment)
+
+        if hasher is not None:
+            # The whole stream has been decoded by now
+            cache_key = audio_cache_key(cache_model, hasher)
+        transcript = Transcript.from_segments(transcribed)
+        if cache_key and transcript:
+            self.cache.set(cache_key, transcript.dumps())
+
+    async def _transcribe_windows(
+        self,
+        windows: AsyncIterator[Tuple[int, int, np.ndarray]],
+        executor,
+        trim: bool = False,
+        language: str = "",
+    ) -> AsyncIterator[Tuple[int, int, List[Segment]]]:
+        """Transcribe windows, one per worker at a time, yielding them in order
+
+        Yields (start, end, segments) with times relative to the window.
+        With trim, silence is cut from each window before inference.
+        """
+        slots = asyncio.Semaphore(max(1, executor.workers))
+        started = asyncio.Queue()
+        done = object()
+
+        async def transcribe(chunk: np.ndarray) -> List[Segment]:
+            window_map = None
+            if trim:
+                start_time = time.perf_counter()
+                chunk, window_map = await asyncio.to_thread(trim_silence, chunk)
+                self.record_timing("vad", time.perf_counter() - start_time)
+                if not window_map:
+                    return []
+            segments, inference_time = await executor.run(
+                _transcribe, chunk, SEGMENT_PARAMS, language
+            )
+            self.record_timing("inference", inference_time)
+            if window_map:
+                for segment in segments:
+                    segment.t0 = window_map.to_original_cs(segment.t0)
+                    segment.t1 = window_map.to_original_cs(segment.t1)
+            return segments
+
+        async def schedule():
+            try:
+                async for start, end, chunk in windows:
+                    await slots.acquire()
+                    await started.put((start, end, asyncio.ensure_future(transcribe(chunk))))
+            except Exception as e:
+                # Raised in order, after the windows before it
+                await started.put(e)
+                return
+            await started.put(done)
+
+        scheduler = asyncio.ensure_future(schedule())
+        pending = []
+        try:
+            while True:
+                item = await started.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                start, end, future = item
+                pending.append(future)
+                segments = await future
+                pending.remove(future)
+                slots.release()
+                yield start, end, segments
+        finally:
+            scheduler.cancel()
+            while not started.empty():
+                item = started.get_nowait()
+                if isinstance(item, tuple):
+                    pending.append(item[2])
+            for future in pending:
+                future.cancel()
+
+    async def speech_only(
+        self, audio: np.ndarray
+    ) -> Tuple[np.ndarray, Optional[SpeechMap]]:
+        """Trim non-speech audio when VAD is enabled
+
+        Returns the audio to transcribe and a map back to the original
+        timestamps (None when VAD is off, empty when there is no speech).
+        """
+        if not Config.VAD_ENABLED:
+            return audio, None
+
+        start_time = time.perf_counter()
+        speech, speech_map = await asyncio.to_thread(trim_silence, audio)
+        self.record_timing("vad", time.perf_counter() - start_time)
+        if speech_map:
+            logger.info(
+                f"VAD kept {len(speech) / SAMPLE_RATE:.1f}s of "
+                f"{len(audio) / SAMPLE_RATE:.1f}s audio"
+            )
+        return speech, speech_map
+
+    def record_timing(self, stage: str, seconds: float):
+        """Add a stage duration to the running totals"""
+        timing = self.timings.setdefault(stage, [0, 0.0])
+        timing[0] += 1
+        timing[1] += seconds
+        STAGE_SECONDS.observe(seconds, stage=stage)
+
+    def average_timing(self, stage: str) -> float:
+        """Average seconds spent in a stage"""
+        count, total = self.timings.get(stage, (0, 0.0))
+        return total / count if count else 0.0
+
     def is_healthy(self) -> bool:
         """Check if transcriber is ready"""
-        return self.model is not None
+        if self.executor is None or not self.executor.is_healthy():
+            return False
+        # Process workers own their models, so there is none in this process
+        return self.model is not None or Config.INFERENCE_BACKEND == "process"
+
+    def worker_pids(self) -> List[int]:
+        """This process and the worker processes of every loaded model"""
+        pids = [os.getpid()]
+        for name in self.registry.loaded:
+            pids.extend(self.registry.get(name).worker_pids())
+        return pids
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Total RSS and PSS of this process and all inference workers"""
+        return total_memory(self.worker_pids())
+
+    def close(self):
+        """Release the inference workers of every loaded model"""
+        self.registry.shutdown()
+        self.executor = None
+
+
+def _describe(audio_source: Union[str, bytes, AsyncIterator[bytes]]) -> str:
+    """Describe an audio source for logging"""
+    if isinstance(audio_source, str):
+        return audio_source
+    if isinstance(audio_source, (bytes, bytearray)):
+        return f"<{len(audio_source)} bytes in memory>"
+    return "<download stream>"
+
+
+async def _iterate(items) -> AsyncIterator:
+    for item in items:
+        yield item
+
+
+async def _chain(first, rest: AsyncIterator) -> AsyncIterator:
+    """An item that was taken off an iterator, then the rest of it"""
+    yield first
+    async for item in rest:
+        yield item
+
+
+async def _hashed(blocks: AsyncIterator[np.ndarray], hasher) -> AsyncIterator[np.ndarray]:
+    """Pass PCM blocks through, feeding them to a hash on the way"""
+    async for block in blocks:
+        hasher.update(block.tobytes())
+        yield block
+
+
+def _load_model(model_path: str, n_threads: int) -> Model:
+    """Load a whisper model (also used as the worker process initializer)"""
+    return Model(model_path, n_threads=n_threads)
+
+
+def _transcribe(
+    model: Model, media, params: dict = SEGMENT_PARAMS, language: str = ""
+) -> Tuple[List[Segment], float]:
+    """Blocking whisper call, executed on an inference worker
+
+    Timed inside the worker so queueing in the pool is not counted as
+    inference time.
+    """
+    if language:
+        params = {**params, "language": language}
+    start_time = time.perf_counter()
+    segments = model.transcribe(media, **params)
+    return segments, time.perf_counter() - start_time
+
+
+def _detect_language(model: Model, media) -> Tuple[Tuple[str, float], float]:
+    """Blocking language identification, executed on an inference worker"""
+    start_time = time.perf_counter()
+    (language, probability), _ = model.auto_detect_language(media)
+    return (language, float(probability)), time.perf_counter() - start_time
+
+
+def _normalize_word(word: str) -> str:
+    return word.strip(".,!?;:\"'()").lower()
+
+
+def _drop_repeated_words(
+    previous_words: List[str], previous_end: int, segments: List[Segment]
+) -> List[Segment]:
+    """Remove words at the start of segments that repeat the previous window's tail
+
+    Only segments starting before previous_end (the end of the last emitted
+    segment) can repeat it; anything later is new speech even if the words
+    happen to match.
+    """
+    overlapping = list(itertools.takewhile(lambda s: s.t0 < previous_end, segments))
+    if not previous_words or not overlapping:
+        return segments
+
+    words = []
+    for segment in overlapping:
+        words.extend(segment.text.split())
+
+    tail = [_normalize_word(w) for w in previous_words]
+    head = [_normalize_word(w) for w in words[:MAX_OVERLAP_WORDS]]
+    repeated = 0
+    for n in range(min(len(tail), len(head)), MIN_OVERLAP_WORDS - 1, -1):
+        if tail[-n:] == head[:n]:
+            repeated = n
+            break
+
+    if not repeated:
+        return segments
+
+    result = []
+    for segment in segments:
+        if repeated:
+            segment_words = segment.text.split()
+            dropped = min(repeated, len(segment_words))
+            repeated -= dropped
+            segment.text = " ".join(segment_words[dropped:])
+            if not segment.text:
+                continue
+        result.append(segment)
+    return result
@@ -1,12 +1,20 @@
+import asyncio
+import datetime
 import logging
 import os
 import tempfile
-from typing import Optional
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Set, Union
 
 import aiofiles
+import httpx
 from telegram import File, InputFile, Update
 
 from config import Config
+from metrics import STAGE_SECONDS
+from ratelimit import progress_updates
+from segments import Transcript
 
 logger = logging.getLogger(__name__)
 
@@ -25,7 +33,11 @@ async def download_audio_file(file: File) -> Optional[str]:
         temp_file.close()
 
         # Download file
-        await file.download_to_drive(temp_path)
+        try:
+            await file.download_to_drive(temp_path)
+        except Exception:
+            cleanup_temp_file(temp_path)
+            raise
         logger.info(f"Audio file downloaded to: {temp_path}")
 
         return temp_path
@@ -35,6 +47,152 @@ async def download_audio_file(file: File) -> Optional[str]:
         return None
 
 
+# Containers that keep their index at the end of the file (MP4/M4A)
+# cannot be decoded from a pipe, they need a seekable file
+SEEKABLE_FORMATS = ("m4a", "mp4", "m4b", "mov", "3gp")
+
+
+class DownloadError(Exception):
+    """Raised when an audio file could not be downloaded from Telegram"""
+
+
+class DownloadedAudio:
+    """A downloaded audio file, held in memory or in a temp file"""
+
+    def __init__(self, data: Optional[bytes] = None, path: Optional[str] = None):
+        self.data = data
+        self.path = path
+
+    @property
+    def source(self) -> Union[bytes, str]:
+        """The bytes or file path to decode"""
+        return self.data if self.data is not None else self.path
+
+    @property
+    def in_memory(self) -> bool:
+        return self.data is not None
+
+
+def should_download_to_memory(file: File) -> bool:
+    """Check if a file is small enough, and pipe-decodable, to skip the disk"""
+    if not file.file_size or file.file_size > Config.IN_MEMORY_DOWNLOAD_MAX_MB * 1024 * 1024:
+        return False
+    extension = os.path.splitext(getattr(file, "file_path", None) or "")[1]
+    return extension.lstrip(".").lower() not in SEEKABLE_FORMATS
+
+
+@asynccontextmanager
+async def downloaded_audio(file: File) -> AsyncIterator[Optional[DownloadedAudio]]:
+    """Download audio for the duration of a with block
+
+    Small files are fetched into memory; larger ones (and MP4-style
+    containers) go to a temp file that is always removed on exit, even if
+    the block raises. Yields None if the download failed.
+    """
+    audio = None
+    start_time = time.perf_counter()
+    try:
+        if should_download_to_memory(file):
+            try:
+                data = await file.download_as_bytearray()
+                audio = DownloadedAudio(data=bytes(data))
+                logger.info(f"Audio file downloaded to memory: {len(data)} bytes")
+            except Exception as e:
+                logger.error(f"Failed to download audio file: {e}")
+        else:
+            path = await download_audio_file(file)
+            if path:
+                audio = DownloadedAudio(path=path)
+
+        if audio is not None:
+            STAGE_SECONDS.observe(time.perf_counter() - start_time, stage="download")
+        yield audio
+    finally:
+        if audio is not None and audio.path:
+            cleanup_temp_file(audio.path)
+
+
+# Size of the reads from a download stream
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+
+
+def should_pipeline_download(file: File) -> bool:
+    """Check if a file is large enough to decode while it downloads, and can be
+
+    Pipe-decodable formats only; files over the size limit go through
+    downloaded_audio, which rejects them.
+    """
+    if not Config.PIPELINED_DOWNLOAD or not file.file_size:
+        return False
+    if file.file_size > Config.MAX_AUDIO_SIZE_MB * 1024 * 1024:
+        return False
+    if file.file_size < Config.PIPELINE_MIN_MB * 1024 * 1024:
+        return False
+    extension = os.path.splitext(getattr(file, "file_path", None) or "")[1]
+    return extension.lstrip(".").lower() not in SEEKABLE_FORMATS
+
+
+async def iter_download(file: File) -> AsyncIterator[bytes]:
+    """Read a Telegram file chunk by chunk as it arrives"""
+    start_time = time.perf_counter()
+    path = str(file.file_path)
+    received = 0
+    if os.path.isfile(path):
+        # A local Bot API server (--local) hands out paths on this machine
+        async with aiofiles.open(path, "rb") as f:
+            while chunk := await f.read(DOWNLOAD_CHUNK_BYTES):
+                received += len(chunk)
+                yield chunk
+    else:
+        async with httpx.AsyncClient(timeout=httpx.Timeout(30.0)) as client:
+            async with client.stream("GET", path) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_BYTES):
+                    received += len(chunk)
+                    yield chunk
+    STAGE_SECONDS.observe(time.perf_counter() - start_time, stage="download")
+    logger.info(f"Audio file streamed: {received} bytes")
+
+
+async def buffered(chunks: AsyncIterator[bytes], max_chunks: int) -> AsyncIterator[bytes]:
+    """Read ahead of the consumer, holding at most max_chunks
+
+    The download keeps going while the consumer is busy (ffmpeg
+    decoding, a full pipe) and pauses once the buffer is full, so a
+    slow decoder never holds the whole file in memory.
+    """
+    queue = asyncio.Queue(maxsize=max(1, max_chunks))
+    done = object()
+
+    async def produce():
+        try:
+            async for chunk in chunks:
+                await queue.put(chunk)
+        except Exception as e:
+            # Raised on the consumer's side, after the chunks before it
+            await queue.put(e)
+            return
+        await queue.put(done)
+
+    producer = asyncio.ensure_future(produce())
+    try:
+        while True:
+            chunk = await queue.get()
+            if chunk is done:
+                break
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+    finally:
+        producer.cancel()
+
+
+def download_stream(file: File) -> AsyncIterator[bytes]:
+    """A file's bytes as they download, read ahead up to PIPELINE_BUFFER_MB"""
+    max_chunks = Config.PIPELINE_BUFFER_MB * 1024 * 1024 // DOWNLOAD_CHUNK_BYTES
+    return buffered(iter_download(file), max_chunks)
+
+
 def cleanup_temp_file(file_path: str):
     """Clean up temporary file"""
     try:
@@ -75,6 +233,144 @@ def format_processing_time(processing_time: float) -> str:
         return f"\n\n⏱️ *Processing time:* {minutes}m {seconds:.1f}s"
 
 
+def format_eta(seconds: float) -> str:
+    """Round an estimate to what is worth telling a user"""
+    if seconds < 60:
+        return f"~{max(1, round(seconds))}s"
+    minutes = round(seconds / 60)
+    if minutes < 60:
+        return f"~{minutes} min"
+    return f"~{minutes // 60}h {minutes % 60}m"
+
+
+def format_queued(position: int, eta: Optional[float]) -> str:
+    """Processing message for a job waiting in the queue"""
+    text = f"⏳ *Queued*\n📍 *Position:* {position}"
+    if eta is not None:
+        text += f"\n⏱️ *Ready in:* {format_eta(eta)}"
+    return text
+
+
+def format_partial_transcription(parts: List[str], elapsed: float) -> str:
+    """Format the latest part of an in-progress transcription (plain text)"""
+    # Only the tail fits into a message; walk back from the end so this
+    # stays cheap however long the transcript grows
+    MAX_PARTIAL_LENGTH = 3500
+
+    tail = []
+    length = 0
+    for part in reversed(parts):
+        if length + len(part) > MAX_PARTIAL_LENGTH:
+            break
+        tail.append(part)
+        length += len(part) + 1
+
+    prefix = "… " if len(tail) < len(parts) else ""
+    text = prefix + " ".join(reversed(tail))
+    return f"🎙️ Transcribing... ({elapsed:.0f}s)\n\n{text}"
+
+
+class ProgressMessage:
+    """Edit a processing message with progress, at most once per interval
+
+    Edits go out in the rate limiter's progress lane. push() sends them in
+    the background so transcription never waits for Telegram; close()
+    drops the ones not sent yet before the final result is.
+    """
+
+    def __init__(self, message, min_interval: float):
+        self.message = message
+        self.min_interval = min_interval
+        self._last_edit = 0.0
+        self._last_text = None
+        self._pending: Set[asyncio.Future] = set()
+
+    def due(self) -> bool:
+        """Check if enough time has passed since the last edit"""
+        return time.monotonic() - self._last_edit >= self.min_interval
+
+    async def update(self, text: str) -> bool:
+        """Edit the message if an edit is due and the text changed"""
+        if not self.due() or text == self._last_text:
+            return False
+        return await self._edit(text)
+
+    def push(self, text: str) -> bool:
+        """Start an edit without waiting for it, if one is due and the text changed"""
+        if not self.due() or text == self._last_text:
+            return False
+        # Counted from now, so pushes keep the interval while edits wait their turn
+        self._last_edit = time.monotonic()
+        self._last_text = text
+        edit = asyncio.ensure_future(self._edit(text))
+        self._pending.add(edit)
+        edit.add_done_callback(self._pending.discard)
+        return True
+
+    async def close(self):
+        """Cancel edits still waiting, so none lands after the final result"""
+        for edit in self._pending:
+            edit.cancel()
+        await asyncio.gather(*self._pending, return_exceptions=True)
+
+    async def _edit(self, text: str) -> bool:
+        try:
+            with progress_updates():
+                await self.message.edit_text(text)
+        except Exception as e:
+            # Progress is best effort (or superseded), the final result is sent separately
+            logger.debug(f"Failed to update progress message: {e}")
+            return False
+
+        self._last_edit = time.monotonic()
+        self._last_text = text
+        return True
+
+
+def export_documents(transcript: Transcript, formats: Sequence[str]) -> Dict[str, str]:
+    """Exported files of a transcript, by filename (none for an empty one)"""
+    if not transcript:
+        return {}
+    return {f"transcription.{fmt}": transcript.export(fmt) for fmt in formats}
+
+
+# Containers by MIME type, for files without an extension
+MIME_FORMATS = {
+    "audio/mpeg": "mp3",
+    "audio/mp3": "mp3",
+    "audio/ogg": "ogg",
+    "audio/opus": "opus",
+    "audio/mp4": "m4a",
+    "audio/m4a": "m4a",
+    "audio/x-m4a": "m4a",
+    "audio/wav": "wav",
+    "audio/x-wav": "wav",
+    "audio/flac": "flac",
+    "audio/x-flac": "flac",
+}
+
+
+def audio_format(audio_file) -> str:
+    """Container of a voice, audio or document, from its name or MIME type"""
+    file_name = getattr(audio_file, "file_name", None)
+    if isinstance(file_name, str) and "." in file_name:
+        return file_name.rsplit(".", 1)[1].lower()
+    mime_type = getattr(audio_file, "mime_type", None)
+    if isinstance(mime_type, str):
+        return MIME_FORMATS.get(mime_type.lower(), "")
+    return ""
+
+
+def media_duration(audio_file) -> Optional[float]:
+    """Seconds of audio Telegram reports (None for documents)"""
+    duration = getattr(audio_file, "duration", None)
+    if isinstance(duration, datetime.timedelta):
+        return duration.total_seconds()
+    if isinstance(duration, (int, float)) and duration > 0:
+        return float(duration)
+    return None
+
+
 def get_file_info(file: File) -> str:
     """Get file information for logging"""
     size_mb = file.file_size / (1024 * 1024) if file.file_size else 0
@@ -82,8 +378,17 @@ def get_file_info(file: File) -> str:
     return f"File ID: {file_id}, Size: {size_mb:.2f}MB"
 
 
-async def send_long_message(update: Update, text: str, processing_msg=None):
-    """Send long text as file if it exceeds Telegram limits"""
+async def send_long_message(
+    update: Update,
+    text: str,
+    processing_msg=None,
+    documents: Optional[Dict[str, str]] = None,
+):
+    """Send long text as file if it exceeds Telegram limits
+
+    documents (filename -> content), such as subtitle exports, are sent
+    as files after the text.
+    """
     # Telegram message limit is 4096 characters
     MAX_MESSAGE_LENGTH = 4000  # Leave some buffer
 
@@ -126,3 +431,12 @@ async def send_long_message(update: Update, text: str, processing_msg=None):
             await processing_msg.edit_text(error_msg)
         else:
             await update.message.reply_text(error_msg)
+        return
+
+    for filename, content in (documents or {}).items():
+        try:
+            await update.message.reply_document(
+                document=InputFile(content.encode("utf-8"), filename=filename)
+            )
+        except Exception as e:
+            logger.error(f"Failed to send {filename}: {e}")
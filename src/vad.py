@@ -0,0 +1,126 @@
+import bisect
+import logging
+from typing import List, Tuple
+
+import numpy as np
+
+from audio import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+# Analysis frame length (30 ms)
+FRAME_SAMPLES = SAMPLE_RATE * 30 // 1000
+
+# Frames quieter than this are never speech
+ABSOLUTE_THRESHOLD_DB = -45.0
+
+
+class SpeechMap:
+    """Maps positions in trimmed audio back to the original audio
+
+    Built from the speech regions kept by trim_silence, in order. Each
+    region is stored as (trimmed_start, original_start) in samples.
+    """
+
+    def __init__(self, regions: List[Tuple[int, int]]):
+        self._trimmed_starts = []
+        self._original_starts = []
+        trimmed = 0
+        for start, end in regions:
+            self._trimmed_starts.append(trimmed)
+            self._original_starts.append(start)
+            trimmed += end - start
+        self.regions = regions
+        self.trimmed_samples = trimmed
+
+    def __bool__(self) -> bool:
+        return bool(self.regions)
+
+    def to_original(self, sample: int) -> int:
+        """Translate a sample index in trimmed audio to the original audio"""
+        if not self.regions:
+            return sample
+        index = max(0, bisect.bisect_right(self._trimmed_starts, sample) - 1)
+        return self._original_starts[index] + sample - self._trimmed_starts[index]
+
+    def to_original_cs(self, centiseconds: int) -> int:
+        """Translate a whisper timestamp (10 ms units) to the original audio"""
+        sample = centiseconds * SAMPLE_RATE // 100
+        return self.to_original(sample) * 100 // SAMPLE_RATE
+
+
+def frame_levels(audio: np.ndarray) -> np.ndarray:
+    """RMS level of each 30 ms frame in dBFS"""
+    n_frames = len(audio) // FRAME_SAMPLES
+    if not n_frames:
+        return np.zeros(0, dtype=np.float32)
+    frames = audio[: n_frames * FRAME_SAMPLES].reshape(n_frames, FRAME_SAMPLES)
+    power = np.einsum("ij,ij->i", frames, frames) / FRAME_SAMPLES
+    return 10 * np.log10(power + 1e-10)
+
+
+def detect_speech(
+    audio: np.ndarray,
+    min_speech_ms: int = 250,
+    min_silence_ms: int = 500,
+    padding_ms: int = 200,
+) -> List[Tuple[int, int]]:
+    """Find speech regions as (start, end) sample ranges
+
+    A frame is speech when it is above an adaptive threshold: 10 dB over
+    the noise floor, but never more than 25 dB under the loudest frames and
+    never under ABSOLUTE_THRESHOLD_DB. Pauses shorter than min_silence_ms
+    are bridged, blips shorter than min_speech_ms dropped and every region
+    is padded so word edges are not clipped.
+    """
+    levels = frame_levels(audio)
+    if not len(levels):
+        return []
+
+    noise_floor = np.percentile(levels, 10)
+    peak = np.percentile(levels, 99)
+    threshold = max(ABSOLUTE_THRESHOLD_DB, min(noise_floor + 10, peak - 25))
+    is_speech = levels > threshold
+
+    frame_ms = FRAME_SAMPLES * 1000 // SAMPLE_RATE
+    regions = []
+    start = None
+    silence = 0
+    for index, speech in enumerate(is_speech):
+        if speech:
+            if start is None:
+                start = index
+            silence = 0
+        elif start is not None:
+            silence += 1
+            if silence * frame_ms >= min_silence_ms:
+                regions.append((start, index - silence + 1))
+                start = None
+                silence = 0
+    if start is not None:
+        regions.append((start, len(is_speech) - silence))
+
+    padding = padding_ms * SAMPLE_RATE // 1000
+    result = []
+    for first, last in regions:
+        if (last - first) * frame_ms < min_speech_ms:
+            continue
+        begin = max(0, first * FRAME_SAMPLES - padding)
+        end = min(len(audio), last * FRAME_SAMPLES + padding)
+        if result and begin <= result[-1][1]:
+            result[-1] = (result[-1][0], end)
+        else:
+            result.append((begin, end))
+    return result
+
+
+def trim_silence(audio: np.ndarray, **kwargs) -> Tuple[np.ndarray, SpeechMap]:
+    """Drop non-speech audio, returning the speech and a map back to the original"""
+    regions = detect_speech(audio, **kwargs)
+    speech_map = SpeechMap(regions)
+    if not regions:
+        return audio[:0], speech_map
+    if len(regions) == 1:
+        start, end = regions[0]
+        return audio[start:end], speech_map
+    return np.concatenate([audio[start:end] for start, end in regions]), speech_map
@@ -0,0 +1,162 @@
+import asyncio
+import hmac
+import json
+import logging
+from typing import Dict, Optional, Tuple
+
+from telegram import Update
+from telegram.ext import Application
+
+from metrics import WEBHOOK_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+# Telegram updates are small JSON documents; anything larger is not from Telegram
+MAX_BODY_BYTES = 1024 * 1024
+
+# Seconds an idle keep-alive connection is held open
+IDLE_TIMEOUT = 60
+
+
+class HTTPError(Exception):
+    """Request rejected with an HTTP status"""
+
+    def __init__(self, status: str):
+        super().__init__(status)
+        self.status = status
+
+
+class WebhookServer:
+    """Receives Telegram updates over HTTP and feeds them to the application
+
+    Telegram POSTs each update as JSON to ``path``. Requests must carry the
+    ``X-Telegram-Bot-Api-Secret-Token`` header set when the webhook was
+    registered. Accepted updates are put on the application's update queue,
+    the same queue long polling feeds, and acknowledged right away so
+    Telegram can send the next one without waiting for transcription.
+    """
+
+    def __init__(
+        self,
+        application: Application,
+        listen: str = "0.0.0.0",
+        port: int = 8443,
+        path: str = "/telegram",
+        secret_token: Optional[str] = None,
+    ):
+        self.application = application
+        self.listen = listen
+        self.port = port
+        self.path = "/" + path.lstrip("/")
+        self.secret_token = secret_token
+        self.updates_received = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.listen, self.port)
+        # Pick up the real port when started on port 0
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Webhook listening on {self.listen}:{self.port}{self.path}")
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve requests on one connection until the client closes it"""
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(
+                        _read_request(reader), timeout=IDLE_TIMEOUT
+                    )
+                    if request is None:
+                        break
+                    status = await self._process(*request)
+                except HTTPError as e:
+                    status = e.status
+                    request = None
+                except (ValueError, asyncio.LimitOverrunError):
+                    # Lines longer than the stream limit
+                    status = "400 Bad Request"
+                    request = None
+
+                WEBHOOK_REQUESTS.inc(status=status.split()[0])
+                keep_alive = request is not None and (
+                    request[2].get("connection", "").lower() != "close"
+                )
+                writer.write(_response(status, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _process(
+        self, method: str, path: str, headers: Dict[str, str], body: bytes
+    ) -> str:
+        """Validate one request and queue its update, returning the HTTP status"""
+        if path.split("?")[0] != self.path:
+            return "404 Not Found"
+        if method != "POST":
+            return "405 Method Not Allowed"
+
+        if self.secret_token and not hmac.compare_digest(
+            headers.get("x-telegram-bot-api-secret-token", "").encode(),
+            self.secret_token.encode(),
+        ):
+            logger.warning("Rejected webhook request with a wrong secret token")
+            return "403 Forbidden"
+
+        try:
+            update = Update.de_json(json.loads(body), self.application.bot)
+        except (ValueError, TypeError, KeyError) as e:
+            logger.warning(f"Rejected malformed webhook update: {e}")
+            return "400 Bad Request"
+
+        await self.application.update_queue.put(update)
+        self.updates_received += 1
+        return "200 OK"
+
+
+async def _read_request(
+    reader: asyncio.StreamReader,
+) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+    """Read one HTTP/1.1 request, or None when the connection was closed"""
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    parts = request_line.decode("latin-1").split()
+    if len(parts) < 2:
+        raise HTTPError("400 Bad Request")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise HTTPError("400 Bad Request")
+    if length < 0:
+        raise HTTPError("400 Bad Request")
+    if length > MAX_BODY_BYTES:
+        raise HTTPError("413 Payload Too Large")
+    body = await reader.readexactly(length) if length else b""
+    return parts[0], parts[1], headers, body
+
+
+def _response(status: str, keep_alive: bool) -> bytes:
+    return (
+        f"HTTP/1.1 {status}\r\n"
+        "Content-Length: 0\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    ).encode()
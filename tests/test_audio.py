@@ -0,0 +1,249 @@
+import asyncio
+import io
+import os
+import sys
+import unittest
+from unittest.mock import AsyncMock, Mock, patch
+
+import numpy as np
+import soundfile
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from audio import (
+    SAMPLE_RATE,
+    AudioDecoder,
+    resample,
+    sniff_format,
+    split_chunks,
+    split_stream,
+)
+
+
+def tone(seconds, amplitude=0.5):
+    """Generate a 440 Hz test tone"""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+
+
+class TestSplitChunks(unittest.TestCase):
+    def test_short_audio_single_chunk(self):
+        """Test audio shorter than a window is not split"""
+        audio = tone(5)
+        chunks = list(split_chunks(audio, chunk_seconds=30))
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(chunks[0][:2], (0, len(audio)))
+        self.assertEqual(len(chunks[0][2]), len(audio))
+
+    def test_chunks_cover_audio_without_gaps(self):
+        """Test chunks are contiguous and cover every sample"""
+        audio = tone(95)
+        chunks = list(split_chunks(audio, chunk_seconds=30))
+
+        self.assertEqual(len(chunks), 4)
+        position = 0
+        for start, end, chunk in chunks:
+            self.assertEqual(start, position)
+            self.assertLessEqual(len(chunk), 30 * SAMPLE_RATE)
+            position += len(chunk)
+        self.assertEqual(position, len(audio))
+
+    def test_cut_moves_to_silence(self):
+        """Test windows are cut in a pause rather than mid-speech"""
+        pause_at = 28.5
+        audio = np.concatenate([tone(pause_at), np.zeros(SAMPLE_RATE // 2), tone(20)])
+        (_, _, first), (second_start, _, _) = list(split_chunks(audio, chunk_seconds=30))
+
+        self.assertEqual(second_start, len(first))
+        cut_seconds = second_start / SAMPLE_RATE
+        self.assertGreaterEqual(cut_seconds, pause_at)
+        self.assertLessEqual(cut_seconds, pause_at + 0.5)
+
+    def test_overlap_extends_past_owned_range(self):
+        """Test overlapping windows repeat audio after each cut"""
+        audio = tone(65)
+        chunks = list(split_chunks(audio, chunk_seconds=30, overlap_seconds=1))
+
+        for (start, end, chunk), (next_start, _, _) in zip(chunks, chunks[1:]):
+            self.assertEqual(end, next_start)
+            self.assertEqual(len(chunk), end - start + SAMPLE_RATE)
+
+        last_start, last_end, last_chunk = chunks[-1]
+        self.assertEqual(last_end, len(audio))
+        self.assertEqual(len(last_chunk), last_end - last_start)
+
+
+class TestSplitStream(unittest.TestCase):
+    def split(self, audio, block_seconds=0.5, **kwargs):
+        block = int(block_seconds * SAMPLE_RATE)
+
+        async def blocks():
+            for start in range(0, len(audio), block):
+                yield audio[start : start + block]
+
+        async def collect():
+            return [window async for window in split_stream(blocks(), **kwargs)]
+
+        return asyncio.run(collect())
+
+    def test_matches_split_chunks(self):
+        """Test windows cut while audio arrives match cutting it all at once"""
+        pause_at = 28.5
+        audio = np.concatenate(
+            [tone(pause_at), np.zeros(SAMPLE_RATE // 2), tone(50), np.zeros(100)]
+        )
+
+        for overlap in (0, 1):
+            streamed = self.split(audio, chunk_seconds=30, overlap_seconds=overlap)
+            whole = list(split_chunks(audio, chunk_seconds=30, overlap_seconds=overlap))
+
+            self.assertEqual(
+                [window[:2] for window in streamed], [window[:2] for window in whole]
+            )
+            for (_, _, a), (_, _, b) in zip(streamed, whole):
+                np.testing.assert_array_equal(a, b)
+
+    def test_first_window_before_stream_ends(self):
+        """Test a window is yielded as soon as enough audio has arrived"""
+        received = []
+
+        async def blocks():
+            for _ in range(120):
+                received.append(1)
+                yield tone(1)
+
+        async def first_window():
+            async for window in split_stream(blocks(), chunk_seconds=30):
+                return window, len(received)
+
+        (start, end, _), seconds_received = asyncio.run(first_window())
+
+        self.assertEqual(start, 0)
+        self.assertLessEqual(end, 30 * SAMPLE_RATE)
+        self.assertLess(seconds_received, 40)
+
+
+def encode(audio, sample_rate, format, subtype=None):
+    """Encode PCM to in-memory file bytes"""
+    buffer = io.BytesIO()
+    soundfile.write(buffer, audio, sample_rate, format=format, subtype=subtype)
+    return buffer.getvalue()
+
+
+class TestDecoding(unittest.TestCase):
+    def test_sniff_format(self):
+        """Test containers are recognised from paths and magic bytes"""
+        self.assertEqual(sniff_format("/tmp/voice.OGA"), "oga")
+        self.assertEqual(sniff_format(b"OggS\x00\x02" + b"\x00" * 10), "ogg")
+        self.assertEqual(sniff_format(b"RIFF\x00\x00\x00\x00WAVEfmt "), "wav")
+        self.assertEqual(sniff_format(b"fLaC\x00\x00\x00\x22"), "flac")
+        self.assertEqual(sniff_format(b"ID3\x04\x00"), "")
+
+    def test_resample_to_16k(self):
+        """Test resampling keeps duration and pitch"""
+        t = np.arange(48000) / 48000
+        audio = np.sin(2 * np.pi * 440 * t).astype(np.float32)
+
+        resampled = resample(audio, 48000)
+        self.assertEqual(resampled.dtype, np.float32)
+        self.assertEqual(len(resampled), SAMPLE_RATE)
+
+        spectrum = np.abs(np.fft.rfft(resampled))
+        self.assertAlmostEqual(np.argmax(spectrum), 440, delta=2)
+
+        self.assertEqual(len(resample(audio[:44100], 44100)), SAMPLE_RATE)
+
+    def test_decodes_opus_voice_note_in_process(self):
+        """Test Telegram-style OGG/Opus bytes are decoded without ffmpeg"""
+        data = encode(tone(2), 16000, "OGG", "OPUS")
+        decoder = AudioDecoder()
+
+        with patch("audio.asyncio.create_subprocess_exec") as mock_exec:
+            audio, decode_time = asyncio.run(decoder.decode(data))
+
+        mock_exec.assert_not_called()
+        self.assertEqual(audio.dtype, np.float32)
+        self.assertAlmostEqual(len(audio) / SAMPLE_RATE, 2, delta=0.1)
+        self.assertGreaterEqual(decode_time, 0.0)
+        self.assertEqual(decoder.native_decodes, 1)
+
+    def test_stereo_wav_is_downmixed(self):
+        """Test multi-channel audio becomes mono"""
+        stereo = np.stack([tone(1), tone(1)], axis=1)
+        audio, _ = asyncio.run(AudioDecoder().decode(encode(stereo, 44100, "WAV")))
+        self.assertEqual(audio.ndim, 1)
+
+    def test_other_formats_use_ffmpeg(self):
+        """Test formats without a native decoder go through ffmpeg"""
+        pcm = tone(1).tobytes()
+        process = Mock()
+        process.returncode = 0
+        process.communicate = AsyncMock(return_value=(pcm, b""))
+        decoder = AudioDecoder(ffmpeg_processes=1)
+
+        with patch(
+            "audio.asyncio.create_subprocess_exec", AsyncMock(return_value=process)
+        ) as mock_exec:
+            audio, _ = asyncio.run(decoder.decode(b"ID3 mp3 bytes"))
+
+        self.assertEqual(mock_exec.call_args[0][0], "ffmpeg")
+        self.assertIn("pipe:0", mock_exec.call_args[0])
+        process.communicate.assert_called_once_with(b"ID3 mp3 bytes")
+        self.assertEqual(len(audio), SAMPLE_RATE)
+        self.assertEqual(decoder.ffmpeg_decodes, 1)
+
+    def test_ffmpeg_error_raises(self):
+        """Test ffmpeg failures surface as errors"""
+        process = Mock()
+        process.returncode = 1
+        process.communicate = AsyncMock(return_value=(b"", b"Invalid data"))
+
+        with patch(
+            "audio.asyncio.create_subprocess_exec", AsyncMock(return_value=process)
+        ):
+            with self.assertRaises(RuntimeError) as context:
+                asyncio.run(AudioDecoder().decode("/tmp/broken.mp3"))
+        self.assertIn("Invalid data", str(context.exception))
+
+    def test_decode_stream_feeds_chunks_and_yields_pcm(self):
+        """Test a stream is written to ffmpeg's stdin and PCM read as it comes"""
+        pcm = tone(2).tobytes()
+        written = []
+        process = Mock()
+        process.returncode = None
+        process.stdin.write = written.append
+        process.stdin.drain = AsyncMock()
+        process.stderr.read = AsyncMock(return_value=b"")
+        # Reads that end inside a sample
+        reads = iter([pcm[:1001], pcm[1001:], b""])
+        process.stdout.read = AsyncMock(side_effect=lambda n: next(reads))
+
+        async def wait():
+            process.returncode = 0
+
+        process.wait = wait
+
+        async def chunks():
+            yield b"first"
+            yield b"second"
+
+        async def collect():
+            decoder = AudioDecoder()
+            blocks = [block async for block in decoder.decode_stream(chunks())]
+            return decoder, blocks
+
+        with patch(
+            "audio.asyncio.create_subprocess_exec", AsyncMock(return_value=process)
+        ) as mock_exec:
+            decoder, blocks = asyncio.run(collect())
+
+        self.assertIn("pipe:0", mock_exec.call_args[0])
+        self.assertEqual(written, [b"first", b"second"])
+        process.stdin.close.assert_called_once()
+        np.testing.assert_array_equal(np.concatenate(blocks), tone(2))
+        self.assertEqual(decoder.ffmpeg_decodes, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
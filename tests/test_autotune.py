@@ -0,0 +1,118 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, patch
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+import autotune
+from autotune import find_models, model_rank, pick, thread_splits
+from config import load_tuning
+from models import split_model_name
+
+
+class TestAutotune(unittest.TestCase):
+    def test_split_model_name(self):
+        """Test quantization suffixes are split off the model name"""
+        self.assertEqual(split_model_name("base.en-q5_1"), ("base.en", "q5_1"))
+        self.assertEqual(split_model_name("small-q8_0"), ("small", "q8_0"))
+        self.assertEqual(split_model_name("large-v3"), ("large-v3", None))
+        self.assertEqual(split_model_name("base.en"), ("base.en", None))
+
+    def test_model_rank(self):
+        """Test larger models beat smaller ones, then precision decides"""
+        names = ["small.en-q5_1", "base.en", "tiny.en", "base.en-q8_0", "base.en-q5_0"]
+        self.assertEqual(
+            sorted(names, key=model_rank),
+            ["tiny.en", "base.en-q5_0", "base.en-q8_0", "base.en", "small.en-q5_1"],
+        )
+
+    def test_thread_splits(self):
+        """Test every split uses all cores, workers doubling"""
+        self.assertEqual(thread_splits(8), [(1, 8), (2, 4), (4, 2), (8, 1)])
+        self.assertEqual(thread_splits(6), [(1, 6), (2, 3), (4, 1), (6, 1)])
+        self.assertEqual(thread_splits(8, max_workers=2), [(1, 8), (2, 4)])
+        self.assertEqual(thread_splits(1), [(1, 1)])
+
+    def test_find_models(self):
+        """Test model files are found by name, quantized ones included"""
+        with tempfile.TemporaryDirectory() as tmp:
+            for file in ("ggml-base.en.bin", "ggml-base.en-q5_1.bin", "notes.txt"):
+                open(os.path.join(tmp, file), "w").close()
+
+            models = find_models(tmp)
+
+        self.assertEqual(list(models), ["base.en-q5_1", "base.en"])
+        self.assertTrue(models["base.en-q5_1"].endswith("ggml-base.en-q5_1.bin"))
+
+    def test_pick(self):
+        """Test the most accurate model under the target wins, on its best split"""
+        results = [
+            {"model": "base.en", "workers": 1, "threads": 4, "rtf": 0.2, "throughput": 5},
+            {"model": "base.en", "workers": 2, "threads": 2, "rtf": 0.3, "throughput": 7},
+            {"model": "small.en-q5_1", "workers": 1, "threads": 4, "rtf": 0.4, "throughput": 2.5},
+            {"model": "small.en-q5_1", "workers": 2, "threads": 2, "rtf": 0.7, "throughput": 3},
+            {"model": "small.en", "workers": 1, "threads": 4, "rtf": 0.9, "throughput": 1.1},
+        ]
+
+        best = pick(results, target_rtf=0.5)
+        self.assertEqual((best["model"], best["workers"]), ("small.en-q5_1", 1))
+
+        best = pick(results, target_rtf=0.35)
+        self.assertEqual((best["model"], best["workers"]), ("base.en", 2))
+
+        # Nothing fast enough: the fastest run
+        best = pick(results, target_rtf=0.1)
+        self.assertEqual((best["model"], best["workers"]), ("base.en", 1))
+
+    def test_main_writes_tuning_config_loads(self):
+        """Test the saved file is read back as settings for this host"""
+        measurements = {
+            ("ggml-base.en.bin", 1): {"rtf": 0.2, "throughput": 5.0},
+            ("ggml-base.en.bin", 2): {"rtf": 0.3, "throughput": 6.0},
+            ("ggml-base.en-q5_1.bin", 1): {"rtf": 0.1, "throughput": 9.0},
+            ("ggml-base.en-q5_1.bin", 2): {"rtf": 0.15, "throughput": 12.0},
+        }
+
+        async def measure(path, workers, threads, clip, repeat):
+            return measurements[(os.path.basename(path), workers)]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            for file in ("ggml-base.en.bin", "ggml-base.en-q5_1.bin"):
+                open(os.path.join(tmp, file), "w").close()
+            output = os.path.join(tmp, "autotune.json")
+
+            with patch.object(
+                autotune.Config, "WHISPER_MODEL_PATH", os.path.join(tmp, "ggml-base.en.bin")
+            ), patch("autotune.measure", AsyncMock(side_effect=measure)), patch(
+                "autotune.os.cpu_count", return_value=2
+            ):
+                code = autotune.main(["--seconds", "1", "--output", output])
+
+            with open(output) as f:
+                saved = json.load(f)
+            with patch("config.os.cpu_count", return_value=2):
+                settings = load_tuning(output)
+            with patch("config.os.cpu_count", return_value=16):
+                other_host = load_tuning(output)
+
+        self.assertEqual(code, 0)
+        self.assertEqual(len(saved["results"]), 4)
+        self.assertEqual(settings["WHISPER_MODEL_NAME"], "base.en")
+        self.assertEqual(settings["INFERENCE_WORKERS"], 2)
+        self.assertEqual(settings["WHISPER_THREADS"], 1)
+        self.assertEqual(other_host, {})
+
+    def test_missing_model_is_an_error(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with patch.object(
+                autotune.Config, "WHISPER_MODEL_PATH", os.path.join(tmp, "ggml-base.en.bin")
+            ):
+                self.assertEqual(autotune.main(["--models", "small.en"]), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+import asyncio
+import os
+import sys
+import unittest
+
+import numpy as np
+from pywhispercpp.model import Segment
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from batcher import InferenceBatcher
+
+SAMPLE_RATE = 16000
+
+
+def clip(seconds, value):
+    """Clip filled with a marker value so packed positions can be checked"""
+    return np.full(int(seconds * SAMPLE_RATE), value, dtype=np.float32)
+
+
+def words_from_packed(audio):
+    """Fake word-level whisper: one word per second of non-silent audio"""
+    segments = []
+    for second in range(len(audio) // SAMPLE_RATE):
+        value = audio[second * SAMPLE_RATE + SAMPLE_RATE // 2]
+        if value:
+            segments.append(Segment(second * 100, second * 100 + 90, f" w{int(value)}"))
+    return segments
+
+
+class TestInferenceBatcher(unittest.TestCase):
+    def setUp(self):
+        self.single_calls = []
+        self.batch_calls = []
+
+        async def run_single(audio):
+            self.single_calls.append(len(audio))
+            return [Segment(0, 100, "single")], 0.1
+
+        async def run_batch(audio):
+            self.batch_calls.append(audio)
+            await asyncio.sleep(0.01)
+            return words_from_packed(audio), 0.2
+
+        self.run_single = run_single
+        self.run_batch = run_batch
+
+    def make_batcher(self, **kwargs):
+        return InferenceBatcher(self.run_single, self.run_batch, **kwargs)
+
+    def test_concurrent_clips_share_one_call(self):
+        """Test clips arriving together are split back to their callers"""
+        batcher = self.make_batcher(max_batch_size=4, max_wait=0.05)
+
+        async def main():
+            return await asyncio.gather(
+                batcher.transcribe(clip(3, 1)),
+                batcher.transcribe(clip(2, 2)),
+                batcher.transcribe(clip(4, 3)),
+            )
+
+        results = asyncio.run(main())
+
+        self.assertEqual(len(self.batch_calls), 1)
+        self.assertEqual(self.single_calls, [])
+        texts = [segments[0].text for segments, _ in results]
+        self.assertEqual(texts, ["w1 w1 w1", "w2 w2", "w3 w3 w3 w3"])
+        # Timestamps are relative to each caller's own clip
+        self.assertEqual([segments[0].t0 for segments, _ in results], [0, 0, 0])
+        self.assertEqual(results[2][0][0].t1, 390)
+        self.assertEqual(batcher.batched_clips, 3)
+
+    def test_batched_clips_keep_their_confidence(self):
+        """Test each clip's segment carries the probability of its own words"""
+
+        async def run_batch(audio):
+            segments = words_from_packed(audio)
+            for segment in segments:
+                segment.probability = 0.9 if segment.text == " w1" else 0.3
+            return segments, 0.2
+
+        batcher = InferenceBatcher(self.run_single, run_batch, max_wait=0.05)
+
+        async def main():
+            return await asyncio.gather(
+                batcher.transcribe(clip(3, 1)), batcher.transcribe(clip(2, 2))
+            )
+
+        (first, _), (second, _) = asyncio.run(main())
+
+        self.assertAlmostEqual(first[0].probability, 0.9)
+        self.assertAlmostEqual(second[0].probability, 0.3)
+
+    def test_lone_clip_runs_unbatched(self):
+        """Test a clip with no company is transcribed normally after max_wait"""
+        batcher = self.make_batcher(max_wait=0.01)
+
+        segments, _ = asyncio.run(batcher.transcribe(clip(3, 1)))
+
+        self.assertEqual(segments[0].text, "single")
+        self.assertEqual(self.batch_calls, [])
+
+    def test_long_clip_skips_batching(self):
+        """Test clips over max_clip_seconds go straight to the model"""
+        batcher = self.make_batcher(max_clip_seconds=5)
+
+        asyncio.run(batcher.transcribe(clip(10, 1)))
+
+        self.assertEqual(self.single_calls, [10 * SAMPLE_RATE])
+
+    def test_batch_respects_context_and_size(self):
+        """Test batches never exceed the context length or max size"""
+        batcher = self.make_batcher(max_batch_size=2, max_wait=0.05)
+
+        async def main():
+            return await asyncio.gather(
+                *(batcher.transcribe(clip(12, i + 1)) for i in range(5))
+            )
+
+        results = asyncio.run(main())
+
+        for packed in self.batch_calls:
+            self.assertLessEqual(len(packed), 30 * SAMPLE_RATE)
+        self.assertEqual(len(self.batch_calls), 2)
+        self.assertEqual(len(self.single_calls), 1)
+        self.assertTrue(all(segments for segments, _ in results))
+
+    def test_failure_reaches_every_caller(self):
+        """Test a failed batch fails all of its clips"""
+
+        async def broken(audio):
+            raise RuntimeError("model crashed")
+
+        batcher = InferenceBatcher(self.run_single, broken, max_wait=0.01)
+
+        async def main():
+            return await asyncio.gather(
+                batcher.transcribe(clip(2, 1)),
+                batcher.transcribe(clip(2, 2)),
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(main())
+
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+# Add src and benchmarks to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+
+from benchmark import Pipeline, run_benchmark, summarize
+from clips import generate_clips, synth_speech
+from vad import detect_speech
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_summarize_percentiles(self):
+        """Test latency summaries are reported in milliseconds"""
+        summary = summarize([i / 1000 for i in range(1, 101)])
+
+        self.assertEqual(summary["count"], 100)
+        self.assertAlmostEqual(summary["p50_ms"], 50.5, places=1)
+        self.assertAlmostEqual(summary["p99_ms"], 99.01, places=1)
+        self.assertEqual(summary["max_ms"], 100.0)
+        self.assertEqual(summarize([]), {})
+
+    def test_synthetic_speech_has_pauses(self):
+        """Test generated clips contain several speech regions for the VAD"""
+        audio = synth_speech(20)[::3]  # 48 kHz -> 16 kHz is enough for levels
+
+        self.assertGreater(len(detect_speech(audio)), 1)
+
+    def test_pipeline_without_inference(self):
+        """Test clips run through download, decode and VAD stages"""
+        with tempfile.TemporaryDirectory() as directory:
+            clips = generate_clips(directory, durations=[2], formats=["ogg", "wav"])
+            pipeline = Pipeline(inference=False)
+            results = asyncio.run(run_benchmark(pipeline, clips, 2, 2))
+
+        self.assertEqual(results["jobs"], 4)
+        self.assertIn("decode", results["latency"])
+        self.assertNotIn("count", results["latency"]["inference"])
+        self.assertEqual(set(results["per_clip"]), {"speech_2s.ogg", "speech_2s.wav"})
+        self.assertGreater(results["throughput"]["audio_seconds_per_second"], 0)
+        self.assertTrue(np.isfinite(results["real_time_factor"]["mean"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,6 +8,7 @@ from unittest.mock import AsyncMock, Mock, patch
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
 from bot import TranscriberBot
+from segments import Transcript, TranscriptSegment
 
 
 class TestTranscriberBot(unittest.TestCase):
@@ -18,12 +19,54 @@ class TestTranscriberBot(unittest.TestCase):
         self.mock_config = self.config_patcher.start()
         self.mock_config.TELEGRAM_BOT_TOKEN = "test_token"
         self.mock_config.validate.return_value = None
+        self.mock_config.MAX_CONCURRENT_TRANSCRIPTIONS = 2
+        self.mock_config.MAX_QUEUED_JOBS = 1
+        self.mock_config.SHORT_AUDIO_SECONDS = 60
+        self.mock_config.MAX_QUEUED_JOBS_PER_USER = 5
+        self.mock_config.CACHE_ENABLED = False
+        self.mock_config.WHISPER_MODEL_NAME = "base.en"
+        self.mock_config.STREAMING_ENABLED = True
+        self.mock_config.STREAM_CHUNK_SECONDS = 30
+        self.mock_config.STREAM_EDIT_INTERVAL = 0
+        self.mock_config.TELEGRAM_API_BASE_URL = ""
+        self.mock_config.ROLE = "all"
+        self.mock_config.BROKER_URL = ""
+        self.mock_config.BROKER_LEASE_SECONDS = 120
+        self.mock_config.BROKER_MAX_ATTEMPTS = 3
+        self.mock_config.EXPORT_FORMATS = []
+        self.mock_config.JOURNAL_PATH = ""
+        self.mock_config.JOURNAL_MAX_ATTEMPTS = 3
+        self.mock_config.MAX_JOB_SECONDS = 0
+        self.mock_config.LANGUAGE_DETECTION = False
+        self.mock_config.WHISPER_THREADS = 4
+        self.mock_config.OUTBOUND_RATE_LIMIT = True
+        self.mock_config.OUTBOUND_GLOBAL_PER_SECOND = 30
+        self.mock_config.OUTBOUND_CHAT_PER_SECOND = 1
+        self.mock_config.OUTBOUND_GROUP_PER_MINUTE = 20
+        self.mock_config.OUTBOUND_MAX_RETRIES = 3
+        self.mock_config.WHISPER_MODELS = {
+            "base.en": "models/ggml-base.en.bin",
+            "tiny.en": "models/ggml-tiny.en.bin",
+        }
 
         # Mock the transcriber
         self.transcriber_patcher = patch("bot.WhisperTranscriber")
         self.mock_transcriber_class = self.transcriber_patcher.start()
         self.mock_transcriber = Mock()
         self.mock_transcriber.is_healthy.return_value = True
+        self.mock_transcriber.executor.in_flight = 1
+        self.mock_transcriber.executor.workers = 2
+        self.mock_transcriber.average_timing.return_value = 0.25
+        self.mock_transcriber.registry.route.return_value = "base.en"
+        self.mock_transcriber.registry.loaded = ["base.en"]
+        self.mock_transcriber.memory_usage.return_value = {
+            "rss": 300 * 1024 * 1024,
+            "pss": 200 * 1024 * 1024,
+            "shared": 150 * 1024 * 1024,
+            "processes": 3,
+        }
+        self.mock_transcriber.ready = asyncio.Event()
+        self.mock_transcriber.ready.set()
         self.mock_transcriber_class.return_value = self.mock_transcriber
 
         # Create bot instance
@@ -84,6 +127,280 @@ class TestTranscriberBot(unittest.TestCase):
         mock_message.reply_text.assert_called_once()
         args, kwargs = mock_message.reply_text.call_args
         self.assertIn("Bot Status Dashboard", args[0])
+        self.assertIn("0 running, 0 queued", args[0])
+        self.assertIn("1/2 busy", args[0])
+        self.assertIn("250ms / 250ms", args[0])
+        self.assertIn("300MB RSS / 200MB PSS (3 processes)", args[0])
+
+    def test_model_command(self):
+        """Test /model lists models, picks one and resets to automatic"""
+        mock_update = Mock()
+        mock_update.effective_user.id = 42
+        mock_update.message.reply_text = AsyncMock()
+        context = Mock()
+
+        def reply(*args):
+            context.args = list(args)
+            asyncio.run(self.bot.model_command(mock_update, context))
+            return mock_update.message.reply_text.call_args[0][0]
+
+        listing = reply()
+        self.assertIn("`tiny.en`", listing)
+        self.assertIn("`base.en` (loaded)", listing)
+        self.assertIn("Automatic", listing)
+
+        self.assertIn("tiny.en", reply("tiny.en"))
+        self.assertEqual(self.bot.user_models[42], "tiny.en")
+        self.assertIn("▶️ `tiny.en`", reply())
+
+        self.assertIn("Unknown Model", reply("large"))
+        self.assertEqual(self.bot.user_models[42], "tiny.en")
+
+        reply("auto")
+        self.assertNotIn(42, self.bot.user_models)
+
+    def test_format_command(self):
+        """Test /format picks export files, rejects unknown ones and turns them off"""
+        mock_update = Mock()
+        mock_update.effective_user.id = 42
+        mock_update.message.reply_text = AsyncMock()
+        context = Mock()
+
+        def reply(*args):
+            context.args = list(args)
+            asyncio.run(self.bot.format_command(mock_update, context))
+            return mock_update.message.reply_text.call_args[0][0]
+
+        self.assertIn("Off", reply())
+        self.assertIn("SRT, JSON", reply("srt", ".json", "srt"))
+        self.assertEqual(self.bot.export_formats(42), ["srt", "json"])
+        self.assertIn("Unknown Format", reply("docx"))
+        self.assertEqual(self.bot.export_formats(42), ["srt", "json"])
+        reply("off")
+        self.assertEqual(self.bot.export_formats(42), [])
+
+    def test_process_audio_sends_exports(self):
+        """Test the picked formats are sent as documents with the text"""
+        mock_update = Mock()
+        mock_update.effective_user.id = 42
+        processing_msg = Mock(edit_text=AsyncMock())
+        mock_update.message.reply_text = AsyncMock(return_value=processing_msg)
+        audio_file = Mock(duration=5, file_size=1000)
+        audio_file.get_file = AsyncMock(return_value=Mock())
+        transcript = Transcript([TranscriptSegment(0, 150, "Hi")])
+        self.mock_transcriber.transcribe_audio = AsyncMock(return_value=(transcript, 0.1))
+
+        download = AsyncMock()
+        download.__aenter__.return_value = Mock(source=b"audio")
+        send = AsyncMock()
+        with patch("bot.downloaded_audio", return_value=download), patch(
+            "bot.send_long_message", send
+        ):
+            asyncio.run(self.bot.process_audio(mock_update, audio_file, formats=["srt"]))
+
+        documents = send.call_args[0][3]
+        self.assertEqual(list(documents), ["transcription.srt"])
+        self.assertIn("00:00:00,000 --> 00:00:01,500", documents["transcription.srt"])
+
+    def test_large_document_is_transcribed_while_downloading(self):
+        """Test a large file is streamed into the transcriber, not downloaded first"""
+        mock_update = Mock()
+        mock_update.effective_user.id = 42
+        processing_msg = Mock(edit_text=AsyncMock())
+        mock_update.message.reply_text = AsyncMock(return_value=processing_msg)
+        # A document: no duration
+        audio_file = Mock(spec=["get_file", "file_size", "file_unique_id"])
+        audio_file.file_size = 30 * 1024 * 1024
+        audio_file.get_file = AsyncMock(return_value=Mock())
+        self.bot.is_ready = Mock(return_value=True)
+        self.bot.transcribe_streaming = AsyncMock(
+            return_value=(Transcript.from_text("Hi"), 0.1)
+        )
+        stream = Mock()
+
+        with patch("bot.should_pipeline_download", return_value=True), patch(
+            "bot.download_stream", return_value=stream
+        ), patch("bot.downloaded_audio") as downloaded, patch(
+            "bot.send_long_message", AsyncMock()
+        ):
+            asyncio.run(self.bot.process_audio(mock_update, audio_file))
+
+        downloaded.assert_not_called()
+        self.assertIs(self.bot.transcribe_streaming.call_args[0][0], stream)
+
+    def test_identical_files_in_flight_are_transcribed_once(self):
+        """Test copies of a forwarded file share the first copy's transcription"""
+        transcript = Transcript.from_text("Forwarded words")
+
+        async def transcribe(source, model_name, language, on_language):
+            await asyncio.sleep(0.01)
+            return transcript, 0.1
+
+        self.mock_transcriber.transcribe_audio = AsyncMock(side_effect=transcribe)
+        updates = []
+        for user_id in (1, 2, 3):
+            update = Mock()
+            update.effective_user.id = user_id
+            update.message.reply_text = AsyncMock(return_value=Mock(edit_text=AsyncMock()))
+            updates.append(update)
+
+        def copy():
+            audio_file = Mock(duration=5, file_size=1000, file_unique_id="AgADsame")
+            audio_file.get_file = AsyncMock(return_value=Mock())
+            return audio_file
+
+        download = AsyncMock()
+        download.__aenter__.return_value = Mock(source=b"audio")
+        send = AsyncMock()
+
+        async def main():
+            await asyncio.gather(
+                *(self.bot.process_audio(update, copy()) for update in updates)
+            )
+
+        with patch("bot.downloaded_audio", return_value=download) as downloaded, patch(
+            "bot.send_long_message", send
+        ):
+            asyncio.run(main())
+
+        self.mock_transcriber.transcribe_audio.assert_called_once()
+        downloaded.assert_called_once()
+        self.assertEqual(send.call_count, 3)
+        self.assertTrue(all("Forwarded words" in call[0][1] for call in send.call_args_list))
+        self.assertEqual(self.bot.in_flight.coalesced, 2)
+
+    def test_language_hint_routes_later_audio(self):
+        """Test a user's confident recent language sends their next job to the multilingual model"""
+        self.mock_config.LANGUAGE_DETECTION = True
+        self.mock_config.MULTILINGUAL_MODEL = "base"
+        self.mock_config.LANGUAGE_HINT_CONFIDENCE = 0.9
+        self.mock_config.LANGUAGE_HINT_SECONDS = 600
+        voice = Mock(duration=5)
+
+        self.assertEqual(self.bot.job_model(voice, None, 42), "base.en")
+
+        with patch("bot.time.monotonic", return_value=1000):
+            self.bot.remember_language(42, "es", 0.95)
+            self.bot.remember_language(7, "es", 0.6)
+            self.assertEqual(self.bot.language_hint(42), "es")
+            self.assertEqual(self.bot.job_model(voice, None, 42), "base")
+            # Not sure enough to skip detection next time
+            self.assertIsNone(self.bot.language_hint(7))
+            self.assertEqual(self.bot.job_model(voice, None, 7), "base.en")
+
+        with patch("bot.time.monotonic", return_value=1700):
+            self.assertIsNone(self.bot.language_hint(42))
+
+    def test_job_predicted_over_limit_is_rejected(self):
+        """Test a job predicted to run past MAX_JOB_SECONDS is refused up front"""
+        self.mock_config.MAX_JOB_SECONDS = 600
+        self.mock_transcriber.registry.route.return_value = "base.en"
+        self.bot.estimator.record("base.en", "ogg", 100, 50)
+        self.bot.scheduler.submit = Mock()
+        update = Mock()
+        update.effective_user.id = 42
+        update.message.reply_text = AsyncMock()
+
+        asyncio.run(self.bot.enqueue_audio(update, Mock(duration=3600, file_size=10**7)))
+
+        self.bot.scheduler.submit.assert_not_called()
+        self.assertIn("Too Long", update.message.reply_text.call_args[0][0])
+
+        asyncio.run(self.bot.enqueue_audio(update, Mock(duration=600, file_size=10**6)))
+        self.bot.scheduler.submit.assert_called_once()
+
+    def test_process_audio_shows_estimate_and_learns(self):
+        """Test the processing message has an ETA and finished jobs teach the estimator"""
+        mock_update = Mock()
+        mock_update.effective_user.id = 42
+        processing_msg = Mock(edit_text=AsyncMock())
+        mock_update.message.reply_text = AsyncMock(return_value=processing_msg)
+        audio_file = Mock(duration=40, file_size=160000, mime_type="audio/ogg")
+        audio_file.get_file = AsyncMock(return_value=Mock())
+        self.mock_transcriber.registry.route.return_value = "base.en"
+        self.mock_transcriber.transcribe_audio = AsyncMock(
+            return_value=(Transcript.from_text("Hi"), 0.1)
+        )
+
+        download = AsyncMock()
+        download.__aenter__.return_value = Mock(source=b"audio")
+        with patch("bot.downloaded_audio", return_value=download), patch(
+            "bot.send_long_message", AsyncMock()
+        ), patch.object(self.bot, "should_stream", return_value=False):
+            asyncio.run(self.bot.process_audio(mock_update, audio_file))
+
+        self.assertIn("Estimated time:* ~6s", mock_update.message.reply_text.call_args[0][0])
+        self.assertIsNotNone(self.bot.estimator.rtf("base.en"))
+
+    def test_process_audio_uses_chosen_model(self):
+        """Test the user's /model choice is routed and passed to the transcriber"""
+        mock_update = Mock()
+        mock_update.effective_user.id = 42
+        processing_msg = Mock(edit_text=AsyncMock())
+        mock_update.message.reply_text = AsyncMock(return_value=processing_msg)
+        audio_file = Mock(duration=5, file_size=1000)
+        audio_file.get_file = AsyncMock(return_value=Mock())
+        self.mock_transcriber.transcribe_audio = AsyncMock(
+            return_value=(Transcript.from_text("Hi"), 0.1)
+        )
+
+        download = AsyncMock()
+        download.__aenter__.return_value = Mock(source=b"audio")
+        with patch("bot.downloaded_audio", return_value=download), patch(
+            "bot.send_long_message", AsyncMock()
+        ):
+            asyncio.run(
+                self.bot.process_audio(
+                    mock_update, audio_file, preferred_model="tiny.en"
+                )
+            )
+
+        self.mock_transcriber.registry.route.assert_called_once_with(5, "tiny.en")
+        args = self.mock_transcriber.transcribe_audio.call_args[0]
+        self.assertEqual(args[:3], (b"audio", "base.en", None))
+
+    def test_status_while_starting(self):
+        """Test /status reports a model that is still loading"""
+        mock_update = Mock()
+        mock_update.message.reply_text = AsyncMock()
+        self.mock_transcriber.ready.clear()
+
+        asyncio.run(self.bot.status_command(mock_update, None))
+
+        self.assertIn("Starting", mock_update.message.reply_text.call_args[0][0])
+        self.assertFalse(self.bot.is_ready())
+
+    def test_jobs_wait_for_model_during_startup(self):
+        """Test a job accepted during startup is transcribed once the model is ready"""
+        mock_update = Mock()
+        mock_update.effective_user.id = 42
+        processing_msg = Mock(edit_text=AsyncMock())
+        mock_update.message.reply_text = AsyncMock(return_value=processing_msg)
+        audio_file = Mock(duration=5, file_size=1000)
+        audio_file.get_file = AsyncMock(return_value=Mock())
+        self.mock_transcriber.transcribe_audio = AsyncMock(
+            return_value=(Transcript.from_text("Hi"), 0.1)
+        )
+        self.mock_transcriber.ready = asyncio.Event()
+
+        download = AsyncMock()
+        download.__aenter__.return_value = Mock(source=b"audio")
+
+        async def main():
+            job = asyncio.ensure_future(self.bot.process_audio(mock_update, audio_file))
+            await asyncio.sleep(0.05)
+            started_early = self.mock_transcriber.transcribe_audio.await_count
+            self.mock_transcriber.ready.set()
+            await job
+            return started_early
+
+        with patch("bot.downloaded_audio", return_value=download), patch(
+            "bot.send_long_message", AsyncMock()
+        ):
+            started_early = asyncio.run(main())
+
+        self.assertEqual(started_early, 0)
+        self.mock_transcriber.transcribe_audio.assert_awaited_once()
 
     @patch("bot.asyncio.create_task")
     def test_handle_voice(self, mock_create_task):
@@ -91,13 +408,318 @@ class TestTranscriberBot(unittest.TestCase):
         mock_update = Mock()
         mock_message = Mock()
         mock_message.voice = Mock()
+        mock_message.voice.duration = 5
         mock_update.message = mock_message
+        mock_update.effective_user.id = 42
 
         # Run the handler
         asyncio.run(self.bot.handle_voice(mock_update, None))
 
         # Verify task creation
         mock_create_task.assert_called_once()
+        self.assertEqual(self.bot.scheduler.in_flight, 1)
+
+    def test_handle_voice_queue_full(self):
+        """Test voice messages are rejected quickly when the queue is full"""
+        mock_update = Mock()
+        mock_update.effective_user.id = 42
+        mock_update.message.voice.duration = 5
+        mock_update.message.reply_text = AsyncMock()
+
+        async def run():
+            started = asyncio.Event()
+            release = asyncio.Event()
+
+            async def block(
+                update, audio_file, processing_msg=None, preferred_model=None, formats=()
+            ):
+                started.set()
+                await release.wait()
+
+            with patch.object(self.bot, "process_audio", side_effect=block):
+                # Two running + one queued fill the scheduler
+                for _ in range(4):
+                    await self.bot.handle_voice(mock_update, None)
+                await started.wait()
+                release.set()
+                await self.bot.scheduler.shutdown()
+
+        asyncio.run(run())
+
+        # The queued job is told its place, the fourth is rejected
+        replies = [c[0][0] for c in mock_update.message.reply_text.call_args_list]
+        self.assertEqual(len(replies), 2)
+        self.assertIn("Position:* 1", replies[0])
+        self.assertIn("Queue Full", replies[1])
+        args, _ = mock_update.message.reply_text.call_args
+        self.assertIn("Queue Full", args[0])
+        self.assertEqual(self.bot.scheduler.rejected, 1)
+
+    @patch("bot.WebhookServer")
+    def test_start_webhook_keeps_pending_updates(self, mock_server_class):
+        """Test webhook mode registers the URL and secret without dropping updates"""
+        mock_server_class.return_value.start = AsyncMock()
+        self.mock_config.WEBHOOK_URL = "https://example.com/telegram"
+        self.mock_config.WEBHOOK_SECRET_TOKEN = "secret"
+        self.mock_config.DROP_PENDING_UPDATES = False
+        self.bot.app = Mock()
+        self.bot.app.bot.set_webhook = AsyncMock()
+
+        asyncio.run(self.bot.start_webhook())
+
+        mock_server_class.return_value.start.assert_awaited_once()
+        kwargs = self.bot.app.bot.set_webhook.call_args.kwargs
+        self.assertEqual(kwargs["url"], "https://example.com/telegram")
+        self.assertEqual(kwargs["secret_token"], "secret")
+        self.assertFalse(kwargs["drop_pending_updates"])
+
+    def test_frontend_enqueues_job_for_workers(self):
+        """Test a frontend queues the file, chat and processing message on the broker"""
+        from broker import InProcessBroker
+
+        self.mock_config.MAX_QUEUED_JOBS = 10
+        self.bot.broker = InProcessBroker()
+        update = Mock()
+        update.effective_user.id = 42
+        update.effective_chat.id = 42
+        update.message.message_id = 7
+        update.message.reply_text = AsyncMock(return_value=Mock(message_id=8))
+        voice = Mock(file_id="voice-id", file_unique_id="u", file_size=100, duration=5)
+
+        async def main():
+            await self.bot.enqueue_audio(update, voice)
+            return await self.bot.broker.get(timeout=0.1)
+
+        job = asyncio.run(main())
+
+        self.assertEqual((job.chat_id, job.message_id), (42, 7))
+        self.assertEqual(job.processing_message_id, 8)
+        self.assertEqual(job.file_id, "voice-id")
+        self.assertIn("Queued", update.message.reply_text.call_args[0][0])
+
+    def test_worker_runs_and_acks_job(self):
+        """Test a worker rebuilds the messages, edits the processing one and acks"""
+        from broker import TranscriptionJob
+
+        job = TranscriptionJob(
+            user_id=42,
+            chat_id=42,
+            message_id=7,
+            file_id="voice-id",
+            duration=5,
+            processing_message_id=8,
+        )
+        self.bot.broker = Mock()
+        self.bot.broker.ack = AsyncMock()
+        self.bot.process_audio = AsyncMock()
+        slots = asyncio.Semaphore(1)
+
+        async def main():
+            await slots.acquire()
+            await self.bot.run_job(job, slots)
+
+        asyncio.run(main())
+
+        update, audio_file, processing_msg = self.bot.process_audio.call_args[0]
+        self.assertEqual(update.effective_user.id, 42)
+        self.assertEqual(update.message.chat_id, 42)
+        self.assertEqual(processing_msg.message_id, 8)
+        self.assertEqual((audio_file.file_id, audio_file.duration), ("voice-id", 5))
+        self.bot.broker.ack.assert_awaited_once_with(job)
+        self.assertFalse(slots.locked())
+
+    def test_worker_renews_lease_while_transcribing(self):
+        """Test the job's lease is renewed until processing finishes"""
+        from broker import TranscriptionJob
+
+        self.mock_config.BROKER_LEASE_SECONDS = 0.03
+        job = TranscriptionJob(user_id=42, chat_id=42, message_id=7, file_id="f")
+        self.bot.broker = Mock()
+        self.bot.broker.ack = AsyncMock()
+        self.bot.broker.renew = AsyncMock()
+
+        async def slow_process(*args, **kwargs):
+            await asyncio.sleep(0.1)
+
+        self.bot.process_audio = slow_process
+
+        async def main():
+            slots = asyncio.Semaphore(1)
+            await slots.acquire()
+            await self.bot.run_job(job, slots)
+            renewals = self.bot.broker.renew.await_count
+            await asyncio.sleep(0.05)
+            return renewals
+
+        renewals = asyncio.run(main())
+
+        self.assertGreaterEqual(renewals, 2)
+        self.assertEqual(self.bot.broker.renew.await_count, renewals)
+        self.bot.broker.ack.assert_awaited_once_with(job)
+
+    def test_worker_abandons_job_after_max_attempts(self):
+        """Test a job that keeps killing workers is reported and dropped"""
+        from broker import TranscriptionJob
+
+        job = TranscriptionJob(
+            user_id=42, chat_id=42, message_id=7, file_id="f", processing_message_id=8
+        )
+        job.attempts = 4
+        self.bot.broker = Mock()
+        self.bot.broker.ack = AsyncMock()
+        self.bot.process_audio = AsyncMock()
+
+        async def main():
+            slots = asyncio.Semaphore(1)
+            await slots.acquire()
+            with patch("telegram.Message.edit_text", AsyncMock()) as edit_text:
+                await self.bot.run_job(job, slots)
+            return edit_text
+
+        edit_text = asyncio.run(main())
+
+        self.bot.process_audio.assert_not_awaited()
+        self.assertIn("Transcription Failed", edit_text.call_args[0][0])
+        self.bot.broker.ack.assert_awaited_once_with(job)
+
+    def test_duplicate_message_is_ignored_with_journal(self):
+        """Test a message delivered again after a restart is not queued twice"""
+        import tempfile
+        from journal import JobJournal
+
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.bot.journal = JobJournal(os.path.join(tmp.name, "journal.db"))
+        self.bot.scheduler.submit = Mock()
+        update = Mock()
+        update.effective_user.id = 42
+        update.effective_chat.id = 42
+        update.message.message_id = 7
+        voice = Mock(file_id="voice-id", file_unique_id="u", file_size=100, duration=5)
+
+        async def main():
+            await self.bot.enqueue_audio(update, voice)
+            await self.bot.enqueue_audio(update, voice)
+            await self.bot.journal.close()
+
+        asyncio.run(main())
+
+        self.bot.scheduler.submit.assert_called_once()
+
+    def test_resume_jobs_from_journal(self):
+        """Test unfinished jobs are queued again, and given up after max attempts"""
+        from broker import TranscriptionJob
+
+        fresh = TranscriptionJob(user_id=42, chat_id=42, message_id=7, file_id="a")
+        failing = TranscriptionJob(
+            user_id=42, chat_id=42, message_id=8, file_id="b", processing_message_id=9
+        )
+        failing.attempts = 3
+        self.bot.journal = Mock()
+        self.bot.journal.unfinished = AsyncMock(return_value=[fresh, failing])
+        self.bot.journal.finish = AsyncMock()
+        self.bot.scheduler.submit = Mock()
+
+        async def main():
+            with patch("telegram.Message.edit_text", AsyncMock()) as edit_text:
+                await self.bot.resume_jobs()
+            return edit_text
+
+        edit_text = asyncio.run(main())
+
+        self.bot.scheduler.submit.assert_called_once()
+        self.assertEqual(self.bot.scheduler.submit.call_args[0][:2], (42, None))
+        self.assertIn("Transcription Failed", edit_text.call_args[0][0])
+        self.bot.journal.finish.assert_awaited_once_with(failing)
+
+    def test_should_stream(self):
+        """Test only long or unknown-length audio is streamed"""
+        self.assertFalse(self.bot.should_stream(Mock(duration=10)))
+        self.assertTrue(self.bot.should_stream(Mock(duration=600)))
+        self.assertTrue(self.bot.should_stream(Mock(spec=[])))
+
+        self.mock_config.STREAMING_ENABLED = False
+        self.assertFalse(self.bot.should_stream(Mock(duration=600)))
+
+    def test_transcribe_streaming(self):
+        """Test streaming edits the processing message with partial text"""
+
+        async def fake_stream(_path, model_name=None, language=None, on_language=None):
+            for i, text in enumerate(["Hello", "streaming", "world"]):
+                yield TranscriptSegment(i * 100, i * 100 + 90, text)
+                # Progress edits are sent in the background
+                await asyncio.sleep(0)
+
+        self.mock_transcriber.transcribe_stream = fake_stream
+        processing_msg = Mock()
+        processing_msg.edit_text = AsyncMock()
+
+        result = asyncio.run(self.bot.transcribe_streaming("/tmp/a.oga", processing_msg))
+
+        transcript, processing_time = result
+        self.assertEqual(transcript.text, "Hello streaming world")
+        self.assertEqual(transcript.segments[2].t0, 200)
+        self.assertGreaterEqual(processing_time, 0.0)
+        self.assertEqual(processing_msg.edit_text.call_count, 3)
+        self.assertIn("Hello streaming", processing_msg.edit_text.call_args_list[1][0][0])
+
+    @patch("bot.downloaded_audio")
+    def test_process_audio_cache_hit(self, mock_download):
+        """Test a forwarded file is answered from the cache without downloading"""
+        from cache import TranscriptionCache, file_cache_key
+
+        self.bot.cache = TranscriptionCache()
+        self.bot.cache.set(file_cache_key("base.en", "AgADuniq"), "Cached words")
+
+        mock_update = Mock()
+        mock_update.message.reply_text = AsyncMock()
+        audio_file = Mock()
+        audio_file.file_unique_id = "AgADuniq"
+        audio_file.get_file = AsyncMock()
+
+        asyncio.run(self.bot.process_audio(mock_update, audio_file))
+
+        mock_download.assert_not_called()
+        audio_file.get_file.assert_not_called()
+        args, _ = mock_update.message.reply_text.call_args
+        self.assertIn("Cached words", args[0])
+
+    def test_process_audio_cleans_up_on_error(self):
+        """Test the downloaded temp file is removed even if transcription raises"""
+        import tempfile
+
+        temp = tempfile.NamedTemporaryFile(delete=False, suffix=".oga")
+        temp.close()
+
+        async def download_to_drive(path):
+            pass
+
+        file_obj = Mock()
+        file_obj.file_size = 100 * 1024 * 1024
+        file_obj.file_path = "voice/file.oga"
+        file_obj.download_to_drive = AsyncMock(side_effect=download_to_drive)
+
+        audio_file = Mock(spec=["get_file", "duration", "file_size", "file_id"])
+        audio_file.get_file = AsyncMock(return_value=file_obj)
+        audio_file.duration = 5
+        audio_file.file_size = 1024
+
+        mock_update = Mock()
+        mock_update.message.reply_text = AsyncMock()
+        self.mock_transcriber.transcribe_audio = AsyncMock(
+            side_effect=RuntimeError("boom")
+        )
+
+        with patch("utils.Config") as utils_config, patch(
+            "utils.tempfile.NamedTemporaryFile", return_value=temp
+        ):
+            utils_config.MAX_AUDIO_SIZE_MB = 200
+            utils_config.IN_MEMORY_DOWNLOAD_MAX_MB = 20
+            asyncio.run(self.bot.process_audio(mock_update, audio_file))
+
+        self.assertFalse(os.path.exists(temp.name))
+        args, _ = mock_update.message.reply_text.call_args
+        self.assertIn("Processing Error", args[0])
 
 
 if __name__ == "__main__":
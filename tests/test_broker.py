@@ -0,0 +1,166 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import Mock
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from broker import (
+    InProcessBroker,
+    SqliteBroker,
+    TranscriptionJob,
+    create_broker,
+)
+
+
+def make_job(**kwargs):
+    values = dict(user_id=1, chat_id=1, message_id=5, file_id="file-1")
+    values.update(kwargs)
+    return TranscriptionJob(**values)
+
+
+class TestTranscriptionJob(unittest.TestCase):
+    def test_json_round_trip(self):
+        """Test jobs survive serialization between processes"""
+        job = make_job(duration=12, processing_message_id=6, file_unique_id="u1")
+
+        copy = TranscriptionJob.from_json(job.to_json())
+
+        for field in TranscriptionJob.FIELDS:
+            self.assertEqual(getattr(copy, field), getattr(job, field))
+
+    def test_from_message(self):
+        """Test a job carries the chat, message and file of an update"""
+        update = Mock()
+        update.effective_user.id = 7
+        update.effective_chat.id = -100
+        update.message.message_id = 3
+        voice = Mock(file_id="f", file_unique_id="u", file_size=10, duration=4)
+
+        job = TranscriptionJob.from_message(update, voice, processing_message_id=4)
+
+        self.assertEqual(
+            (job.user_id, job.chat_id, job.message_id, job.processing_message_id),
+            (7, -100, 3, 4),
+        )
+        self.assertEqual((job.file_id, job.duration), ("f", 4))
+
+
+class TestBrokers(unittest.TestCase):
+    def test_in_process_broker(self):
+        """Test jobs come out in order and get times out when empty"""
+
+        async def main():
+            broker = InProcessBroker()
+            await broker.put(make_job(file_id="a"))
+            await broker.put(make_job(file_id="b"))
+            size = await broker.size()
+            first = await broker.get()
+            second = await broker.get()
+            empty = await broker.get(timeout=0.01)
+            return size, first.file_id, second.file_id, empty
+
+        self.assertEqual(asyncio.run(main()), (2, "a", "b", None))
+
+    def test_sqlite_broker_shared_between_connections(self):
+        """Test a job put by one process is taken once by another"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "jobs.db")
+
+            async def main():
+                frontend = SqliteBroker(path)
+                worker_a = SqliteBroker(path, poll_interval=0.01)
+                worker_b = SqliteBroker(path, poll_interval=0.01)
+                await frontend.put(make_job(file_id="a"))
+
+                job = await worker_a.get(timeout=0.1)
+                duplicate = await worker_b.get(timeout=0.05)
+                waiting = await frontend.size()
+                await worker_a.ack(job)
+                for broker in (frontend, worker_a, worker_b):
+                    await broker.close()
+                return job.file_id, duplicate, waiting
+
+            self.assertEqual(asyncio.run(main()), ("a", None, 0))
+
+    def test_sqlite_broker_redelivers_expired_lease(self):
+        """Test a job whose worker never acknowledged it is retried"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "jobs.db")
+
+            async def main():
+                broker = SqliteBroker(path, lease_seconds=0.05, poll_interval=0.01)
+                await broker.put(make_job())
+                first = await broker.get(timeout=0.1)
+                # Worker "crashed": no ack
+                retried = await broker.get(timeout=0.5)
+                await broker.ack(retried)
+                gone = await broker.get(timeout=0.1)
+                await broker.close()
+                return first.job_id == retried.job_id, gone
+
+            self.assertEqual(asyncio.run(main()), (True, None))
+
+    def test_sqlite_broker_renewed_lease_is_kept(self):
+        """Test a job outliving its lease is not redelivered while renewed"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "jobs.db")
+
+            async def main():
+                broker = SqliteBroker(path, lease_seconds=0.1, poll_interval=0.01)
+                await broker.put(make_job())
+                job = await broker.get(timeout=0.1)
+                for _ in range(4):
+                    await asyncio.sleep(0.05)
+                    await broker.renew(job)
+                duplicate = await broker.get(timeout=0.01)
+                # Renewals stop (worker died): the job comes back, counted
+                retried = await broker.get(timeout=0.5)
+                await broker.close()
+                return job.attempts, duplicate, retried.attempts
+
+            self.assertEqual(asyncio.run(main()), (1, None, 2))
+
+    def test_sqlite_broker_adds_attempts_to_old_queue(self):
+        """Test queue files from before attempts were counted still work"""
+        import sqlite3
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "jobs.db")
+            db = sqlite3.connect(path)
+            db.execute(
+                "CREATE TABLE jobs (job_id TEXT PRIMARY KEY, payload TEXT NOT NULL, "
+                "enqueued_at REAL NOT NULL, leased_until REAL NOT NULL DEFAULT 0)"
+            )
+            job = make_job()
+            db.execute(
+                "INSERT INTO jobs (job_id, payload, enqueued_at) VALUES (?, ?, ?)",
+                (job.job_id, job.to_json(), job.enqueued_at),
+            )
+            db.commit()
+            db.close()
+
+            async def main():
+                broker = SqliteBroker(path)
+                taken = await broker.get(timeout=0.1)
+                await broker.close()
+                return taken.job_id, taken.attempts
+
+            self.assertEqual(asyncio.run(main()), (job.job_id, 1))
+
+    def test_create_broker(self):
+        """Test brokers are chosen by URL scheme"""
+        self.assertIsInstance(create_broker("memory://"), InProcessBroker)
+        with tempfile.TemporaryDirectory() as directory:
+            broker = create_broker(f"sqlite:///{directory}/jobs.db")
+            self.assertIsInstance(broker, SqliteBroker)
+            asyncio.run(broker.close())
+        with self.assertRaises(ValueError):
+            create_broker("amqp://localhost")
+
+
+if __name__ == "__main__":
+    unittest.main()
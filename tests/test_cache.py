@@ -0,0 +1,145 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from cache import SingleFlight, TranscriptionCache, audio_cache_key, file_cache_key
+
+
+class TestCacheKeys(unittest.TestCase):
+    def test_file_key_includes_model(self):
+        """Test file keys differ between models"""
+        self.assertNotEqual(
+            file_cache_key("base.en", "AgAD"), file_cache_key("small", "AgAD")
+        )
+
+    def test_audio_key_hashes_pcm(self):
+        """Test identical PCM gives identical keys"""
+        audio = np.linspace(-1, 1, 16000, dtype=np.float32)
+        self.assertEqual(
+            audio_cache_key("base.en", audio), audio_cache_key("base.en", audio.copy())
+        )
+        self.assertNotEqual(
+            audio_cache_key("base.en", audio), audio_cache_key("base.en", audio * 0.5)
+        )
+
+
+class TestTranscriptionCache(unittest.TestCase):
+    def test_hit_and_miss_counters(self):
+        """Test lookups are counted"""
+        cache = TranscriptionCache()
+        self.assertIsNone(cache.get("a"))
+        cache.set("a", "hello")
+        self.assertEqual(cache.get("a"), "hello")
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(cache.hit_rate, 0.5)
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted first"""
+        cache = TranscriptionCache(max_entries=2)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+        self.assertEqual(cache.get("a"), "1")
+        self.assertIsNone(cache.get("b"))
+
+    def test_ttl_expiry(self):
+        """Test entries expire after the TTL"""
+        cache = TranscriptionCache(ttl_seconds=10)
+        with patch("cache.time.time", return_value=1000):
+            cache.set("a", "hello")
+        with patch("cache.time.time", return_value=1005):
+            self.assertEqual(cache.get("a"), "hello")
+        with patch("cache.time.time", return_value=1011):
+            self.assertIsNone(cache.get("a"))
+
+    def test_sqlite_tier(self):
+        """Test entries survive in SQLite and are size-bounded"""
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "cache.db")
+            cache = TranscriptionCache(max_entries=1, db_path=db_path, max_db_entries=2)
+            cache.set("a", "1")
+            cache.set("b", "2")
+            cache.set("c", "3")
+            cache.close()
+
+            # New process, empty memory tier
+            reopened = TranscriptionCache(db_path=db_path, max_db_entries=2)
+            self.assertIsNone(reopened.get("a"))
+            self.assertEqual(reopened.get("c"), "3")
+            self.assertEqual(reopened.disk_hits, 1)
+            reopened.close()
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_callers_share_one_run(self):
+        """Test callers for a key in flight wait for it instead of running again"""
+        flights = SingleFlight()
+        runs = []
+
+        async def work():
+            runs.append(1)
+            await asyncio.sleep(0.01)
+            return "text"
+
+        async def main():
+            return await asyncio.gather(
+                flights.run("a", work), flights.run("a", work), flights.run("b", work)
+            )
+
+        results = asyncio.run(main())
+
+        self.assertEqual(results, [("text", False), ("text", True), ("text", False)])
+        self.assertEqual(len(runs), 2)
+        self.assertEqual(flights.coalesced, 1)
+        self.assertEqual(len(flights), 0)
+
+    def test_errors_are_shared_and_key_released(self):
+        """Test waiting callers get the run's exception and the next call runs anew"""
+        flights = SingleFlight()
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise ValueError("download failed")
+
+        async def main():
+            first = await asyncio.gather(
+                flights.run("a", failing), flights.run("a", failing), return_exceptions=True
+            )
+            second = await flights.run("a", lambda: asyncio.sleep(0, "ok"))
+            return first, second
+
+        first, second = asyncio.run(main())
+
+        self.assertTrue(all(isinstance(result, ValueError) for result in first))
+        self.assertEqual(second, ("ok", False))
+
+    def test_cancelled_waiter_leaves_run_going(self):
+        """Test a waiting caller that goes away doesn't cancel the shared run"""
+        flights = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.02)
+            return "text"
+
+        async def main():
+            leader = asyncio.ensure_future(flights.run("a", work))
+            await asyncio.sleep(0)
+            waiter = asyncio.ensure_future(flights.run("a", work))
+            await asyncio.sleep(0)
+            waiter.cancel()
+            return await leader
+
+        self.assertEqual(asyncio.run(main()), ("text", False))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -6,7 +6,7 @@ from unittest.mock import patch
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
-from config import Config
+from config import Config, get_setting, get_thread_budget, model_name_from_path
 
 
 class TestConfig(unittest.TestCase):
@@ -77,6 +77,54 @@ class TestConfig(unittest.TestCase):
                 Config.validate()
             self.assertIn("model file not found", str(context.exception))
 
+    def test_language_detection_needs_multilingual_model(self):
+        """Test MULTILINGUAL_MODEL has to be registered and not English-only"""
+        os.environ["TELEGRAM_BOT_TOKEN"] = "test_token"
+        with patch("config.os.path.exists", return_value=True), patch.object(
+            Config, "LANGUAGE_DETECTION", True
+        ), patch.object(
+            Config, "WHISPER_MODELS", {"base.en": "a.bin", "small.en": "b.bin"}
+        ):
+            with patch.object(Config, "MULTILINGUAL_MODEL", "base"):
+                with self.assertRaises(ValueError):
+                    Config.validate()
+            with patch.object(Config, "MULTILINGUAL_MODEL", "small.en"):
+                with self.assertRaises(ValueError) as context:
+                    Config.validate()
+                self.assertIn("only knows English", str(context.exception))
+
+    def test_thread_budget(self):
+        """Test cores are split between inference workers"""
+        with patch.dict(os.environ, {}, clear=False):
+            os.environ.pop("WHISPER_THREADS", None)
+            with patch("config.os.cpu_count", return_value=32):
+                self.assertEqual(get_thread_budget(1), 6)
+                self.assertEqual(get_thread_budget(8), 4)
+                self.assertEqual(get_thread_budget(64), 1)
+
+            os.environ["WHISPER_THREADS"] = "3"
+            self.assertEqual(get_thread_budget(8), 3)
+
+    def test_tuned_settings(self):
+        """Test tuned values fill in for unset variables, which still win"""
+        tuning = {"INFERENCE_WORKERS": 4, "WHISPER_THREADS": 2}
+        with patch.dict("config.TUNING", tuning, clear=True), patch.dict(os.environ):
+            os.environ.pop("INFERENCE_WORKERS", None)
+            os.environ.pop("WHISPER_THREADS", None)
+            self.assertEqual(get_setting("INFERENCE_WORKERS", "1"), "4")
+            self.assertEqual(get_thread_budget(4), 2)
+            self.assertEqual(get_setting("BATCH_MAX_SIZE", "4"), "4")
+
+            os.environ["INFERENCE_WORKERS"] = "3"
+            self.assertEqual(get_setting("INFERENCE_WORKERS", "1"), "3")
+
+    def test_model_name_from_path(self):
+        """Test quantized file names keep their suffix in the model name"""
+        self.assertEqual(model_name_from_path("models/ggml-base.en.bin"), "base.en")
+        self.assertEqual(
+            model_name_from_path("/opt/ggml-small.en-q5_1.bin"), "small.en-q5_1"
+        )
+
     def test_environment_variable_override(self):
         """Test environment variable overrides"""
         # Override environment variables
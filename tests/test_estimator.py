@@ -0,0 +1,66 @@
+import os
+import sys
+import unittest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from estimator import DEFAULT_BYTES_PER_SECOND, DEFAULT_RTF, CostEstimator
+
+
+class TestCostEstimator(unittest.TestCase):
+    def test_prior_before_any_job(self):
+        """Test estimates start from the default real-time factor"""
+        estimator = CostEstimator(threads=4)
+
+        self.assertAlmostEqual(estimator.estimate("base.en", "ogg", 100), 100 * DEFAULT_RTF)
+        self.assertIsNone(estimator.estimate("base.en", "ogg", None))
+        self.assertIsNone(estimator.rtf("base.en"))
+
+    def test_learns_overhead_and_rate(self):
+        """Test a fixed overhead plus a per-second rate is learned from jobs"""
+        estimator = CostEstimator(threads=4)
+        for audio_seconds in (10, 60, 300, 30):
+            estimator.record("base.en", "mp3", audio_seconds, 2 + 0.1 * audio_seconds)
+
+        self.assertAlmostEqual(estimator.estimate("base.en", "mp3", 600), 62, delta=0.5)
+        self.assertAlmostEqual(estimator.estimate("base.en", "mp3", 0), 2, delta=0.5)
+
+    def test_single_length_scales_by_ratio(self):
+        estimator = CostEstimator(threads=4)
+        estimator.record("base.en", "ogg", 20, 4)
+
+        self.assertAlmostEqual(estimator.estimate("base.en", "ogg", 100), 20)
+
+    def test_formats_models_and_threads_are_separate(self):
+        """Test each model and format learns its own speed, other formats borrow it"""
+        estimator = CostEstimator(threads=4)
+        estimator.record("base.en", "ogg", 100, 10)
+        estimator.record("small.en", "ogg", 100, 40)
+
+        self.assertAlmostEqual(estimator.estimate("small.en", "ogg", 50), 20)
+        # No mp3 job yet: the model's other formats stand in
+        self.assertAlmostEqual(estimator.estimate("base.en", "mp3", 50), 5)
+        self.assertAlmostEqual(estimator.rtf("base.en"), 0.1)
+
+        other_threads = CostEstimator(threads=8)
+        self.assertIsNone(other_threads.rtf("base.en"))
+
+    def test_document_length_from_size(self):
+        """Test documents get a duration from their size and learned bitrate"""
+        estimator = CostEstimator(threads=4)
+
+        self.assertEqual(estimator.audio_seconds("mp3", 30, 10**6), 30)
+        self.assertAlmostEqual(
+            estimator.audio_seconds("mp3", None, 160000),
+            160000 / DEFAULT_BYTES_PER_SECOND["mp3"],
+        )
+        self.assertIsNone(estimator.audio_seconds("mp3", None, None))
+
+        # A 64 kbit/s file teaches the real bitrate
+        estimator.record("base.en", "mp3", 100, 10, file_size=800000)
+        self.assertAlmostEqual(estimator.audio_seconds("mp3", None, 80000), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,257 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import Mock
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from executor import InferenceExecutor, ProcessInferenceExecutor
+
+
+def make_worker_model(name):
+    """Model factory run inside each worker process"""
+    return f"{name}-{os.getpid()}"
+
+
+def describe(model, suffix):
+    return f"{model}:{suffix}"
+
+
+def failing_model(name):
+    raise RuntimeError(f"cannot load {name}")
+
+
+def crash(model):
+    os._exit(1)
+
+
+class TestInferenceExecutor(unittest.TestCase):
+    def test_requires_models(self):
+        """Test executor refuses an empty model list"""
+        with self.assertRaises(ValueError):
+            InferenceExecutor([])
+
+    def test_run_passes_model_and_args(self):
+        """Test the worker function receives a model and arguments"""
+        model = Mock()
+        executor = InferenceExecutor([model])
+
+        def work(m, value, scale=1):
+            return m, value * scale
+
+        result = asyncio.run(executor.run(work, 3, scale=2))
+        executor.shutdown()
+
+        self.assertEqual(result, (model, 6))
+        self.assertEqual(executor.in_flight, 0)
+
+    def test_run_does_not_block_event_loop(self):
+        """Test blocking work runs concurrently and off the event loop"""
+        executor = InferenceExecutor([Mock(), Mock()])
+        loop_thread = []
+
+        def slow(_model):
+            time.sleep(0.2)
+            return threading.current_thread().name
+
+        async def main():
+            loop_thread.append(threading.current_thread().name)
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+
+            tick_task = asyncio.create_task(ticker())
+            start = time.monotonic()
+            names = await asyncio.gather(executor.run(slow), executor.run(slow))
+            elapsed = time.monotonic() - start
+            tick_task.cancel()
+            return names, elapsed, ticks
+
+        names, elapsed, ticks = asyncio.run(main())
+        executor.shutdown()
+
+        self.assertNotIn(loop_thread[0], names)
+        self.assertLess(elapsed, 0.35)
+        self.assertGreater(ticks, 5)
+
+    def test_models_not_shared_between_workers(self):
+        """Test a model is never used by two workers at once"""
+        models = [Mock(), Mock()]
+        executor = InferenceExecutor(models)
+        active = set()
+        overlaps = []
+        lock = threading.Lock()
+
+        def work(model):
+            with lock:
+                if id(model) in active:
+                    overlaps.append(model)
+                active.add(id(model))
+            time.sleep(0.05)
+            with lock:
+                active.discard(id(model))
+
+        async def main():
+            await asyncio.gather(*(executor.run(work) for _ in range(6)))
+
+        asyncio.run(main())
+        executor.shutdown()
+
+        self.assertEqual(overlaps, [])
+
+
+class TestProcessInferenceExecutor(unittest.TestCase):
+    def test_requires_workers(self):
+        """Test executor refuses a pool without workers"""
+        with self.assertRaises(ValueError):
+            ProcessInferenceExecutor(0, make_worker_model, ("model",))
+
+    def test_run_in_worker_process(self):
+        """Test jobs run in a separate process with its own model"""
+        executor = ProcessInferenceExecutor(2, make_worker_model, ("model",))
+        try:
+            self.assertTrue(executor.is_healthy())
+            result = asyncio.run(executor.run(describe, "job"))
+        finally:
+            executor.shutdown()
+
+        model_name, suffix = result.split(":")
+        self.assertEqual(suffix, "job")
+        self.assertTrue(model_name.startswith("model-"))
+        self.assertNotEqual(model_name, f"model-{os.getpid()}")
+        self.assertFalse(executor.is_healthy())
+
+    def test_all_workers_load_at_start(self):
+        """Test every worker process has loaded a model before the pool is used"""
+        executor = ProcessInferenceExecutor(3, make_worker_model, ("model",))
+        try:
+            processes = executor._pool._processes
+            self.assertEqual(len(processes), 3)
+        finally:
+            executor.shutdown()
+
+    def test_model_load_failure_fails_fast(self):
+        """Test a worker that cannot load its model fails start-up"""
+        with self.assertRaises(RuntimeError):
+            ProcessInferenceExecutor(2, failing_model, ("model",), start_timeout=10)
+
+    def test_pool_restarts_after_worker_crash(self):
+        """Test a crashed worker fails its job and the pool recovers"""
+        from concurrent.futures.process import BrokenProcessPool
+
+        executor = ProcessInferenceExecutor(1, make_worker_model, ("model",))
+
+        async def main():
+            with self.assertRaises(BrokenProcessPool):
+                await executor.run(crash)
+            return await executor.run(describe, "after")
+
+        try:
+            result = asyncio.run(main())
+        finally:
+            executor.shutdown()
+
+        self.assertTrue(result.endswith(":after"))
+        self.assertEqual(executor.restarts, 1)
+
+    def test_shared_memory_workers_use_preloaded_model(self):
+        """Test workers share the model loaded once by the forkserver"""
+        executor = ProcessInferenceExecutor(
+            2, make_worker_model, ("shared",), share_memory=True
+        )
+
+        async def main():
+            return await asyncio.gather(
+                *(executor.run(describe, "job") for _ in range(4))
+            )
+
+        try:
+            results = asyncio.run(main())
+            pids = executor.worker_pids()
+        finally:
+            executor.shutdown()
+
+        models = {result.split(":")[0] for result in results}
+        self.assertEqual(len(models), 1)
+        loader_pid = int(models.pop().split("-")[1])
+        self.assertEqual(len(pids), 2)
+        self.assertNotIn(loader_pid, pids)
+        self.assertNotEqual(loader_pid, os.getpid())
+
+    def test_failed_restart_is_retried_by_next_job(self):
+        """Test a restart that cannot load models leaves the pool broken, not gone"""
+        from concurrent.futures.process import BrokenProcessPool
+
+        executor = ProcessInferenceExecutor(
+            1, make_worker_model, ("model",), restart_attempts=2, restart_backoff=0
+        )
+        start_pool = executor._start_pool
+        attempts = []
+
+        def flaky_start_pool():
+            attempts.append(1)
+            if len(attempts) <= 2:
+                raise RuntimeError("Inference worker failed to load its model")
+            return start_pool()
+
+        executor._start_pool = flaky_start_pool
+
+        async def main():
+            # The crash is reported, not the failed restart
+            with self.assertRaises(BrokenProcessPool):
+                await executor.run(crash)
+            healthy_after_failure = executor.is_healthy()
+            result = await executor.run(describe, "after")
+            return healthy_after_failure, result
+
+        try:
+            healthy_after_failure, result = asyncio.run(main())
+        finally:
+            executor.shutdown()
+
+        self.assertFalse(healthy_after_failure)
+        self.assertTrue(result.endswith(":after"))
+        self.assertEqual(len(attempts), 3)
+        self.assertEqual(executor.restarts, 1)
+
+    def test_jobs_wait_for_restart(self):
+        """Test jobs submitted while the pool restarts run on the new pool"""
+        from concurrent.futures.process import BrokenProcessPool
+
+        executor = ProcessInferenceExecutor(1, make_worker_model, ("model",))
+        start_pool = executor._start_pool
+
+        def slow_start_pool():
+            time.sleep(0.2)
+            return start_pool()
+
+        executor._start_pool = slow_start_pool
+
+        async def main():
+            crashed = asyncio.ensure_future(executor.run(crash))
+            while not executor._restart_lock.locked():
+                await asyncio.sleep(0.01)
+            waiting = await executor.run(describe, "waited")
+            with self.assertRaises(BrokenProcessPool):
+                await crashed
+            return waiting
+
+        try:
+            result = asyncio.run(main())
+        finally:
+            executor.shutdown()
+
+        self.assertTrue(result.endswith(":waited"))
+        self.assertEqual(executor.restarts, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
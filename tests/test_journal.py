@@ -0,0 +1,105 @@
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from broker import TranscriptionJob
+from journal import JobJournal
+
+
+def make_job(**kwargs):
+    values = dict(user_id=1, chat_id=1, message_id=5, file_id="file-1")
+    values.update(kwargs)
+    return TranscriptionJob(**values)
+
+
+class TestJobJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "data", "journal.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_message_is_accepted_once(self):
+        """Test recording the same chat and message twice is refused"""
+
+        async def main():
+            journal = JobJournal(self.path)
+            first = await journal.record(make_job())
+            again = await journal.record(make_job())
+            other = await journal.record(make_job(message_id=6))
+            await journal.close()
+            return first, again, other
+
+        self.assertEqual(asyncio.run(main()), (True, False, True))
+
+    def test_unfinished_jobs_survive_reopening(self):
+        """Test queued and running jobs are read back with their attempts"""
+
+        async def main():
+            journal = JobJournal(self.path)
+            running = make_job(message_id=1, duration=30, model="tiny.en")
+            queued = make_job(message_id=2, formats=["srt"])
+            done = make_job(message_id=3)
+            for job in (running, queued, done):
+                await journal.record(job)
+            await journal.start(running)
+            await journal.finish(done)
+            await journal.close()
+
+            journal = JobJournal(self.path)
+            jobs = await journal.unfinished()
+            await journal.close()
+            return running, jobs
+
+        running, jobs = asyncio.run(main())
+
+        self.assertEqual([job.message_id for job in jobs], [1, 2])
+        self.assertEqual(jobs[0].job_id, running.job_id)
+        self.assertEqual((jobs[0].attempts, jobs[0].duration), (1, 30))
+        self.assertEqual(jobs[0].model, "tiny.en")
+        self.assertEqual((jobs[1].attempts, jobs[1].formats), (0, ["srt"]))
+
+    def test_removed_job_can_be_recorded_again(self):
+        """Test a rejected message is forgotten, so resending it is accepted"""
+
+        async def main():
+            journal = JobJournal(self.path)
+            job = make_job()
+            await journal.record(job)
+            await journal.remove(job)
+            accepted = await journal.record(make_job())
+            await journal.close()
+            return accepted
+
+        self.assertTrue(asyncio.run(main()))
+
+    def test_done_jobs_are_pruned_after_retention(self):
+        """Test done jobs block duplicates only until the retention passes"""
+
+        async def main():
+            journal = JobJournal(self.path, retention_seconds=0.05)
+            old = make_job(message_id=1)
+            await journal.record(old)
+            await journal.finish(old)
+            duplicate = await journal.record(make_job(message_id=1))
+            time.sleep(0.1)
+            # Finishing any job prunes the expired ones
+            newer = make_job(message_id=2)
+            await journal.record(newer)
+            await journal.finish(newer)
+            accepted = await journal.record(make_job(message_id=1))
+            await journal.close()
+            return duplicate, accepted
+
+        self.assertEqual(asyncio.run(main()), (False, True))
+
+
+if __name__ == "__main__":
+    unittest.main()
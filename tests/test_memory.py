@@ -0,0 +1,33 @@
+import os
+import sys
+import unittest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from memory import process_memory, total_memory
+
+
+class TestMemory(unittest.TestCase):
+    def test_process_memory(self):
+        """Test the memory of this process can be read"""
+        usage = process_memory(os.getpid())
+
+        self.assertGreater(usage["rss"], 0)
+        self.assertGreater(usage["pss"], 0)
+        self.assertLessEqual(usage["pss"], usage["rss"])
+
+    def test_missing_process(self):
+        """Test a process that is gone is skipped"""
+        self.assertIsNone(process_memory(2**22 + 1))
+
+        total = total_memory([os.getpid(), 2**22 + 1])
+        self.assertEqual(total["processes"], 1)
+
+    def test_same_process_counted_once(self):
+        total = total_memory([os.getpid(), os.getpid()])
+        self.assertEqual(total["processes"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
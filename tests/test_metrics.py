@@ -0,0 +1,107 @@
+import asyncio
+import os
+import sys
+import unittest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from metrics import (
+    QUEUE_WAIT,
+    REJECTIONS,
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsServer,
+    Registry,
+)
+from scheduler import JobScheduler, QueueFullError
+
+
+class TestMetrics(unittest.TestCase):
+    def test_counter_with_labels(self):
+        """Test counters render one sample per label set"""
+        counter = Counter("jobs_total", "Jobs", ["outcome"])
+        counter.inc(outcome="success")
+        counter.inc(2, outcome="failed")
+
+        text = counter.render()
+
+        self.assertIn("# TYPE jobs_total counter", text)
+        self.assertIn('jobs_total{outcome="failed"} 2', text)
+        self.assertIn('jobs_total{outcome="success"} 1', text)
+        with self.assertRaises(ValueError):
+            counter.inc(reason="other")
+
+    def test_gauge_function_read_at_scrape(self):
+        """Test callback gauges report the current value"""
+        gauge = Gauge("in_flight", "Running")
+        state = {"value": 1}
+        gauge.set_function(lambda: state["value"])
+        state["value"] = 3
+
+        self.assertIn("in_flight 3", gauge.render())
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram buckets, sum and count"""
+        histogram = Histogram("wait_seconds", "Wait", buckets=(0.1, 1))
+        for value in (0.05, 0.5, 5):
+            histogram.observe(value)
+
+        text = histogram.render()
+
+        self.assertIn('wait_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('wait_seconds_bucket{le="1"} 2', text)
+        self.assertIn('wait_seconds_bucket{le="+Inf"} 3', text)
+        self.assertIn("wait_seconds_sum 5.55", text)
+        self.assertIn("wait_seconds_count 3", text)
+
+    def test_scheduler_records_queue_wait_and_rejections(self):
+        """Test the scheduler feeds queue wait and rejection metrics"""
+        waits = QUEUE_WAIT.count()
+        rejected = REJECTIONS.value(reason="queue_full")
+
+        async def main():
+            scheduler = JobScheduler(max_in_flight=1, max_queued=0)
+            release = asyncio.Event()
+            scheduler.submit(1, 10, release.wait)
+            with self.assertRaises(QueueFullError):
+                scheduler.submit(2, 10, release.wait)
+            release.set()
+            await scheduler.shutdown()
+
+        asyncio.run(main())
+
+        self.assertEqual(QUEUE_WAIT.count(), waits + 1)
+        self.assertEqual(REJECTIONS.value(reason="queue_full"), rejected + 1)
+
+    def test_server_serves_metrics(self):
+        """Test /metrics is served over HTTP and other paths 404"""
+        registry = Registry()
+        registry.register(Counter("served_total", "Served")).inc()
+
+        async def fetch(server, path):
+            reader, writer = await asyncio.open_connection(server.host, server.port)
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: test\r\n\r\n".encode())
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            return response.decode()
+
+        async def main():
+            server = MetricsServer("127.0.0.1", 0, registry)
+            await server.start()
+            try:
+                return await fetch(server, "/metrics"), await fetch(server, "/")
+            finally:
+                await server.stop()
+
+        metrics, missing = asyncio.run(main())
+
+        self.assertTrue(metrics.startswith("HTTP/1.1 200 OK"))
+        self.assertIn("served_total 1", metrics)
+        self.assertTrue(missing.startswith("HTTP/1.1 404"))
+
+
+if __name__ == "__main__":
+    unittest.main()
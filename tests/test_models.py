@@ -0,0 +1,175 @@
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from config import get_model_paths, get_model_routes
+from models import ModelRegistry, UnknownModelError
+
+MB = 1024 * 1024
+
+
+class TestModelRegistry(unittest.TestCase):
+    def setUp(self):
+        """Fake model files of known sizes"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.paths = {}
+        for name, size_mb in (("base.en", 2), ("tiny.en", 1), ("small.en", 3)):
+            path = os.path.join(self.tmp.name, f"ggml-{name}.bin")
+            with open(path, "wb") as f:
+                f.truncate(size_mb * MB)
+            self.paths[name] = path
+
+        self.created = []
+
+        def create_executor(path):
+            executor = Mock(name=os.path.basename(path))
+            self.created.append(path)
+            return executor
+
+        self.create_executor = create_executor
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_registry(self, **kwargs):
+        registry = ModelRegistry(
+            self.paths, "base.en", self.create_executor, **kwargs
+        )
+        registry.add("base.en", Mock(name="default"))
+        return registry
+
+    def test_models_load_on_first_use(self):
+        """Test a model is loaded once, when a job first asks for it"""
+        registry = self.make_registry()
+
+        async def main():
+            async with registry.use("tiny.en") as first:
+                pass
+            async with registry.use("tiny.en") as second:
+                pass
+            return first, second
+
+        first, second = asyncio.run(main())
+
+        self.assertIs(first, second)
+        self.assertEqual(self.created, [self.paths["tiny.en"]])
+        self.assertEqual(registry.loaded, ["base.en", "tiny.en"])
+        self.assertEqual(registry.loads, 1)
+
+    def test_concurrent_first_use_loads_once(self):
+        """Test jobs arriving together for an unloaded model share one load"""
+        registry = self.make_registry()
+
+        async def job():
+            async with registry.use("small.en") as executor:
+                return executor
+
+        async def main():
+            return await asyncio.gather(job(), job(), job())
+
+        executors = asyncio.run(main())
+
+        self.assertEqual(len(set(map(id, executors))), 1)
+        self.assertEqual(self.created, [self.paths["small.en"]])
+
+    def test_least_recently_used_model_is_unloaded(self):
+        """Test idle models are unloaded, oldest first, to fit the budget"""
+        # base.en (2MB) + tiny.en (1MB) fit, small.en (3MB) needs tiny.en gone
+        registry = self.make_registry(memory_budget_mb=5)
+
+        async def main():
+            async with registry.use("tiny.en") as tiny:
+                pass
+            async with registry.use("small.en"):
+                pass
+            return tiny
+
+        tiny = asyncio.run(main())
+
+        self.assertEqual(registry.loaded, ["base.en", "small.en"])
+        self.assertEqual(registry.evictions, 1)
+        tiny.shutdown.assert_called_once()
+
+    def test_models_in_use_and_default_are_not_unloaded(self):
+        """Test the default model and models with running jobs stay loaded"""
+        registry = self.make_registry(memory_budget_mb=3)
+
+        async def main():
+            async with registry.use("tiny.en"):
+                # Over budget, but tiny.en is busy and base.en is pinned
+                async with registry.use("small.en"):
+                    pass
+
+        asyncio.run(main())
+
+        self.assertEqual(registry.loaded, ["base.en", "tiny.en", "small.en"])
+        self.assertEqual(registry.evictions, 0)
+
+    def test_no_budget_never_unloads(self):
+        """Test a zero budget keeps every loaded model"""
+        registry = self.make_registry(memory_budget_mb=0)
+
+        async def main():
+            for name in ("tiny.en", "small.en"):
+                async with registry.use(name):
+                    pass
+
+        asyncio.run(main())
+
+        self.assertEqual(len(registry.loaded), 3)
+
+    def test_route(self):
+        """Test user choice beats duration routes, which beat the default"""
+        registry = self.make_registry(routes=[(60, "small.en"), (10, "tiny.en")])
+
+        self.assertEqual(registry.route(5), "tiny.en")
+        self.assertEqual(registry.route(30), "small.en")
+        self.assertEqual(registry.route(600), "base.en")
+        self.assertEqual(registry.route(None), "base.en")
+        self.assertEqual(registry.route(5, preferred="base.en"), "base.en")
+        self.assertEqual(registry.route(5, preferred="missing"), "tiny.en")
+
+    def test_resolve(self):
+        """Test unknown models are rejected and None means the default"""
+        registry = self.make_registry()
+
+        self.assertEqual(registry.resolve(None), "base.en")
+        self.assertEqual(registry.resolve("tiny.en"), "tiny.en")
+        with self.assertRaises(UnknownModelError):
+            registry.resolve("large")
+
+    def test_default_must_be_registered(self):
+        """Test the default model has to be one of the registered paths"""
+        with self.assertRaises(ValueError):
+            ModelRegistry(self.paths, "large", self.create_executor)
+
+
+class TestModelConfig(unittest.TestCase):
+    @patch.dict(os.environ, {"WHISPER_MODELS": "tiny.en, small=/opt/small.bin"})
+    def test_get_model_paths(self):
+        """Test names resolve next to the models directory, pairs keep their path"""
+        models = get_model_paths("base.en", "models/ggml-base.en.bin")
+
+        self.assertEqual(list(models), ["base.en", "tiny.en", "small"])
+        self.assertEqual(models["base.en"], "models/ggml-base.en.bin")
+        self.assertTrue(models["tiny.en"].endswith("ggml-tiny.en.bin"))
+        self.assertEqual(models["small"], "/opt/small.bin")
+
+    @patch.dict(os.environ, {"MODEL_ROUTES": "60:small.en, 10:tiny.en"})
+    def test_get_model_routes(self):
+        """Test routes are parsed and sorted shortest first"""
+        self.assertEqual(get_model_routes(), [(10.0, "tiny.en"), (60.0, "small.en")])
+
+    @patch.dict(os.environ, {"MODEL_ROUTES": ""})
+    def test_no_routes(self):
+        self.assertEqual(get_model_routes(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,182 @@
+import asyncio
+import datetime
+import os
+import sys
+import time
+import unittest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from telegram.error import RetryAfter
+
+from ratelimit import EditSuperseded, OutboundLimiter, TokenBucket, progress_updates
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_delay(self):
+        """Test tokens run out after the burst and refill at the rate"""
+        bucket = TokenBucket(rate=10, capacity=2)
+        now = bucket.updated
+
+        bucket.take(now)
+        bucket.take(now)
+
+        self.assertAlmostEqual(bucket.delay(now), 0.1)
+        self.assertEqual(bucket.delay(now + 0.1), 0.0)
+
+
+class TestOutboundLimiter(unittest.TestCase):
+    def run_limiter(self, limiter, main):
+        async def run():
+            await limiter.initialize()
+            try:
+                return await main()
+            finally:
+                await limiter.shutdown()
+
+        return asyncio.run(run())
+
+    def request(self, limiter, calls, name, endpoint="sendMessage", chat_id=1, **data):
+        """Send a fake API call through the limiter, recording when it runs"""
+
+        async def callback():
+            calls.append(name)
+            return name
+
+        return limiter.process_request(
+            callback, (), {}, endpoint, {"chat_id": chat_id, **data}, None
+        )
+
+    def test_chat_rate(self):
+        """Test a chat gets its burst, then one request per 1/rate seconds"""
+        limiter = OutboundLimiter(chat_per_second=20)
+        calls = []
+
+        async def main():
+            start = time.monotonic()
+            await asyncio.gather(*(self.request(limiter, calls, i) for i in range(5)))
+            return time.monotonic() - start
+
+        elapsed = self.run_limiter(limiter, main)
+
+        self.assertEqual(calls, [0, 1, 2, 3, 4])
+        # Burst of 3, then 2 more at 20/s
+        self.assertGreaterEqual(elapsed, 0.09)
+
+    def test_global_rate(self):
+        """Test the global bucket caps requests across chats"""
+        limiter = OutboundLimiter(global_per_second=20)
+        limiter._global = TokenBucket(20, 1)
+        calls = []
+
+        async def main():
+            start = time.monotonic()
+            await asyncio.gather(
+                *(self.request(limiter, calls, i, chat_id=i) for i in range(3))
+            )
+            return time.monotonic() - start
+
+        self.assertGreaterEqual(self.run_limiter(limiter, main), 0.09)
+
+    def test_retry_after(self):
+        """Test a flood-wait answer is waited out and the request retried"""
+        limiter = OutboundLimiter()
+        attempts = []
+
+        async def callback():
+            attempts.append(time.monotonic())
+            if len(attempts) == 1:
+                raise RetryAfter(datetime.timedelta(milliseconds=100))
+            return True
+
+        async def main():
+            return await limiter.process_request(
+                callback, (), {}, "sendMessage", {"chat_id": 1}, None
+            )
+
+        self.assertTrue(self.run_limiter(limiter, main))
+        self.assertEqual(limiter.retries, 1)
+        self.assertGreaterEqual(attempts[1] - attempts[0], 0.09)
+
+    def test_retry_after_gives_up(self):
+        limiter = OutboundLimiter(max_retries=1)
+
+        async def callback():
+            raise RetryAfter(datetime.timedelta(milliseconds=10))
+
+        async def main():
+            return await limiter.process_request(
+                callback, (), {}, "sendMessage", {"chat_id": 1}, None
+            )
+
+        with self.assertRaises(RetryAfter):
+            self.run_limiter(limiter, main)
+        self.assertEqual(limiter.retries, 1)
+
+    def test_edits_coalesce(self):
+        """Test only the newest waiting edit of a message is sent"""
+        limiter = OutboundLimiter()
+        calls = []
+
+        async def main():
+            # Hold the chat so the edits have to wait
+            limiter._pause(1, 0.1)
+            with progress_updates():
+                edits = [
+                    asyncio.ensure_future(
+                        self.request(limiter, calls, f"progress {i}", "editMessageText", message_id=7)
+                    )
+                    for i in range(3)
+                ]
+            await asyncio.sleep(0)
+            final = self.request(limiter, calls, "final", "editMessageText", message_id=7)
+            results = await asyncio.gather(*edits, final, return_exceptions=True)
+            return results
+
+        results = self.run_limiter(limiter, main)
+
+        self.assertEqual(calls, ["final"])
+        self.assertTrue(all(isinstance(r, EditSuperseded) for r in results[:3]))
+        self.assertEqual(results[3], "final")
+        self.assertEqual(limiter.coalesced, 3)
+
+    def test_final_results_go_first(self):
+        """Test waiting final results are sent before waiting progress updates"""
+        limiter = OutboundLimiter()
+        calls = []
+
+        async def main():
+            limiter._pause(1, 0.05)
+            with progress_updates():
+                progress = asyncio.ensure_future(
+                    self.request(limiter, calls, "progress", "editMessageText", message_id=1)
+                )
+            final = asyncio.ensure_future(
+                self.request(limiter, calls, "result", "sendDocument")
+            )
+            await asyncio.gather(progress, final)
+
+        self.run_limiter(limiter, main)
+
+        self.assertEqual(calls, ["result", "progress"])
+
+    def test_cancelled_request_is_dropped(self):
+        limiter = OutboundLimiter()
+        calls = []
+
+        async def main():
+            limiter._pause(1, 0.05)
+            waiting = asyncio.ensure_future(self.request(limiter, calls, "dropped"))
+            await asyncio.sleep(0.01)
+            waiting.cancel()
+            await self.request(limiter, calls, "sent")
+
+        self.run_limiter(limiter, main)
+
+        self.assertEqual(calls, ["sent"])
+        self.assertEqual(limiter.waiting, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+import asyncio
+import os
+import sys
+import unittest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from scheduler import JobScheduler, QueueFullError, UserQueueFullError
+
+
+class TestJobScheduler(unittest.TestCase):
+    def run_jobs(self, scheduler, submissions):
+        """Submit jobs behind a blocker and return the order they ran in"""
+        order = []
+
+        async def main():
+            release = asyncio.Event()
+
+            async def blocker():
+                await release.wait()
+
+            def make_job(name):
+                async def job():
+                    order.append(name)
+
+                return job
+
+            scheduler.submit(0, 1, blocker)
+            for user_id, duration, name, *cost in submissions:
+                scheduler.submit(user_id, duration, make_job(name), *cost)
+            release.set()
+            while scheduler.in_flight or scheduler.queued:
+                await asyncio.sleep(0.01)
+
+        asyncio.run(main())
+        return order
+
+    def test_short_audio_runs_first(self):
+        """Test short voice notes jump ahead of long documents"""
+        scheduler = JobScheduler(max_in_flight=1, max_queued=10)
+        order = self.run_jobs(
+            scheduler,
+            [(1, None, "document"), (2, 600, "podcast"), (3, 5, "voice")],
+        )
+        self.assertEqual(order, ["voice", "document", "podcast"])
+
+    def test_users_are_served_fairly(self):
+        """Test one user's burst does not starve other users"""
+        scheduler = JobScheduler(max_in_flight=1, max_queued=10)
+        order = self.run_jobs(
+            scheduler,
+            [(1, 5, "a1"), (1, 5, "a2"), (1, 5, "a3"), (2, 5, "b1")],
+        )
+        self.assertEqual(order.index("b1"), 1)
+
+    def test_starving_long_job_is_promoted(self):
+        """Test long jobs move to the short lane after waiting too long"""
+        scheduler = JobScheduler(max_in_flight=1, max_queued=10, starvation_seconds=0)
+        order = self.run_jobs(scheduler, [(1, 600, "long"), (2, 5, "short")])
+        self.assertEqual(order, ["long", "short"])
+
+    def test_shorter_predicted_job_runs_first(self):
+        """Test predictions order jobs of the same lane, but not starving ones"""
+        scheduler = JobScheduler(max_in_flight=1, max_queued=10)
+        order = self.run_jobs(
+            scheduler,
+            [(1, 50, "slow", 40.0), (2, 40, "fast", 4.0), (3, 30, "unknown")],
+        )
+        self.assertEqual(order, ["unknown", "fast", "slow"])
+
+        scheduler = JobScheduler(max_in_flight=1, max_queued=10, starvation_seconds=0)
+        order = self.run_jobs(scheduler, [(1, 50, "slow", 40.0), (2, 40, "fast", 4.0)])
+        self.assertEqual(order, ["slow", "fast"])
+
+    def test_eta(self):
+        """Test queue position and the time until a waiting job is done"""
+        scheduler = JobScheduler(max_in_flight=2, max_queued=10)
+
+        async def main():
+            release = asyncio.Event()
+
+            async def blocker():
+                await release.wait()
+
+            scheduler.submit(1, 5, blocker, 10.0)
+            scheduler.submit(2, 5, blocker, 20.0)
+            first = scheduler.submit(3, 5, blocker, 6.0)
+            second = scheduler.submit(4, 5, blocker, 2.0)
+            result = scheduler.eta(first), scheduler.eta(second)
+            # Unpredicted jobs are ordered as if instant, and leave no ETA behind them
+            scheduler.submit(5, 5, blocker)
+            result += (scheduler.eta(first),)
+            release.set()
+            await scheduler.shutdown()
+            return result
+
+        (first_position, first_eta), second, unknown = asyncio.run(main())
+
+        # The 2s job goes first, on the slot freed after 10s
+        self.assertEqual(second[0], 1)
+        self.assertAlmostEqual(second[1], 12, delta=0.1)
+        # Then this one, on the slot freed after 12s
+        self.assertEqual(first_position, 2)
+        self.assertAlmostEqual(first_eta, 18, delta=0.1)
+        self.assertEqual(unknown, (3, None))
+
+    def test_queue_full_rejects(self):
+        """Test submissions beyond the bound are rejected"""
+        scheduler = JobScheduler(max_in_flight=1, max_queued=1)
+
+        async def main():
+            release = asyncio.Event()
+
+            async def blocker():
+                await release.wait()
+
+            scheduler.submit(1, 5, blocker)
+            scheduler.submit(1, 5, blocker)
+            with self.assertRaises(QueueFullError):
+                scheduler.submit(2, 5, blocker)
+            self.assertEqual(scheduler.in_flight, 1)
+            self.assertEqual(scheduler.queued, 1)
+            await scheduler.shutdown()
+
+        asyncio.run(main())
+        self.assertEqual(scheduler.rejected, 1)
+
+    def test_per_user_queue_cap(self):
+        """Test one user's burst is capped without rejecting other users"""
+        scheduler = JobScheduler(max_in_flight=1, max_queued=10, max_queued_per_user=2)
+
+        async def main():
+            release = asyncio.Event()
+
+            async def blocker():
+                await release.wait()
+
+            scheduler.submit(1, 5, blocker)  # running
+            scheduler.submit(1, 5, blocker)
+            scheduler.submit(1, 5, blocker)
+            with self.assertRaises(UserQueueFullError):
+                scheduler.submit(1, 5, blocker)
+
+            # Other users still get in
+            scheduler.submit(2, 5, blocker)
+            self.assertEqual(scheduler.queued, 3)
+            await scheduler.shutdown()
+
+        asyncio.run(main())
+        self.assertEqual(scheduler.rejected, 1)
+
+    def test_failed_job_frees_slot(self):
+        """Test a failing job does not leak its slot"""
+        scheduler = JobScheduler(max_in_flight=1, max_queued=5)
+        ran = []
+
+        async def main():
+            async def broken():
+                raise RuntimeError("boom")
+
+            async def ok():
+                ran.append(True)
+
+            scheduler.submit(1, 5, broken)
+            scheduler.submit(1, 5, ok)
+            while scheduler.in_flight or scheduler.queued:
+                await asyncio.sleep(0.01)
+
+        asyncio.run(main())
+        self.assertEqual(ran, [True])
+        self.assertEqual(scheduler.in_flight, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import json
+import math
+import os
+import sys
+import unittest
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from pywhispercpp.model import Segment
+
+from segments import Transcript, TranscriptSegment
+
+
+class TestTranscript(unittest.TestCase):
+    def setUp(self):
+        self.transcript = Transcript(
+            [
+                TranscriptSegment(0, 250, "Hello there.", 0.9),
+                TranscriptSegment(250, 366150, "General Kenobi!"),
+            ]
+        )
+
+    def test_from_segments(self):
+        """Test whisper segments are copied, trimmed, and empty ones dropped"""
+        transcript = Transcript.from_segments(
+            [Segment(0, 100, " Hello "), Segment(100, 150, " "), Segment(150, 300, "world")]
+        )
+
+        self.assertEqual(transcript.text, "Hello world")
+        self.assertEqual(len(transcript), 2)
+        self.assertEqual((transcript.segments[1].t0, transcript.segments[1].t1), (150, 300))
+        self.assertEqual(transcript.duration, 3.0)
+
+    def test_empty(self):
+        self.assertFalse(Transcript())
+        self.assertEqual(Transcript().text, "")
+        self.assertFalse(Transcript.from_text("  "))
+
+    def test_to_srt(self):
+        self.assertEqual(
+            self.transcript.to_srt(),
+            "1\n00:00:00,000 --> 00:00:02,500\nHello there.\n\n"
+            "2\n00:00:02,500 --> 01:01:01,500\nGeneral Kenobi!\n",
+        )
+
+    def test_to_vtt(self):
+        self.assertEqual(
+            self.transcript.to_vtt(),
+            "WEBVTT\n\n00:00:00.000 --> 00:00:02.500\nHello there.\n\n"
+            "00:00:02.500 --> 01:01:01.500\nGeneral Kenobi!\n",
+        )
+
+    def test_to_json(self):
+        """Test JSON output, with unknown confidence as null"""
+        data = json.loads(self.transcript.export("json"))
+
+        self.assertEqual(data["text"], "Hello there. General Kenobi!")
+        self.assertEqual(data["segments"][0], {"start": 0.0, "end": 2.5, "text": "Hello there.", "probability": 0.9})
+        self.assertIsNone(data["segments"][1]["probability"])
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            self.transcript.export("txt")
+
+    def test_cache_round_trip(self):
+        """Test a cached transcript keeps its segments"""
+        loaded = Transcript.loads(self.transcript.dumps())
+
+        self.assertEqual(loaded.text, self.transcript.text)
+        self.assertEqual(loaded.segments[1].t1, 366150)
+        self.assertTrue(math.isnan(loaded.segments[1].probability))
+
+    def test_loads_plain_text(self):
+        """Test entries cached before segments were kept still load"""
+        loaded = Transcript.loads("Just words")
+
+        self.assertEqual(loaded.text, "Just words")
+        self.assertEqual(len(loaded), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
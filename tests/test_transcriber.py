@@ -1,12 +1,14 @@
 import os
 import sys
 import unittest
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
+
+import numpy as np
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
-from transcriber import WhisperTranscriber
+from transcriber import SEGMENT_PARAMS, WhisperTranscriber
 
 
 class TestWhisperTranscriber(unittest.TestCase):
@@ -16,6 +18,18 @@ class TestWhisperTranscriber(unittest.TestCase):
         self.config_patcher = patch("transcriber.Config")
         self.mock_config = self.config_patcher.start()
         self.mock_config.WHISPER_MODEL_PATH = "/mock/path/model.bin"
+        self.mock_config.WHISPER_THREADS = 6
+        self.mock_config.INFERENCE_WORKERS = 1
+        self.mock_config.INFERENCE_BACKEND = "thread"
+        self.mock_config.VAD_ENABLED = False
+        self.mock_config.BATCHING_ENABLED = False
+        self.mock_config.WHISPER_MODEL_NAME = "base.en"
+        self.mock_config.WHISPER_MODELS = {"base.en": "/mock/path/model.bin"}
+        self.mock_config.MODEL_MEMORY_BUDGET_MB = 0
+        self.mock_config.MODEL_ROUTES = []
+        self.mock_config.ESCALATION_MODEL = ""
+        self.mock_config.WARMUP_ENABLED = True
+        self.mock_config.LANGUAGE_DETECTION = False
 
         self.model_patcher = patch("transcriber.Model")
         self.mock_model_class = self.model_patcher.start()
@@ -23,10 +37,17 @@ class TestWhisperTranscriber(unittest.TestCase):
         self.mock_model.transcribe = Mock()
         self.mock_model_class.return_value = self.mock_model
 
+        # Decoding is covered in test_audio, feed PCM straight in
+        self.decoder_patcher = patch("transcriber.AudioDecoder")
+        self.mock_decoder = self.decoder_patcher.start().return_value
+        self.audio = np.zeros(16000, dtype=np.float32)
+        self.mock_decoder.decode = AsyncMock(return_value=(self.audio, 0.01))
+
     def tearDown(self):
         """Clean up after tests"""
         self.config_patcher.stop()
         self.model_patcher.stop()
+        self.decoder_patcher.stop()
 
     @patch("transcriber.os.path.exists")
     def test_transcriber_initialization_success(self, mock_exists):
@@ -75,10 +96,15 @@ class TestWhisperTranscriber(unittest.TestCase):
         # Result should be a tuple (text, processing_time)
         self.assertIsInstance(result, tuple)
         self.assertEqual(len(result), 2)
-        self.assertEqual(result[0], "Hello world")
+        self.assertEqual(result[0].text, "Hello world")
         self.assertIsInstance(result[1], float)
         self.assertGreaterEqual(result[1], 0.0)
-        self.mock_model.transcribe.assert_called_once_with("/path/to/audio.wav")
+        self.mock_decoder.decode.assert_called_once_with("/path/to/audio.wav")
+        self.mock_model.transcribe.assert_called_once_with(
+            self.audio, **SEGMENT_PARAMS
+        )
+        self.assertEqual(transcriber.timings["decode"][0], 1)
+        self.assertEqual(transcriber.timings["inference"][0], 1)
 
     @patch("transcriber.os.path.exists")
     def test_transcribe_audio_empty_result(self, mock_exists):
@@ -114,6 +140,533 @@ class TestWhisperTranscriber(unittest.TestCase):
 
         self.assertIsNone(result)
 
+    @patch("transcriber.os.path.exists")
+    def test_transcriber_loads_model_per_worker(self, mock_exists):
+        """Test one model is loaded for each inference worker"""
+        mock_exists.return_value = True
+        self.mock_config.INFERENCE_WORKERS = 3
+
+        transcriber = WhisperTranscriber()
+
+        self.assertEqual(self.mock_model_class.call_count, 3)
+        self.assertEqual(transcriber.executor.workers, 3)
+        self.mock_model_class.assert_called_with("/mock/path/model.bin", n_threads=6)
+        transcriber.close()
+        self.assertIsNone(transcriber.executor)
+
+    @patch("transcriber.ProcessInferenceExecutor")
+    @patch("transcriber.os.path.exists")
+    def test_transcriber_process_backend(self, mock_exists, mock_pool_class):
+        """Test process backend leaves model loading to the worker processes"""
+        mock_exists.return_value = True
+        self.mock_config.INFERENCE_BACKEND = "process"
+        self.mock_config.INFERENCE_WORKERS = 4
+        self.mock_config.WHISPER_THREADS = 8
+        self.mock_config.SHARE_MODEL_MEMORY = True
+
+        transcriber = WhisperTranscriber()
+
+        self.mock_model_class.assert_not_called()
+        args = mock_pool_class.call_args[0]
+        self.assertEqual(args[0], 4)
+        self.assertEqual(args[2], ("/mock/path/model.bin", 8))
+        self.assertTrue(mock_pool_class.call_args[1]["share_memory"])
+        self.assertIsNone(transcriber.model)
+        self.assertTrue(transcriber.is_healthy())
+
+    @patch("transcriber.os.path.exists")
+    def test_transcribe_stream(self, mock_exists):
+        """Test streaming yields segments per window with absolute timestamps"""
+        import asyncio
+
+        mock_exists.return_value = True
+        self.mock_config.STREAM_CHUNK_SECONDS = 30
+        self.mock_config.CHUNK_OVERLAP_SECONDS = 0
+        self.mock_decoder.decode.return_value = (np.zeros(16000 * 70, dtype=np.float32), 0.01)
+
+        def fake_transcribe(chunk, **params):
+            segment = Mock()
+            segment.text = f"{len(chunk)}"
+            segment.t0 = 0
+            segment.t1 = 100
+            return [segment]
+
+        self.mock_model.transcribe.side_effect = fake_transcribe
+        transcriber = WhisperTranscriber()
+
+        async def collect():
+            return [s async for s in transcriber.transcribe_stream("/path/a.oga")]
+
+        segments = asyncio.run(collect())
+
+        self.assertEqual(len(segments), 3)
+        for segment, expected in zip(segments, [0, 3000, 6000]):
+            self.assertAlmostEqual(segment.t0, expected, delta=2)
+        self.assertEqual(sum(int(s.text) for s in segments), 16000 * 70)
+
+    @patch("transcriber.os.path.exists")
+    def test_transcribe_stream_parallel_and_stitched(self, mock_exists):
+        """Test windows run in parallel and overlapping words are removed"""
+        import asyncio
+        import threading
+        import time
+
+        from pywhispercpp.model import Segment
+
+        mock_exists.return_value = True
+        self.mock_config.INFERENCE_WORKERS = 2
+        self.mock_config.STREAM_CHUNK_SECONDS = 30
+        self.mock_config.CHUNK_OVERLAP_SECONDS = 1
+        self.mock_decoder.decode.return_value = (np.zeros(16000 * 90, dtype=np.float32), 0.01)
+
+        # Each window repeats the previous window's last words at its start,
+        # and produces one segment inside the overlap past its cut
+        texts = iter(
+            [
+                ["One two three.", "Four five"],
+                ["four five six.", "Seven eight"],
+                ["Seven eight nine."],
+            ]
+        )
+        lock = threading.Lock()
+        running = [0]
+        peak = [0]
+
+        def fake_transcribe(chunk, **params):
+            with lock:
+                window = next(texts)
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+            # The last segment runs past the cut into the overlap
+            spans = [(0, 1000), (2000, 3050)]
+            segments = [Segment(t0, t1, t) for (t0, t1), t in zip(spans, window)]
+            # Ghost segment transcribed from the overlap past the cut
+            segments.append(Segment(3050, 3090, "ghost"))
+            return segments
+
+        self.mock_model.transcribe.side_effect = fake_transcribe
+        transcriber = WhisperTranscriber()
+
+        async def collect():
+            return [s async for s in transcriber.transcribe_stream("/path/a.oga")]
+
+        segments = asyncio.run(collect())
+        text = " ".join(s.text for s in segments)
+
+        self.assertEqual(peak[0], 2)
+        self.assertEqual(
+            text, "One two three. Four five six. Seven eight nine."
+        )
+        starts = [s.t0 for s in segments]
+        self.assertEqual(starts, sorted(starts))
+        transcriber.close()
+
+    @patch("transcriber.os.path.exists")
+    def test_transcribe_stream_while_downloading(self, mock_exists):
+        """Test windows of a download stream are transcribed before it ends"""
+        import asyncio
+
+        from cache import TranscriptionCache, audio_cache_key
+        from pywhispercpp.model import Segment
+
+        mock_exists.return_value = True
+        self.mock_config.STREAM_CHUNK_SECONDS = 30
+        self.mock_config.CHUNK_OVERLAP_SECONDS = 0
+        audio = np.random.default_rng(0).uniform(-0.1, 0.1, 16000 * 70).astype(np.float32)
+        decoded = []
+
+        async def decode_stream(chunks):
+            async for _ in chunks:
+                pass
+            for start in range(0, len(audio), 16000):
+                decoded.append(start)
+                yield audio[start : start + 16000]
+                await asyncio.sleep(0)
+
+        self.mock_decoder.decode_stream = decode_stream
+        calls = []
+
+        def fake_transcribe(chunk, **params):
+            calls.append(len(decoded))
+            return [Segment(0, 100, f"window {len(calls)}")]
+
+        self.mock_model.transcribe.side_effect = fake_transcribe
+        cache = TranscriptionCache()
+        transcriber = WhisperTranscriber(cache=cache)
+
+        async def download():
+            yield b"bytes"
+
+        async def collect():
+            return [s async for s in transcriber.transcribe_stream(download())]
+
+        segments = asyncio.run(collect())
+
+        self.assertEqual(len(segments), 3)
+        self.assertAlmostEqual(segments[1].t0, 3000, delta=200)
+        # The first window ran with 70 s of audio still to decode
+        self.assertLess(calls[0], 40)
+        self.mock_decoder.decode.assert_not_called()
+        # Cached under the key of the whole decoded audio
+        self.assertIsNotNone(cache.get(audio_cache_key("base.en", audio)))
+
+    @patch("transcriber.os.path.exists")
+    def test_download_stream_trims_silence_per_window(self, mock_exists):
+        """Test VAD applies window by window when the audio is still arriving"""
+        import asyncio
+
+        from pywhispercpp.model import Segment
+
+        mock_exists.return_value = True
+        self.mock_config.VAD_ENABLED = True
+        self.mock_config.STREAM_CHUNK_SECONDS = 30
+        self.mock_config.CHUNK_OVERLAP_SECONDS = 0
+        # 10 s of silence, then 2 s of tone
+        audio = np.zeros(16000 * 12, dtype=np.float32)
+        audio[16000 * 10 :] = 0.5 * np.sin(np.arange(16000 * 2) * 0.1)
+
+        async def decode_stream(chunks):
+            async for _ in chunks:
+                pass
+            yield audio
+
+        self.mock_decoder.decode_stream = decode_stream
+        self.mock_model.transcribe.return_value = [Segment(20, 120, "Hello")]
+        transcriber = WhisperTranscriber()
+
+        async def download():
+            yield b"bytes"
+
+        async def collect():
+            return [s async for s in transcriber.transcribe_stream(download())]
+
+        segments = asyncio.run(collect())
+
+        trimmed = self.mock_model.transcribe.call_args[0][0]
+        self.assertLess(len(trimmed), 16000 * 3)
+        self.assertAlmostEqual(segments[0].t0, 1000, delta=5)
+
+    @patch("transcriber.os.path.exists")
+    def test_silent_audio_skips_inference(self, mock_exists):
+        """Test VAD short-circuits silent audio without running the model"""
+        import asyncio
+
+        mock_exists.return_value = True
+        self.mock_config.VAD_ENABLED = True
+        transcriber = WhisperTranscriber()
+
+        result = asyncio.run(transcriber.transcribe_audio("/path/silence.oga"))
+
+        self.assertEqual(result[0].text, "")
+        self.mock_model.transcribe.assert_not_called()
+
+    @patch("transcriber.os.path.exists")
+    def test_stream_timestamps_map_to_original_audio(self, mock_exists):
+        """Test segment times line up with the untrimmed audio"""
+        import asyncio
+
+        from pywhispercpp.model import Segment
+
+        mock_exists.return_value = True
+        self.mock_config.VAD_ENABLED = True
+        self.mock_config.STREAM_CHUNK_SECONDS = 30
+        self.mock_config.CHUNK_OVERLAP_SECONDS = 0
+        # 10 s of silence, then 2 s of tone
+        audio = np.zeros(16000 * 12, dtype=np.float32)
+        audio[16000 * 10 :] = 0.5 * np.sin(np.arange(16000 * 2) * 0.1)
+        self.mock_decoder.decode.return_value = (audio, 0.01)
+        self.mock_model.transcribe.return_value = [Segment(20, 120, "Hello")]
+        transcriber = WhisperTranscriber()
+
+        async def collect():
+            return [s async for s in transcriber.transcribe_stream("/path/a.oga")]
+
+        segments = asyncio.run(collect())
+
+        trimmed = self.mock_model.transcribe.call_args[0][0]
+        self.assertLess(len(trimmed), 16000 * 3)
+        # 10 s silence minus 200 ms padding, plus the 200 ms segment start
+        self.assertAlmostEqual(segments[0].t0, 1000, delta=5)
+
+    @patch("transcriber.os.path.exists")
+    def test_concurrent_short_clips_are_batched(self, mock_exists):
+        """Test short clips transcribed together share one model call"""
+        import asyncio
+
+        from pywhispercpp.model import Segment
+
+        from transcriber import WORD_PARAMS
+
+        mock_exists.return_value = True
+        self.mock_config.BATCHING_ENABLED = True
+        self.mock_config.BATCH_MAX_SIZE = 2
+        self.mock_config.BATCH_MAX_WAIT_MS = 50
+        self.mock_config.BATCH_MAX_CLIP_SECONDS = 15
+        # Two 1 s clips packed with a 1 s gap: words at 0.2 s and 2.2 s
+        self.mock_model.transcribe.return_value = [
+            Segment(20, 60, " Hello"),
+            Segment(220, 260, " there"),
+        ]
+        transcriber = WhisperTranscriber()
+
+        async def main():
+            return await asyncio.gather(
+                transcriber.transcribe_audio("/path/a.oga"),
+                transcriber.transcribe_audio("/path/b.oga"),
+            )
+
+        (first, _), (second, _) = asyncio.run(main())
+
+        self.mock_model.transcribe.assert_called_once()
+        self.assertEqual(self.mock_model.transcribe.call_args.kwargs, WORD_PARAMS)
+        self.assertEqual((first.text, second.text), ("Hello", "there"))
+        transcriber.close()
+
+    def test_drop_repeated_words_only_in_overlap(self):
+        """Test matching words after the overlap region are kept"""
+        from pywhispercpp.model import Segment
+
+        from transcriber import _drop_repeated_words
+
+        # Starts after the previous segment ended: real speech, keep it
+        later = [Segment(5000, 5500, "made it work")]
+        kept = _drop_repeated_words(["we", "made", "it"], 4000, later)
+        self.assertEqual(kept[0].text, "made it work")
+
+        # A single matching word is not enough evidence of a repeat
+        single = [Segment(3900, 4500, "It works")]
+        kept = _drop_repeated_words(["made", "it"], 4000, single)
+        self.assertEqual(kept[0].text, "It works")
+
+        overlap = [Segment(3900, 4500, "made it work")]
+        trimmed = _drop_repeated_words(["we", "made", "it"], 4000, overlap)
+        self.assertEqual(trimmed[0].text, "work")
+
+    @patch("transcriber.os.path.exists")
+    def test_transcribe_audio_pcm_cache(self, mock_exists):
+        """Test identical decoded audio is transcribed only once"""
+        import asyncio
+
+        from cache import TranscriptionCache
+
+        mock_exists.return_value = True
+        self.mock_config.WHISPER_MODEL_NAME = "base.en"
+        self.mock_decoder.decode.return_value = (np.ones(16000, dtype=np.float32), 0.01)
+        from pywhispercpp.model import Segment
+
+        self.mock_model.transcribe.return_value = [Segment(0, 100, "Hello world")]
+
+        cache = TranscriptionCache()
+        transcriber = WhisperTranscriber(cache=cache)
+
+        first = asyncio.run(transcriber.transcribe_audio("/path/a.oga"))
+        second = asyncio.run(transcriber.transcribe_audio("/path/b.mp3"))
+
+        self.assertEqual(first[0].text, "Hello world")
+        self.assertEqual(second[0].text, "Hello world")
+        # Cached with its segments, so subtitles work for cache hits too
+        self.assertEqual(second[0].segments[0].t1, 100)
+        self.mock_model.transcribe.assert_called_once()
+        self.assertEqual(cache.hits, 1)
+
+    @patch("transcriber.os.path.exists")
+    def test_routed_model_loads_on_demand(self, mock_exists):
+        """Test a job for another model loads it and leaves the default alone"""
+        import asyncio
+
+        from pywhispercpp.model import Segment
+
+        mock_exists.return_value = True
+        tiny = Mock()
+        tiny.transcribe.return_value = [Segment(0, 100, "tiny words")]
+        self.mock_config.WHISPER_MODELS = {
+            "base.en": "/mock/path/model.bin",
+            "tiny.en": "/mock/path/tiny.bin",
+        }
+        self.mock_model_class.side_effect = lambda path, n_threads: (
+            tiny if path == "/mock/path/tiny.bin" else self.mock_model
+        )
+
+        transcriber = WhisperTranscriber()
+        self.assertEqual(transcriber.registry.loaded, ["base.en"])
+
+        result = asyncio.run(transcriber.transcribe_audio("/path/a.oga", "tiny.en"))
+
+        self.assertEqual(result[0].text, "tiny words")
+        self.mock_model.transcribe.assert_not_called()
+        self.assertEqual(transcriber.registry.loaded, ["base.en", "tiny.en"])
+        transcriber.close()
+
+    @patch("transcriber.os.path.exists")
+    def test_low_confidence_escalates(self, mock_exists):
+        """Test a low-confidence answer is redone with the escalation model"""
+        import asyncio
+
+        from pywhispercpp.model import Segment
+
+        mock_exists.return_value = True
+        large = Mock()
+        large.transcribe.return_value = [Segment(0, 100, "clear words", 0.95)]
+        self.mock_model.transcribe.return_value = [Segment(0, 100, "mumble", 0.2)]
+        self.mock_config.WHISPER_MODELS = {
+            "base.en": "/mock/path/model.bin",
+            "small.en": "/mock/path/small.bin",
+        }
+        self.mock_config.ESCALATION_MODEL = "small.en"
+        self.mock_config.ESCALATION_MIN_CONFIDENCE = 0.6
+        self.mock_model_class.side_effect = lambda path, n_threads: (
+            large if path == "/mock/path/small.bin" else self.mock_model
+        )
+
+        transcriber = WhisperTranscriber()
+        escalated = asyncio.run(transcriber.transcribe_audio("/path/a.oga"))
+
+        self.mock_model.transcribe.return_value = [Segment(0, 100, "fine", 0.9)]
+        confident = asyncio.run(transcriber.transcribe_audio("/path/b.oga"))
+
+        self.assertEqual(escalated[0].text, "clear words")
+        self.assertEqual(confident[0].text, "fine")
+        large.transcribe.assert_called_once()
+        transcriber.close()
+
+    def enable_language_detection(self):
+        """A multilingual "base" model next to base.en, detecting Spanish"""
+        from pywhispercpp.model import Segment
+
+        multilingual = Mock()
+        multilingual.auto_detect_language.return_value = (("es", 0.93), {})
+        multilingual.transcribe.return_value = [Segment(0, 100, "hola")]
+        self.mock_config.WHISPER_MODELS = {
+            "base.en": "/mock/path/model.bin",
+            "base": "/mock/path/base.bin",
+        }
+        self.mock_config.LANGUAGE_DETECTION = True
+        self.mock_config.MULTILINGUAL_MODEL = "base"
+        self.mock_config.LANGUAGE_DETECT_SECONDS = 0.5
+        self.mock_config.LANGUAGE_MIN_CONFIDENCE = 0.5
+        self.mock_model_class.side_effect = lambda path, n_threads: (
+            multilingual if path == "/mock/path/base.bin" else self.mock_model
+        )
+        return multilingual
+
+    @patch("transcriber.os.path.exists")
+    def test_non_english_audio_switches_to_multilingual_model(self, mock_exists):
+        """Test a short window picks the language and the multilingual model"""
+        import asyncio
+
+        mock_exists.return_value = True
+        multilingual = self.enable_language_detection()
+        detections = []
+
+        transcriber = WhisperTranscriber()
+        result = asyncio.run(
+            transcriber.transcribe_audio(
+                "/path/a.oga", on_language=lambda *detected: detections.append(detected)
+            )
+        )
+
+        self.assertEqual(result[0].text, "hola")
+        self.assertEqual(detections, [("es", 0.93)])
+        window = multilingual.auto_detect_language.call_args[0][0]
+        self.assertEqual(len(window), 8000)
+        self.assertEqual(multilingual.transcribe.call_args[1]["language"], "es")
+        self.mock_model.transcribe.assert_not_called()
+        transcriber.close()
+
+    @patch("transcriber.os.path.exists")
+    def test_english_or_known_language_keeps_model(self, mock_exists):
+        """Test English stays on the .en model, and a known language skips detection"""
+        import asyncio
+
+        from pywhispercpp.model import Segment
+
+        mock_exists.return_value = True
+        multilingual = self.enable_language_detection()
+        multilingual.auto_detect_language.return_value = (("en", 0.98), {})
+        self.mock_model.transcribe.return_value = [Segment(0, 100, "hello")]
+
+        transcriber = WhisperTranscriber()
+        detected = asyncio.run(transcriber.transcribe_audio("/path/a.oga"))
+        hinted = asyncio.run(transcriber.transcribe_audio("/path/b.oga", language="en"))
+
+        self.assertEqual(detected[0].text, "hello")
+        self.assertEqual(hinted[0].text, "hello")
+        multilingual.auto_detect_language.assert_called_once()
+        multilingual.transcribe.assert_not_called()
+        transcriber.close()
+
+    @patch("transcriber.os.path.exists")
+    def test_download_stream_detects_language_on_first_window(self, mock_exists):
+        """Test a download's first window picks the model for every window"""
+        import asyncio
+
+        mock_exists.return_value = True
+        multilingual = self.enable_language_detection()
+        self.mock_config.VAD_ENABLED = False
+        self.mock_config.STREAM_CHUNK_SECONDS = 30
+        self.mock_config.CHUNK_OVERLAP_SECONDS = 0
+        audio = np.random.default_rng(0).uniform(-0.1, 0.1, 16000 * 50).astype(np.float32)
+
+        async def decode_stream(chunks):
+            async for _ in chunks:
+                pass
+            for start in range(0, len(audio), 16000):
+                yield audio[start : start + 16000]
+
+        self.mock_decoder.decode_stream = decode_stream
+        transcriber = WhisperTranscriber()
+
+        async def download():
+            yield b"bytes"
+
+        async def collect():
+            return [s async for s in transcriber.transcribe_stream(download())]
+
+        segments = asyncio.run(collect())
+
+        self.assertEqual(len(segments), 2)
+        multilingual.auto_detect_language.assert_called_once()
+        self.assertEqual(multilingual.transcribe.call_count, 2)
+        self.mock_model.transcribe.assert_not_called()
+        transcriber.close()
+
+    @patch("transcriber.os.path.exists")
+    def test_start_loads_in_background_and_warms_up(self, mock_exists):
+        """Test start() loads the model off the loop and warms every worker"""
+        import asyncio
+
+        mock_exists.return_value = True
+        self.mock_config.INFERENCE_WORKERS = 2
+        self.mock_model.transcribe.return_value = []
+
+        transcriber = WhisperTranscriber(preload=False)
+        self.assertIsNone(transcriber.executor)
+        self.mock_model_class.assert_not_called()
+
+        asyncio.run(transcriber.start())
+
+        self.assertTrue(transcriber.ready.is_set())
+        self.assertTrue(transcriber.is_healthy())
+        self.assertEqual(self.mock_model_class.call_count, 2)
+        self.assertEqual(self.mock_model.transcribe.call_count, 2)
+        self.assertEqual(set(transcriber.startup_timings), {"model_load", "warmup"})
+        transcriber.close()
+
+    @patch("transcriber.os.path.exists")
+    def test_failed_background_load_never_becomes_ready(self, mock_exists):
+        """Test a missing model fails start() and leaves jobs held"""
+        import asyncio
+
+        mock_exists.return_value = False
+        transcriber = WhisperTranscriber(preload=False)
+
+        with self.assertRaises(FileNotFoundError):
+            asyncio.run(transcriber.start())
+        self.assertFalse(transcriber.ready.is_set())
+
     @patch("transcriber.os.path.exists")
     def test_is_healthy(self, mock_exists):
         """Test health check"""
@@ -1,12 +1,27 @@
 import os
 import sys
 import unittest
-from unittest.mock import Mock, patch
+from unittest.mock import AsyncMock, Mock, patch
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
-from utils import cleanup_temp_file, format_transcription, format_processing_time, get_file_info
+from utils import (
+    ProgressMessage,
+    audio_format,
+    buffered,
+    cleanup_temp_file,
+    downloaded_audio,
+    format_eta,
+    format_partial_transcription,
+    format_processing_time,
+    format_transcription,
+    get_file_info,
+    media_duration,
+    iter_download,
+    send_long_message,
+    should_pipeline_download,
+)
 
 
 class TestUtils(unittest.TestCase):
@@ -100,6 +115,289 @@ class TestUtils(unittest.TestCase):
         # Should not raise exception
         cleanup_temp_file("/tmp/test.mp3")
 
+    def test_format_eta(self):
+        self.assertEqual(format_eta(0.2), "~1s")
+        self.assertEqual(format_eta(42.4), "~42s")
+        self.assertEqual(format_eta(170), "~3 min")
+        self.assertEqual(format_eta(3900), "~1h 5m")
+
+    def test_audio_format_and_duration(self):
+        """Test the container and length are read from Telegram's metadata"""
+        import datetime
+
+        voice = Mock(spec=["mime_type", "duration"], mime_type="audio/ogg", duration=12)
+        document = Mock(spec=["file_name", "mime_type"], file_name="Talk.MP3")
+        unknown = Mock(spec=["mime_type"], mime_type="audio/x-unknown")
+
+        self.assertEqual(audio_format(voice), "ogg")
+        self.assertEqual(audio_format(document), "mp3")
+        self.assertEqual(audio_format(unknown), "")
+        self.assertEqual(media_duration(voice), 12)
+        self.assertIsNone(media_duration(document))
+        self.assertEqual(
+            media_duration(Mock(duration=datetime.timedelta(seconds=90))), 90
+        )
+
+    def test_format_partial_transcription(self):
+        """Test partial transcription shows the latest text"""
+        formatted = format_partial_transcription(["Hello", "world"], 4.2)
+        self.assertIn("Transcribing", formatted)
+        self.assertIn("4s", formatted)
+        self.assertIn("Hello world", formatted)
+
+        # Long transcripts are cut from the front
+        parts = [f"word{i}" for i in range(2000)]
+        formatted_long = format_partial_transcription(parts, 10)
+        self.assertLess(len(formatted_long), 4000)
+        self.assertIn("… ", formatted_long)
+        self.assertTrue(formatted_long.endswith("word1999"))
+
+    def test_progress_message_rate_limit(self):
+        """Test progress edits are rate limited and skip unchanged text"""
+        import asyncio
+
+        message = Mock()
+        message.edit_text = AsyncMock()
+        progress = ProgressMessage(message, min_interval=60)
+
+        async def run():
+            first = await progress.update("one")
+            second = await progress.update("two")
+            progress._last_edit = 0.0
+            third = await progress.update("two")
+            progress._last_edit = 0.0
+            fourth = await progress.update("two")
+            return first, second, third, fourth
+
+        self.assertEqual(asyncio.run(run()), (True, False, True, False))
+        self.assertEqual(message.edit_text.call_count, 2)
+
+        # Edit errors are swallowed
+        message.edit_text.side_effect = Exception("Flood control")
+        progress._last_edit = 0.0
+        self.assertFalse(asyncio.run(progress.update("three")))
+
+    def test_progress_message_push(self):
+        """Test pushed edits run in the background and close drops unsent ones"""
+        import asyncio
+
+        message = Mock()
+        sent = []
+
+        async def edit_text(text):
+            await asyncio.sleep(0.05 if text == "slow" else 0)
+            sent.append(text)
+
+        message.edit_text = edit_text
+        progress = ProgressMessage(message, min_interval=0)
+
+        async def run():
+            pushed = progress.push("one")
+            unchanged = progress.push("one")
+            await asyncio.sleep(0.01)
+            progress.push("slow")
+            await asyncio.sleep(0)
+            await progress.close()
+            return pushed, unchanged
+
+        self.assertEqual(asyncio.run(run()), (True, False))
+        self.assertEqual(sent, ["one"])
+
+    def test_send_long_message_with_documents(self):
+        """Test exported files are sent as documents after the text"""
+        import asyncio
+
+        update = Mock()
+        update.message.reply_text = AsyncMock()
+        update.message.reply_document = AsyncMock()
+
+        asyncio.run(
+            send_long_message(
+                update,
+                "Hello",
+                documents={"transcription.srt": "1\n...", "transcription.vtt": "WEBVTT"},
+            )
+        )
+
+        update.message.reply_text.assert_called_once()
+        names = [
+            call.kwargs["document"].filename
+            for call in update.message.reply_document.call_args_list
+        ]
+        self.assertEqual(names, ["transcription.srt", "transcription.vtt"])
+
+
+class TestDownloadedAudio(unittest.TestCase):
+    def setUp(self):
+        self.config_patcher = patch("utils.Config")
+        self.mock_config = self.config_patcher.start()
+        self.mock_config.MAX_AUDIO_SIZE_MB = 50
+        self.mock_config.IN_MEMORY_DOWNLOAD_MAX_MB = 1
+
+    def tearDown(self):
+        self.config_patcher.stop()
+
+    def make_file(self, size, file_path="voice/file_1.oga"):
+        file = Mock()
+        file.file_size = size
+        file.file_path = file_path
+        file.download_as_bytearray = AsyncMock(return_value=bytearray(b"OggS"))
+
+        async def download_to_drive(path):
+            with open(path, "wb") as f:
+                f.write(b"OggS")
+
+        file.download_to_drive = AsyncMock(side_effect=download_to_drive)
+        return file
+
+    def test_small_file_stays_in_memory(self):
+        """Test small files are downloaded without touching the disk"""
+        import asyncio
+
+        file = self.make_file(1000)
+
+        async def run():
+            async with downloaded_audio(file) as audio:
+                return audio
+
+        audio = asyncio.run(run())
+        self.assertTrue(audio.in_memory)
+        self.assertEqual(audio.source, b"OggS")
+        file.download_to_drive.assert_not_called()
+
+    def test_large_or_seekable_file_goes_to_disk(self):
+        """Test large files and MP4 containers use a temp file that is removed"""
+        import asyncio
+
+        for file in (self.make_file(5 * 1024 * 1024), self.make_file(10, "music/a.m4a")):
+
+            async def run():
+                async with downloaded_audio(file) as audio:
+                    self.assertFalse(audio.in_memory)
+                    self.assertTrue(os.path.exists(audio.path))
+                    return audio.path
+
+            path = asyncio.run(run())
+            self.assertFalse(os.path.exists(path))
+
+    def test_temp_file_removed_when_block_raises(self):
+        """Test cleanup is guaranteed on errors"""
+        import asyncio
+
+        file = self.make_file(5 * 1024 * 1024)
+        paths = []
+
+        async def run():
+            async with downloaded_audio(file) as audio:
+                paths.append(audio.path)
+                raise RuntimeError("transcription failed")
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(run())
+        self.assertFalse(os.path.exists(paths[0]))
+
+    def test_failed_download_yields_none(self):
+        """Test download errors give None instead of raising"""
+        import asyncio
+
+        file = self.make_file(1000)
+        file.download_as_bytearray.side_effect = Exception("network")
+
+        async def run():
+            async with downloaded_audio(file) as audio:
+                return audio
+
+        self.assertIsNone(asyncio.run(run()))
+
+
+class TestDownloadStream(unittest.TestCase):
+    def setUp(self):
+        self.config_patcher = patch("utils.Config")
+        self.mock_config = self.config_patcher.start()
+        self.mock_config.MAX_AUDIO_SIZE_MB = 50
+        self.mock_config.PIPELINED_DOWNLOAD = True
+        self.mock_config.PIPELINE_MIN_MB = 10
+
+    def tearDown(self):
+        self.config_patcher.stop()
+
+    def test_should_pipeline_download(self):
+        """Test only large, pipe-decodable files within the limit are pipelined"""
+        MB = 1024 * 1024
+
+        def file(size, path="documents/file_1.mp3"):
+            return Mock(file_size=size, file_path=path)
+
+        self.assertTrue(should_pipeline_download(file(20 * MB)))
+        self.assertFalse(should_pipeline_download(file(1 * MB)))
+        self.assertFalse(should_pipeline_download(file(60 * MB)))
+        self.assertFalse(should_pipeline_download(file(20 * MB, "documents/a.m4a")))
+        self.assertFalse(should_pipeline_download(file(None)))
+
+        self.mock_config.PIPELINED_DOWNLOAD = False
+        self.assertFalse(should_pipeline_download(file(20 * MB)))
+
+    def test_iter_download_reads_local_file_in_chunks(self):
+        """Test files from a local Bot API server are read from disk"""
+        import asyncio
+        import tempfile
+
+        data = os.urandom(200 * 1024)
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(data)
+        self.addCleanup(os.unlink, f.name)
+
+        async def collect():
+            return [chunk async for chunk in iter_download(Mock(file_path=f.name))]
+
+        chunks = asyncio.run(collect())
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(b"".join(chunks), data)
+
+    def test_buffered_reads_ahead_up_to_limit(self):
+        """Test the source runs ahead of a slow consumer, but only so far"""
+        import asyncio
+
+        produced = []
+
+        async def source():
+            for i in range(10):
+                produced.append(i)
+                yield bytes([i])
+
+        async def consume():
+            received = []
+            async for chunk in buffered(source(), max_chunks=3):
+                if not received:
+                    await asyncio.sleep(0.01)
+                    # Three queued plus one waiting to be queued
+                    ahead = len(produced)
+                received.append(chunk)
+            return received, ahead
+
+        received, ahead = asyncio.run(consume())
+
+        self.assertEqual(received, [bytes([i]) for i in range(10)])
+        self.assertLessEqual(ahead, 5)
+        self.assertGreater(ahead, 1)
+
+    def test_buffered_raises_source_errors_after_earlier_chunks(self):
+        import asyncio
+
+        async def source():
+            yield b"a"
+            raise ConnectionError("reset")
+
+        async def consume(received):
+            async for chunk in buffered(source(), max_chunks=4):
+                received.append(chunk)
+
+        received = []
+        with self.assertRaises(ConnectionError):
+            asyncio.run(consume(received))
+        self.assertEqual(received, [b"a"])
+
 
 if __name__ == "__main__":
     unittest.main()
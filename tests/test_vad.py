@@ -0,0 +1,72 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from vad import SpeechMap, detect_speech, trim_silence
+
+SAMPLE_RATE = 16000
+
+
+def tone(seconds, amplitude=0.3):
+    samples = int(seconds * SAMPLE_RATE)
+    return (amplitude * np.sin(np.arange(samples) * 0.1)).astype(np.float32)
+
+
+def silence(seconds, amplitude=0.0):
+    samples = int(seconds * SAMPLE_RATE)
+    noise = np.random.default_rng(0).standard_normal(samples)
+    return (amplitude * noise).astype(np.float32)
+
+
+class TestVad(unittest.TestCase):
+    def test_silence_has_no_speech(self):
+        """Test digital silence and faint noise contain no speech"""
+        self.assertEqual(detect_speech(silence(5)), [])
+        self.assertEqual(detect_speech(silence(5, 0.001)), [])
+
+    def test_constant_speech_is_kept(self):
+        """Test audio without pauses is kept whole"""
+        audio = tone(3)
+        self.assertEqual(detect_speech(audio), [(0, len(audio))])
+
+    def test_trim_drops_long_pauses(self):
+        """Test long pauses are removed and short ones bridged"""
+        audio = np.concatenate(
+            [silence(2, 0.001), tone(1), silence(0.3, 0.001), tone(1), silence(4, 0.001), tone(1)]
+        )
+        trimmed, speech_map = trim_silence(audio)
+
+        self.assertEqual(len(speech_map.regions), 2)
+        self.assertLess(len(trimmed), len(audio) / 2)
+        self.assertEqual(len(trimmed), speech_map.trimmed_samples)
+
+    def test_short_blips_are_ignored(self):
+        """Test clicks shorter than the minimum speech length are dropped"""
+        audio = np.concatenate([silence(2), tone(0.06), silence(2)])
+        self.assertEqual(detect_speech(audio), [])
+
+    def test_speech_map_translates_positions(self):
+        """Test trimmed positions map back to the original audio"""
+        speech_map = SpeechMap([(16000, 32000), (80000, 96000)])
+
+        self.assertEqual(speech_map.to_original(0), 16000)
+        self.assertEqual(speech_map.to_original(15999), 31999)
+        self.assertEqual(speech_map.to_original(16000), 80000)
+        # Whisper timestamps are in 10 ms units
+        self.assertEqual(speech_map.to_original_cs(150), 550)
+
+    def test_empty_map_is_identity(self):
+        """Test an empty map leaves positions unchanged"""
+        speech_map = SpeechMap([])
+
+        self.assertFalse(speech_map)
+        self.assertEqual(speech_map.to_original(1234), 1234)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,174 @@
+import asyncio
+import json
+import os
+import sys
+import unittest
+
+from telegram.ext import Application, MessageHandler, filters
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from webhook import WebhookServer
+
+SECRET = "test-secret"
+
+UPDATE = {
+    "update_id": 1,
+    "message": {
+        "message_id": 10,
+        "date": 0,
+        "chat": {"id": 42, "type": "private"},
+        "from": {"id": 42, "is_bot": False, "first_name": "Test"},
+        "text": "hello",
+    },
+}
+
+
+class FakeTelegram:
+    """Local stand-in for the Bot API, recording the methods called"""
+
+    def __init__(self):
+        self.calls = []
+        self.port = None
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        request_line = await reader.readline()
+        headers = {}
+        while (line := await reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode().partition(":")
+            headers[name.strip().lower()] = value.strip()
+        body = await reader.readexactly(int(headers.get("content-length", "0")))
+
+        method = request_line.decode().split()[1].rsplit("/", 1)[-1]
+        self.calls.append((method, body.decode()))
+        if method == "getMe":
+            result = {"id": 1, "is_bot": True, "first_name": "Bot", "username": "test_bot"}
+        else:
+            result = True
+
+        payload = json.dumps({"ok": True, "result": result}).encode()
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+            + f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode()
+            + payload
+        )
+        await writer.drain()
+        writer.close()
+
+
+async def post(port, body, secret=SECRET, path="/telegram"):
+    """POST to the webhook and return the status code"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    headers = f"POST {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(body)}\r\n"
+    if secret:
+        headers += f"X-Telegram-Bot-Api-Secret-Token: {secret}\r\n"
+    writer.write((headers + "Connection: close\r\n\r\n").encode() + body)
+    await writer.drain()
+    status = (await reader.readline()).decode().split()[1]
+    writer.close()
+    return int(status)
+
+
+async def send_raw(port, data):
+    """Send raw bytes to the webhook and return the status code"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(data)
+    await writer.drain()
+    status = (await reader.readline()).decode().split()[1]
+    writer.close()
+    return int(status)
+
+
+class TestWebhookServer(unittest.TestCase):
+    def run_with_app(self, scenario):
+        """Run scenario(app, server, received) against a fake Bot API"""
+
+        async def main():
+            telegram = FakeTelegram()
+            await telegram.start()
+            base_url = f"http://127.0.0.1:{telegram.port}"
+            app = (
+                Application.builder()
+                .token("123:abc")
+                .base_url(f"{base_url}/bot")
+                .base_file_url(f"{base_url}/file/bot")
+                .build()
+            )
+            received = asyncio.Queue()
+
+            async def on_text(update, _):
+                await received.put(update.message.text)
+
+            app.add_handler(MessageHandler(filters.TEXT, on_text))
+            server = WebhookServer(app, "127.0.0.1", 0, "/telegram", SECRET)
+            async with app:
+                await app.start()
+                await server.start()
+                try:
+                    return await scenario(app, server, received), telegram
+                finally:
+                    await server.stop()
+                    await app.stop()
+                    await telegram.stop()
+
+        return asyncio.run(main())
+
+    def test_update_reaches_handlers(self):
+        """Test a posted update is dispatched to the application's handlers"""
+
+        async def scenario(app, server, received):
+            status = await post(server.port, json.dumps(UPDATE).encode())
+            text = await asyncio.wait_for(received.get(), timeout=5)
+            return status, text, server.updates_received
+
+        (status, text, count), telegram = self.run_with_app(scenario)
+
+        self.assertEqual(status, 200)
+        self.assertEqual(text, "hello")
+        self.assertEqual(count, 1)
+        self.assertIn("getMe", [method for method, _ in telegram.calls])
+
+    def test_rejects_bad_requests(self):
+        """Test wrong secrets, paths and bodies are rejected"""
+
+        async def scenario(app, server, received):
+            body = json.dumps(UPDATE).encode()
+            return (
+                await post(server.port, body, secret="wrong"),
+                await post(server.port, body, secret=None),
+                await post(server.port, body, path="/other"),
+                await post(server.port, b"not json"),
+                await send_raw(
+                    server.port,
+                    b"POST /telegram HTTP/1.1\r\nContent-Length: -1\r\n\r\n",
+                ),
+                await send_raw(
+                    server.port,
+                    b"POST /telegram HTTP/1.1\r\nX-Long: "
+                    + b"a" * 100_000
+                    + b"\r\n\r\n",
+                ),
+                server.updates_received,
+            )
+
+        (wrong, missing, path, malformed, negative, long_header, count), _ = (
+            self.run_with_app(scenario)
+        )
+
+        self.assertEqual((wrong, missing, path, malformed), (403, 403, 404, 400))
+        self.assertEqual((negative, long_header), (400, 400))
+        self.assertEqual(count, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()